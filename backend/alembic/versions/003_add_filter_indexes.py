@@ -0,0 +1,43 @@
+"""Add foreign key and status indexes for list filters
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-12-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Foreign keys used by the list filters and detail pages
+    op.create_index('ix_servers_datacenter_id', 'servers', ['datacenter_id'])
+    op.create_index('ix_hosts_server_id', 'hosts', ['server_id'])
+    op.create_index('ix_hosts_os_id', 'hosts', ['os_id'])
+    op.create_index('ix_ip_addresses_host_id', 'ip_addresses', ['host_id'])
+    op.create_index('ix_assignments_person_id', 'assignments', ['person_id'])
+
+    # Status columns
+    op.create_index('ix_servers_status', 'servers', ['status'])
+    op.create_index('ix_hosts_status', 'hosts', ['status'])
+
+    # Polymorphic assignment target
+    op.create_index('ix_assignments_entity', 'assignments', ['entity_type', 'entity_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_assignments_entity', table_name='assignments')
+    op.drop_index('ix_hosts_status', table_name='hosts')
+    op.drop_index('ix_servers_status', table_name='servers')
+    op.drop_index('ix_assignments_person_id', table_name='assignments')
+    op.drop_index('ix_ip_addresses_host_id', table_name='ip_addresses')
+    op.drop_index('ix_hosts_os_id', table_name='hosts')
+    op.drop_index('ix_hosts_server_id', table_name='hosts')
+    op.drop_index('ix_servers_datacenter_id', table_name='servers')
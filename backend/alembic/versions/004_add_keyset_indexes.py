@@ -0,0 +1,52 @@
+"""Add (created_at, id) indexes for keyset pagination
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-12-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    'datacenters',
+    'servers',
+    'operating_systems',
+    'hosts',
+    'ip_addresses',
+    'persons',
+    'assignments',
+]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # The sort key must be NOT NULL for the seek predicate to cover every row
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+        op.alter_column(
+            table,
+            'created_at',
+            existing_type=sa.DateTime(timezone=True),
+            existing_server_default=sa.text('now()'),
+            nullable=False,
+        )
+        op.create_index(f'ix_{table}_created_at_id', table, ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_index(f'ix_{table}_created_at_id', table_name=table)
+        op.alter_column(
+            table,
+            'created_at',
+            existing_type=sa.DateTime(timezone=True),
+            existing_server_default=sa.text('now()'),
+            nullable=True,
+        )
@@ -0,0 +1,40 @@
+"""Store IP addresses as inet with a GiST index for subnet queries
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-12-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fails on rows that are not valid addresses; fix those before upgrading
+    op.alter_column(
+        'ip_addresses', 'address',
+        type_=postgresql.INET(),
+        postgresql_using='address::inet',
+    )
+    op.create_index(
+        'ix_ip_addresses_address_gist', 'ip_addresses', ['address'],
+        postgresql_using='gist',
+        postgresql_ops={'address': 'inet_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ip_addresses_address_gist', table_name='ip_addresses')
+    op.alter_column(
+        'ip_addresses', 'address',
+        type_=sa.String(),
+        postgresql_using='abbrev(address)',
+    )
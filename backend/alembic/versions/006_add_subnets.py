@@ -0,0 +1,55 @@
+"""Add subnets and reserved ranges for IP address management
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-12-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'subnets',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('cidr', postgresql.CIDR(), nullable=False),
+        sa.Column('datacenter_id', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['datacenter_id'], ['datacenters.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('cidr')
+    )
+    op.create_index('ix_subnets_datacenter_id', 'subnets', ['datacenter_id'])
+    op.create_index('ix_subnets_created_at_id', 'subnets', ['created_at', 'id'])
+
+    op.create_table(
+        'subnet_reserved_ranges',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('subnet_id', sa.String(), nullable=False),
+        sa.Column('start_address', postgresql.INET(), nullable=False),
+        sa.Column('end_address', postgresql.INET(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['subnet_id'], ['subnets.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_subnet_reserved_ranges_subnet_id', 'subnet_reserved_ranges', ['subnet_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_subnet_reserved_ranges_subnet_id', table_name='subnet_reserved_ranges')
+    op.drop_table('subnet_reserved_ranges')
+    op.drop_index('ix_subnets_created_at_id', table_name='subnets')
+    op.drop_index('ix_subnets_datacenter_id', table_name='subnets')
+    op.drop_table('subnets')
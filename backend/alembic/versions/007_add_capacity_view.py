@@ -0,0 +1,42 @@
+"""Add host_capacity materialized view for capacity reports
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-12-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Host counts and CPU / memory sums at the finest grouping used by the
+    # reports; coarser groupings are rolled up from these few rows
+    op.execute("""
+        CREATE MATERIALIZED VIEW host_capacity AS
+        SELECT h.server_id, s.datacenter_id, h.os_id, h.type, h.status,
+               count(*) AS hosts,
+               sum(h.cpu) AS cpu,
+               sum(h.memory_gb) AS memory_gb,
+               now() AS refreshed_at
+        FROM hosts h
+        JOIN servers s ON s.id = h.server_id
+        GROUP BY h.server_id, s.datacenter_id, h.os_id, h.type, h.status
+    """)
+    # Required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute(
+        "CREATE UNIQUE INDEX ix_host_capacity_key "
+        "ON host_capacity (server_id, os_id, type, status)"
+    )
+    op.execute("CREATE INDEX ix_host_capacity_datacenter_id ON host_capacity (datacenter_id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS host_capacity")
@@ -0,0 +1,100 @@
+"""Add change_log for incremental sync
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-01-05 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED_TABLES = [
+    "datacenters",
+    "servers",
+    "operating_systems",
+    "hosts",
+    "ip_addresses",
+    "subnets",
+    "persons",
+    "assignments",
+]
+
+OPERATIONS = {
+    "INSERT": "NEW TABLE AS changed_rows",
+    "UPDATE": "NEW TABLE AS changed_rows",
+    "DELETE": "OLD TABLE AS changed_rows",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column('txid', sa.BigInteger(), nullable=False),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('row_id', sa.String(), nullable=False),
+        sa.Column('op', sa.String(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_change_log_txid_id', 'change_log', ['txid', 'id'])
+    op.create_index('ix_change_log_changed_at', 'change_log', ['changed_at'])
+
+    # Position of the newest pruned change; older sync tokens are expired
+    op.create_table(
+        'change_log_horizon',
+        sa.Column('txid', sa.BigInteger(), nullable=False),
+        sa.Column('change_id', sa.BigInteger(), nullable=False),
+    )
+    op.execute("INSERT INTO change_log_horizon (txid, change_id) VALUES (0, 0)")
+
+    # Statement-level triggers with transition tables: a bulk statement logs
+    # all of its rows with a single INSERT ... SELECT
+    op.execute("""
+        CREATE FUNCTION log_row_changes() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO change_log (txid, entity, row_id, op)
+            SELECT pg_current_xact_id()::text::bigint, TG_TABLE_NAME, id, lower(TG_OP)
+            FROM changed_rows;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # Reserved ranges are part of their subnet
+    op.execute("""
+        CREATE FUNCTION log_reserved_range_changes() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO change_log (txid, entity, row_id, op)
+            SELECT DISTINCT pg_current_xact_id()::text::bigint, 'subnets', subnet_id, 'update'
+            FROM changed_rows;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in SYNCED_TABLES + ["subnet_reserved_ranges"]:
+        function = "log_reserved_range_changes" if table == "subnet_reserved_ranges" else "log_row_changes"
+        for operation, referencing in OPERATIONS.items():
+            op.execute(f"""
+                CREATE TRIGGER {table}_log_{operation.lower()}
+                AFTER {operation} ON {table}
+                REFERENCING {referencing}
+                FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+            """)
+
+
+def downgrade() -> None:
+    for table in SYNCED_TABLES + ["subnet_reserved_ranges"]:
+        for operation in OPERATIONS:
+            op.execute(f"DROP TRIGGER {table}_log_{operation.lower()} ON {table}")
+    op.execute("DROP FUNCTION log_reserved_range_changes()")
+    op.execute("DROP FUNCTION log_row_changes()")
+    op.drop_table('change_log_horizon')
+    op.drop_index('ix_change_log_changed_at', table_name='change_log')
+    op.drop_index('ix_change_log_txid_id', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,50 @@
+"""Notify change_log listeners from the change log triggers
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-01-12 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOG_FUNCTIONS = {
+    "log_row_changes": """
+        INSERT INTO change_log (txid, entity, row_id, op)
+        SELECT pg_current_xact_id()::text::bigint, TG_TABLE_NAME, id, lower(TG_OP)
+        FROM changed_rows;
+    """,
+    "log_reserved_range_changes": """
+        INSERT INTO change_log (txid, entity, row_id, op)
+        SELECT DISTINCT pg_current_xact_id()::text::bigint, 'subnets', subnet_id, 'update'
+        FROM changed_rows;
+    """,
+}
+
+
+def _replace_function(name: str, body: str) -> None:
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$
+        BEGIN
+            {body}
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def upgrade() -> None:
+    # Delivered on commit and folded into one notification per transaction
+    for name, body in LOG_FUNCTIONS.items():
+        _replace_function(name, body + "PERFORM pg_notify('change_log', '');")
+
+
+def downgrade() -> None:
+    for name, body in LOG_FUNCTIONS.items():
+        _replace_function(name, body)
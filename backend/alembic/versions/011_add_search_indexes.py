@@ -0,0 +1,40 @@
+"""Add pg_trgm indexes for search
+
+Revision ID: 011
+Revises: 010
+Create Date: 2025-01-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index name -> (table, indexed expression); app.search queries the same expressions
+SEARCH_INDEXES = {
+    "ix_hosts_hostname_trgm": ("hosts", "hostname"),
+    "ix_servers_hostname_trgm": ("servers", "hostname"),
+    "ix_servers_serial_number_trgm": ("servers", "serial_number"),
+    "ix_ip_addresses_address_trgm": ("ip_addresses", "host(address)"),
+    "ix_persons_name_trgm": ("persons", "name"),
+    "ix_persons_email_trgm": ("persons", "email"),
+    "ix_datacenters_name_trgm": ("datacenters", "name"),
+}
+
+
+def upgrade() -> None:
+    # Trusted extension: the database owner can create it
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # GIN serves both substring (ILIKE '%q%') and similarity (%) matches
+    for name, (table, expression) in SEARCH_INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON {table} USING gin (({expression}) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    for name in SEARCH_INDEXES:
+        op.execute(f"DROP INDEX {name}")
+    # The extension stays: other objects may have come to depend on it
@@ -0,0 +1,42 @@
+"""Switch the search indexes to GiST
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-01-20 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index name -> (table, indexed expression); app.search queries the same expressions
+SEARCH_INDEXES = {
+    "ix_hosts_hostname_trgm": ("hosts", "hostname"),
+    "ix_servers_hostname_trgm": ("servers", "hostname"),
+    "ix_servers_serial_number_trgm": ("servers", "serial_number"),
+    "ix_ip_addresses_address_trgm": ("ip_addresses", "host(address)"),
+    "ix_persons_name_trgm": ("persons", "name"),
+    "ix_persons_email_trgm": ("persons", "email"),
+    "ix_datacenters_name_trgm": ("datacenters", "name"),
+}
+
+
+def _recreate(method: str, opclass: str) -> None:
+    for name, (table, expression) in SEARCH_INDEXES.items():
+        op.execute(f"DROP INDEX {name}")
+        op.execute(f"CREATE INDEX {name} ON {table} USING {method} (({expression}) {opclass})")
+
+
+def upgrade() -> None:
+    # GiST also serves ORDER BY field <-> q, so the nearest matches are read
+    # in order and a search stops after its limit instead of scoring them all
+    _recreate("gist", "gist_trgm_ops")
+
+
+def downgrade() -> None:
+    _recreate("gin", "gin_trgm_ops")
@@ -0,0 +1,37 @@
+"""Add import_progress for running imports
+
+Revision ID: 013
+Revises: 012
+Create Date: 2025-01-21 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per running import, written outside of the import's transaction
+    # so that every worker sees it; the backend columns identify the importing session
+    op.create_table(
+        'import_progress',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('format', sa.String(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('received_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('staged', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('merging', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('backend_pid', sa.Integer(), nullable=False),
+        sa.Column('backend_start', sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('import_progress')
@@ -0,0 +1,183 @@
+"""Effective access: assignments inherited along Datacenter -> Server -> Host -> IP.
+
+An assignment on an entity also applies to everything below it, so the
+people who can touch a host are those assigned to the host, its server or its
+datacenter. Both directions are answered by one recursive CTE over
+``entity_edges``, the child -> parent links between the entity tables:
+
+- ``entity_access`` walks up from one entity to its ancestors and joins their
+  assignments through the ``(entity_type, entity_id)`` index; a handful of
+  primary-key and index lookups, whatever the size of the inventory.
+- ``person_access`` starts from a person's assignments and walks down through
+  the foreign-key indexes, aggregating and paginating in SQL.
+
+The effective role of a person on an entity is the strongest of their grants
+(``owner`` > ``admin`` > ``operator`` > ``viewer``, the order of the
+``assignmentrole`` enum, so ``min()`` picks it).
+"""
+from typing import List, Optional, Sequence
+
+from sqlalchemy import String, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app import crud, models
+
+EntityType = models.EntityType
+
+ENTITY_MODELS = {
+    EntityType.datacenter: models.Datacenter,
+    EntityType.server: models.Server,
+    EntityType.host: models.Host,
+    EntityType.ip: models.IPAddress,
+}
+
+ENTITY_LABELS = {
+    EntityType.datacenter: "Datacenter",
+    EntityType.server: "Server",
+    EntityType.host: "Host",
+    EntityType.ip: "IP address",
+}
+
+# Tables whose changes can alter effective access, for conditional GET
+ACCESS_TABLES = ("assignments", "persons", "datacenters", "servers", "hosts", "ip_addresses")
+
+_ENTITY_TYPE = models.Assignment.entity_type.type
+
+
+def _entity_type(value: EntityType):
+    # Typed, so the CTE columns compare with assignments.entity_type
+    return cast(literal(value.value), _ENTITY_TYPE)
+
+
+def _entity_edges():
+    """Child -> parent links of the hierarchy, one UNION ALL branch per level."""
+    return union_all(
+        select(
+            _entity_type(EntityType.server).label("child_type"),
+            models.Server.id.label("child_id"),
+            _entity_type(EntityType.datacenter).label("parent_type"),
+            models.Server.datacenter_id.label("parent_id"),
+        ),
+        select(
+            _entity_type(EntityType.host), models.Host.id,
+            _entity_type(EntityType.server), models.Host.server_id,
+        ),
+        select(
+            _entity_type(EntityType.ip), models.IPAddress.id,
+            _entity_type(EntityType.host), models.IPAddress.host_id,
+        ),
+        # Unassigned IPs give a NULL parent, which matches nothing; filtering it
+        # out would keep the planner from pushing the join into each branch
+    ).cte("entity_edges")
+
+
+def _grant(assignment_id, role, entity_type, entity_id, inherited) -> dict:
+    return {
+        "assignment_id": assignment_id,
+        "role": role,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "inherited": inherited,
+    }
+
+
+def entity_access(db: Session, entity_type: EntityType, entity_id: str) -> dict:
+    """Everyone with access to one entity, with their effective role and the grants behind it."""
+    crud.get_or_404(db, ENTITY_MODELS[entity_type], entity_id, ENTITY_LABELS[entity_type])
+
+    edges = _entity_edges()
+    ancestors = select(
+        _entity_type(entity_type).label("entity_type"),
+        cast(literal(entity_id), String).label("entity_id"),
+    ).cte("ancestors", recursive=True)
+    ancestors = ancestors.union_all(
+        select(edges.c.parent_type, edges.c.parent_id)
+        .join(ancestors, (edges.c.child_type == ancestors.c.entity_type) & (edges.c.child_id == ancestors.c.entity_id))
+    )
+    assignment = models.Assignment
+    rows = db.execute(
+        select(
+            assignment.id, assignment.role, assignment.entity_type, assignment.entity_id,
+            models.Person.id.label("person_id"), models.Person.name, models.Person.email,
+        )
+        .join(ancestors, (assignment.entity_type == ancestors.c.entity_type) & (assignment.entity_id == ancestors.c.entity_id))
+        .join(models.Person, models.Person.id == assignment.person_id)
+        .order_by(models.Person.name, models.Person.id, assignment.role)
+    ).all()
+
+    persons = {}
+    for row in rows:
+        entry = persons.setdefault(row.person_id, {
+            "person_id": row.person_id,
+            "person_name": row.name,
+            "person_email": row.email,
+            # Rows are ordered by role, strongest first
+            "role": row.role,
+            "grants": [],
+        })
+        inherited = (row.entity_type, row.entity_id) != (entity_type, entity_id)
+        entry["grants"].append(_grant(row.id, row.role, row.entity_type, row.entity_id, inherited))
+    order = list(models.AssignmentRole)
+    return {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "persons": sorted(persons.values(), key=lambda entry: order.index(entry["role"])),
+    }
+
+
+def person_access(
+    db: Session,
+    person_id: str,
+    entity_type: Optional[Sequence[EntityType]] = None,
+    role: Optional[Sequence[models.AssignmentRole]] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[dict]:
+    """Every entity a person can touch, expanded down the hierarchy, one page at a time.
+
+    ``role`` keeps only grants with those roles (``role=owner``: everything the
+    person owns); ``entity_type`` keeps only entities of those types.
+    """
+    crud.get_or_404(db, models.Person, person_id, "Person")
+
+    assignment = models.Assignment
+    edges = _entity_edges()
+    start = select(
+        assignment.entity_type, assignment.entity_id,
+        assignment.id.label("assignment_id"), assignment.role,
+        assignment.entity_type.label("source_type"), assignment.entity_id.label("source_id"),
+    ).where(assignment.person_id == person_id)
+    if role:
+        start = start.where(assignment.role.in_(role))
+    reachable = start.cte("reachable", recursive=True)
+    reachable = reachable.union_all(
+        select(
+            edges.c.child_type, edges.c.child_id,
+            reachable.c.assignment_id, reachable.c.role,
+            reachable.c.source_type, reachable.c.source_id,
+        )
+        .join(reachable, (edges.c.parent_type == reachable.c.entity_type) & (edges.c.parent_id == reachable.c.entity_id))
+    )
+
+    grants = func.json_agg(
+        func.json_build_object(
+            "assignment_id", reachable.c.assignment_id,
+            "role", reachable.c.role,
+            "entity_type", reachable.c.source_type,
+            "entity_id", reachable.c.source_id,
+            "inherited", (reachable.c.source_type != reachable.c.entity_type) | (reachable.c.source_id != reachable.c.entity_id),
+        )
+    )
+    query = (
+        select(
+            reachable.c.entity_type, reachable.c.entity_id,
+            func.min(reachable.c.role).label("role"), grants.label("grants"),
+        )
+        .group_by(reachable.c.entity_type, reachable.c.entity_id)
+        .order_by(reachable.c.entity_type, reachable.c.entity_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    if entity_type:
+        query = query.where(reachable.c.entity_type.in_(entity_type))
+    return [row._asdict() for row in db.execute(query)]
@@ -0,0 +1,164 @@
+import re
+from typing import Callable, List, Literal, Sequence, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.integrity import delete_assignments
+from app.models import generate_id
+
+ConflictAction = Literal["error", "skip"]
+
+# (position in the request, row id, statement parameters)
+Entry = Tuple[int, str, object]
+
+
+def _db_error(exc: DBAPIError) -> str:
+    # asyncpg errors are prefixed with the name of their exception class
+    message = re.sub(r"^<class '[\w.]+'>: ", "", str(exc.orig))
+    return " ".join(message.split())
+
+
+def _reject(db: Session, errors: Sequence[schemas.BulkError]):
+    """Roll everything back and fail the request with the per-row errors."""
+    db.rollback()
+    errors = sorted(errors, key=lambda error: error.index)
+    raise HTTPException(status_code=409, detail=[error.model_dump() for error in errors])
+
+
+def _apply(
+    db: Session,
+    entries: Sequence[Entry],
+    run: Callable[[List], List[str]],
+    atomic: bool,
+) -> Tuple[List[str], List[schemas.BulkError]]:
+    """Run ``run`` over the parameters of all ``entries`` as one batch.
+
+    In all-or-nothing mode a failing batch aborts the request with the database
+    error. Otherwise each row is retried in its own savepoint so that the
+    offending rows can be reported by index while the others still apply.
+    """
+    if not entries:
+        return [], []
+    try:
+        with db.begin_nested():
+            return list(run([params for _, _, params in entries])), []
+    except DBAPIError as exc:
+        if atomic:
+            db.rollback()
+            raise HTTPException(status_code=409, detail=_db_error(exc))
+
+    done: List[str] = []
+    errors: List[schemas.BulkError] = []
+    for index, id, params in entries:
+        try:
+            with db.begin_nested():
+                done.extend(run([params]))
+        except DBAPIError as exc:
+            errors.append(schemas.BulkError(index=index, id=id, detail=_db_error(exc)))
+    return done, errors
+
+
+def _finish(
+    db: Session,
+    done: List[str],
+    errors: List[schemas.BulkError],
+    skipped: Sequence[schemas.BulkError] = (),
+) -> schemas.BulkResult:
+    """Commit the rows that applied and report the rest."""
+    db.commit()
+    errors = sorted([*errors, *skipped], key=lambda error: error.index)
+    return schemas.BulkResult(ids=done, errors=errors)
+
+
+def _split_missing(db: Session, model, ids: Sequence[str]) -> Tuple[List[int], List[schemas.BulkError]]:
+    """Look up ``ids`` in one query; return the positions found and errors for the rest."""
+    existing = set(db.scalars(select(model.id).where(model.id.in_(set(ids)))))
+    found, not_found = [], []
+    for index, id in enumerate(ids):
+        if id in existing:
+            found.append(index)
+        else:
+            not_found.append(schemas.BulkError(index=index, id=id, detail="Not found"))
+    return found, not_found
+
+
+def bulk_create(
+    db: Session,
+    model,
+    items: Sequence[BaseModel],
+    atomic: bool = True,
+    on_conflict: ConflictAction = "error",
+) -> schemas.BulkResult:
+    """Insert ``items`` with batched multi-row INSERT ... RETURNING statements.
+
+    Ids are generated up front, so no refresh query is needed afterwards. With
+    ``on_conflict="skip"`` rows hitting a unique constraint are left out through
+    ``ON CONFLICT DO NOTHING`` and reported without failing the batch.
+    """
+    table = model.__table__
+    entries = []
+    for index, item in enumerate(items):
+        id = generate_id()
+        entries.append((index, id, {"id": id, **item.model_dump()}))
+
+    stmt = insert(table)
+    if on_conflict == "skip":
+        stmt = stmt.on_conflict_do_nothing()
+    stmt = stmt.returning(table.c.id)
+
+    done, errors = _apply(db, entries, lambda params: db.execute(stmt, params).scalars().all(), atomic)
+
+    skipped = []
+    if on_conflict == "skip":
+        inserted = set(done)
+        failed = {error.index for error in errors}
+        skipped = [
+            schemas.BulkError(index=index, id=id, detail="Skipped: conflicts with an existing row")
+            for index, id, _ in entries
+            if id not in inserted and index not in failed
+        ]
+    return _finish(db, done, errors, skipped)
+
+
+def bulk_update(db: Session, model, items: Sequence[BaseModel], atomic: bool = True) -> schemas.BulkResult:
+    """Update rows by id with one executemany UPDATE."""
+    table = model.__table__
+    rows = [item.model_dump() for item in items]
+    ids = [row.pop("id") for row in rows]
+    found, not_found = _split_missing(db, model, ids)
+    if not_found and atomic:
+        _reject(db, not_found)
+    entries = [(index, ids[index], {"b_id": ids[index], **rows[index]}) for index in found]
+
+    stmt = update(table).where(table.c.id == bindparam("b_id"))
+
+    def run(params):
+        db.execute(stmt, params)
+        return [row["b_id"] for row in params]
+
+    done, errors = _apply(db, entries, run, atomic)
+    return _finish(db, done, not_found + errors)
+
+
+def bulk_delete(db: Session, model, ids: Sequence[str], atomic: bool = True) -> schemas.BulkResult:
+    """Delete rows by id, and the assignments on them, with one DELETE ... WHERE id IN (...) each."""
+    table = model.__table__
+    found, not_found = _split_missing(db, model, ids)
+    if not_found and atomic:
+        _reject(db, not_found)
+    entries = [(index, ids[index], ids[index]) for index in found]
+
+    def run(params):
+        deleted = db.execute(delete(table).where(table.c.id.in_(params)).returning(table.c.id)).scalars().all()
+        # No foreign key covers assignments, so they go in the same batch
+        delete_assignments(db, model, deleted)
+        return deleted
+
+    done, errors = _apply(db, entries, run, atomic)
+    return _finish(db, done, not_found + errors)
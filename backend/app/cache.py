@@ -0,0 +1,270 @@
+"""Response cache for read endpoints of rarely changing reference data.
+
+Routers opt in with ``APIRouter(route_class=CachedRoute)`` and mark their
+cacheable GET handlers with ``@cached(namespace)``. The route serves a cached
+response before any dependency runs, so a hit never opens a database session.
+It also answers ``If-None-Match`` and ``If-Modified-Since`` from the cached
+validators. Write handlers call ``await invalidate(namespace)`` once their
+change is committed.
+
+Every namespace carries a generation number that ``invalidate`` bumps. A
+response is only stored if the generation has not moved since the lookup, so a
+read that raced with a write cannot put pre-write data back in the cache.
+Cache fills read from the primary rather than a replica for the same reason.
+
+Backends (``CACHE_BACKEND``):
+
+- ``memory`` (default): an LRU of ``CACHE_MAX_ENTRIES`` responses per worker.
+  Invalidations only reach the worker that handled the write; other workers
+  catch up within ``CACHE_TTL``.
+- ``redis``: one cache shared by all workers at ``CACHE_REDIS_URL`` (any
+  Redis-compatible server; needs the ``redis`` package).
+- ``none``: disabled.
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.versions import not_modified
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Response headers worth replaying on a hit
+_CACHED_HEADERS = {"content-type", "etag", "last-modified", "cache-control", "x-next-cursor"}
+
+
+class CacheEntry(NamedTuple):
+    status_code: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    expires_at: float
+
+    @classmethod
+    def from_response(cls, response: Response, ttl: int) -> "CacheEntry":
+        headers = [(name, value) for name, value in response.headers.items() if name in _CACHED_HEADERS]
+        return cls(response.status_code, headers, response.body, time.time() + ttl)
+
+    def encode(self) -> bytes:
+        # Header JSON never contains a raw newline, so it can prefix the body
+        meta = orjson.dumps([self.status_code, self.headers, self.expires_at])
+        return meta + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CacheEntry":
+        meta, _, body = data.partition(b"\n")
+        status_code, headers, expires_at = orjson.loads(meta)
+        return cls(status_code, [tuple(header) for header in headers], body, expires_at)
+
+    def to_response(self, request: Request) -> Response:
+        headers = dict(self.headers)
+        if not_modified(request, headers.get("etag"), headers.get("last-modified")):
+            headers.pop("content-type", None)
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, status_code=self.status_code, headers=headers)
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+class MemoryCache:
+    """LRU + TTL cache private to this worker process."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    async def get(self, namespace: str, key: str) -> Tuple[Optional[CacheEntry], int]:
+        generation = self._generations.get(namespace, 0)
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            self.stats.misses += 1
+            return None, generation
+        if entry.expires_at <= time.time():
+            del self._entries[(namespace, key)]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None, generation
+        self._entries.move_to_end((namespace, key))
+        self.stats.hits += 1
+        return entry, generation
+
+    async def set(self, namespace: str, key: str, entry: CacheEntry, generation: int):
+        if self._generations.get(namespace, 0) != generation:
+            return
+        self._entries[(namespace, key)] = entry
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def invalidate(self, namespace: str):
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        for cached_key in [cached_key for cached_key in self._entries if cached_key[0] == namespace]:
+            del self._entries[cached_key]
+        self.stats.invalidations += 1
+
+    def status(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries}
+
+
+# Stores the entry only if the namespace generation is still the one seen at lookup
+_STORE_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class RedisCache:
+    """Cache shared by all workers; one hash of entries per namespace.
+
+    Errors talking to Redis are logged and treated as misses, so the API keeps
+    working (uncached) while Redis is unavailable.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl: int):
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._errors = (redis.RedisError, OSError)
+        self._redis = redis.from_url(url)
+        self._store = self._redis.register_script(_STORE_SCRIPT)
+
+    @staticmethod
+    def _keys(namespace: str) -> Tuple[str, str]:
+        return f"assetcompass:cache:{namespace}", f"assetcompass:cache:{namespace}:generation"
+
+    async def get(self, namespace: str, key: str) -> Tuple[Optional[CacheEntry], int]:
+        entries, generation_key = self._keys(namespace)
+        try:
+            data, generation = await self._redis.pipeline(transaction=False).hget(entries, key).get(generation_key).execute()
+        except self._errors:
+            logger.exception("Reading the response cache failed")
+            self.stats.errors += 1
+            return None, -1
+        generation = int(generation or 0)
+        entry = CacheEntry.decode(data) if data is not None else None
+        if entry is not None and entry.expires_at <= time.time():
+            self.stats.expirations += 1
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return entry, generation
+
+    async def set(self, namespace: str, key: str, entry: CacheEntry, generation: int):
+        if generation < 0:
+            return
+        try:
+            await self._store(keys=list(self._keys(namespace)), args=[key, entry.encode(), generation, self.ttl])
+        except self._errors:
+            logger.exception("Writing the response cache failed")
+            self.stats.errors += 1
+
+    async def invalidate(self, namespace: str):
+        entries, generation_key = self._keys(namespace)
+        try:
+            await self._redis.pipeline(transaction=True).incr(generation_key).delete(entries).execute()
+        except self._errors:
+            logger.exception("Invalidating the response cache failed")
+            self.stats.errors += 1
+            return
+        self.stats.invalidations += 1
+
+    def status(self) -> dict:
+        return {}
+
+
+def _create_cache():
+    if CACHE_BACKEND == "none":
+        return None
+    if CACHE_BACKEND == "redis":
+        return RedisCache(CACHE_REDIS_URL, CACHE_TTL)
+    return MemoryCache(CACHE_MAX_ENTRIES, CACHE_TTL)
+
+
+cache = _create_cache()
+
+
+def cached(namespace: str):
+    """Mark a GET handler of a ``CachedRoute`` router as cacheable under ``namespace``."""
+
+    def mark(endpoint):
+        endpoint.cache_namespace = namespace
+        return endpoint
+
+    return mark
+
+
+async def invalidate(namespace: str):
+    """Drop every cached response of ``namespace``; call after committing a write."""
+    if cache is not None:
+        await cache.invalidate(namespace)
+
+
+def cache_status() -> dict:
+    if cache is None:
+        return {"backend": "none"}
+    return {"backend": cache.name, "ttl": cache.ttl, **cache.status(), **cache.stats.as_dict()}
+
+
+def _request_key(request: Request) -> str:
+    return request.url.path + "?" + urlencode(sorted(request.query_params.multi_items()))
+
+
+class CachedRoute(APIRoute):
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        namespace = getattr(self.endpoint, "cache_namespace", None)
+        if namespace is None or cache is None:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            key = _request_key(request)
+            entry, generation = await cache.get(namespace, key)
+            if entry is not None:
+                return entry.to_response(request)
+            request.state.read_primary = True
+            response = await handler(request)
+            # Without Last-Modified next to the ETag the last write is still within
+            # this second; a copy stored now would go without that date for its TTL
+            complete = "etag" not in response.headers or "last-modified" in response.headers
+            if response.status_code == 200 and hasattr(response, "body") and complete:
+                await cache.set(namespace, key, CacheEntry.from_response(response, cache.ttl), generation)
+            return response
+
+        return cached_handler
@@ -0,0 +1,48 @@
+from typing import Sequence
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.serialization import field_columns
+
+
+def get_or_404(db: Session, model, id: str, label: str):
+    """Fetch one row by primary key or raise 404 "<label> not found"."""
+    item = db.get(model, id)
+    if not item:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    return item
+
+
+def get_fields_or_404(db: Session, model, names: Sequence[str], id: str, label: str):
+    """Fetch the columns behind ``names`` of one row as a tuple, or raise 404."""
+    row = db.execute(select(*field_columns(model, names)).where(model.id == id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    return row
+
+
+def create(db: Session, model, data: BaseModel):
+    item = model(**data.model_dump())
+    db.add(item)
+    db.commit()
+    db.refresh(item)
+    return item
+
+
+def update(db: Session, model, id: str, data: BaseModel, label: str):
+    item = get_or_404(db, model, id, label)
+    for key, value in data.model_dump().items():
+        setattr(item, key, value)
+    db.commit()
+    db.refresh(item)
+    return item
+
+
+def delete(db: Session, model, id: str, label: str):
+    item = get_or_404(db, model, id, label)
+    db.delete(item)
+    db.commit()
+    return {"message": f"{label} deleted"}
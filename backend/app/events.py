@@ -0,0 +1,259 @@
+"""Live change feed: the incremental sync log streamed as Server-Sent Events.
+
+``GET /api/events`` keeps a connection open and sends one ``change`` event per
+inserted, updated or deleted row, in the same shape as ``/api/sync``, so a page
+can patch the rows it shows instead of reloading the collection. The events
+come from ``change_log`` (see ``app.sync``) rather than from the write handlers,
+so imports, bulk writes and changes made by other workers are included.
+
+The change log triggers send ``NOTIFY change_log`` (migration 010). Each worker
+keeps one ``LISTEN`` connection, and on every notification reads the new log
+entries once, with their rows, and hands the page to all of its open streams;
+each stream filters it by its own entities and ids. A stream only reads the
+log itself to catch up: from the token it was opened with, or when it fell
+behind the shared pages. The worker also reads every ``EVENTS_POLL_INTERVAL``
+seconds, which covers notifications lost while the listener reconnects, and
+idle streams send a keepalive as often, for the sake of proxies.
+
+The SSE ``id`` of an event is a sync token, so a browser ``EventSource`` that
+reconnects resumes where it stopped via ``Last-Event-ID``.
+"""
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import AsyncIterator, Deque, Optional, Sequence, Set, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.database import SessionLocal, engine
+from app.serialization import JSON_OPTIONS
+from app.sync import SYNC_ENTITIES, changes_since, check_token, current_token, decode_token
+
+logger = logging.getLogger(__name__)
+
+# Seconds between wake-ups of an idle stream
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "15"))
+EVENTS_PAGE_SIZE = 500
+# Shared pages a stream may have pending before it is left to catch up by itself
+EVENTS_MAX_PENDING = 100
+# Milliseconds an EventSource waits before reconnecting
+_RETRY_MS = 3000
+_CHANNEL = "change_log"
+
+
+# (token the page starts after, page as returned by changes_since)
+SharedPage = Tuple[str, dict]
+
+
+class Subscription:
+    """Shared pages of changes waiting to be sent by one event stream."""
+
+    def __init__(self):
+        self.pages: Deque[SharedPage] = deque()
+        self.ready = asyncio.Event()
+        # Pages were dropped: the stream has to read the log itself again
+        self.overflowed = False
+
+    def put(self, page: SharedPage):
+        if len(self.pages) >= EVENTS_MAX_PENDING:
+            self.pages.clear()
+            self.overflowed = True
+        else:
+            self.pages.append(page)
+        self.ready.set()
+
+
+class ChangeNotifier:
+    """Reads ``change_log`` once per change for all of this worker's event streams."""
+
+    def __init__(self):
+        self._changed = asyncio.Event()
+        self._subscriptions: Set[Subscription] = set()
+        # Position of the pages handed out so far; None while nobody listens
+        self._token: Optional[str] = None
+
+    def notify(self):
+        self._changed.set()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription()
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+
+    def caught_up(self, token: str):
+        """A stream has read up to ``token``: share pages from there if nothing is shared yet."""
+        if self._token is None:
+            self._token = token
+
+    async def publish(self):
+        """Background task reading new changes after each notification and handing them out."""
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), EVENTS_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            if not self._subscriptions:
+                # Streams opened later catch up by themselves, so start from "now" again
+                self._token = None
+                continue
+            try:
+                await self._read()
+            except Exception:
+                logger.exception("Reading the change log failed")
+
+    async def _read(self):
+        if self._token is None:
+            self._token = await run_in_threadpool(_read, current_token)
+        while True:
+            page = await run_in_threadpool(_read, changes_since, self._token, EVENTS_PAGE_SIZE)
+            if page["next"] != self._token:
+                for subscription in self._subscriptions:
+                    subscription.put((self._token, page))
+            self._token = page["next"]
+            if not page["has_more"]:
+                return
+
+    @staticmethod
+    def _connect():
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        connection = engine.dialect.dbapi.connect(*cargs, **cparams)
+        connection.autocommit = True
+        connection.cursor().execute(f"LISTEN {_CHANNEL}")
+        return connection
+
+    async def listen(self):
+        """Background task holding the ``LISTEN`` connection, reconnecting on failure."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                connection = await run_in_threadpool(self._connect)
+            except Exception:
+                logger.exception("Connecting the change listener failed")
+                await asyncio.sleep(EVENTS_POLL_INTERVAL)
+                continue
+
+            lost = loop.create_future()
+
+            def on_readable():
+                try:
+                    connection.poll()
+                except Exception:
+                    if not lost.done():
+                        lost.set_result(None)
+                    return
+                if connection.notifies:
+                    connection.notifies.clear()
+                    self.notify()
+
+            loop.add_reader(connection.fileno(), on_readable)
+            try:
+                await lost
+                logger.warning("Change listener connection lost; reconnecting")
+            finally:
+                loop.remove_reader(connection.fileno())
+                connection.close()
+            # Changes may have been committed while nobody was listening
+            self.notify()
+
+
+notifier = ChangeNotifier()
+
+
+def _read(function, *args):
+    db = SessionLocal()
+    try:
+        return function(db, *args)
+    finally:
+        db.close()
+
+
+async def start_token(since: Optional[str]) -> str:
+    """``since`` once checked, or the token for "now" without one."""
+    if since is None:
+        return await run_in_threadpool(_read, current_token)
+    await run_in_threadpool(_read, check_token, since)
+    return since
+
+
+def _encode(page: dict) -> str:
+    events = []
+    for number, change in enumerate(page["changes"], start=1):
+        # Only the last event of a page carries the token; a client that drops
+        # mid-page gets the whole page again, and changes are idempotent
+        event_id = f"id: {page['next']}\n" if number == len(page["changes"]) else ""
+        events.append(f"event: change\n{event_id}data: {orjson.dumps(change, option=JSON_OPTIONS).decode()}\n\n")
+    return "".join(events)
+
+
+def _matching(page: dict, entities: Optional[Set[str]], ids: Optional[Set[str]]) -> dict:
+    """``page`` with only the changes a stream asked for."""
+    if entities is None and ids is None:
+        return page
+    changes = [
+        change for change in page["changes"]
+        if (entities is None or change["entity"] in entities) and (ids is None or change["id"] in ids)
+    ]
+    return {**page, "changes": changes}
+
+
+async def change_events(
+    request: Request,
+    token: str,
+    tables: Optional[Sequence[str]],
+    ids: Optional[Sequence[str]],
+) -> AsyncIterator[str]:
+    """SSE stream of the changes after ``token`` matching ``tables`` and ``ids``."""
+    entities = {SYNC_ENTITIES[table][0] for table in tables} if tables else None
+    wanted_ids = set(ids) if ids else None
+    yield f"retry: {_RETRY_MS}\n\n"
+    # Subscribed before catching up, so no shared page is missed in between
+    subscription = notifier.subscribe()
+    caught_up = False
+    try:
+        while True:
+            if not caught_up:
+                page = await run_in_threadpool(_read, changes_since, token, EVENTS_PAGE_SIZE, tables, ids)
+                caught_up = not page["has_more"]
+                if caught_up:
+                    notifier.caught_up(page["next"])
+            elif subscription.overflowed:
+                subscription.overflowed = False
+                caught_up = False
+                continue
+            elif subscription.pages:
+                start, page = subscription.pages.popleft()
+                if decode_token(page["next"]) <= decode_token(token):
+                    # Already sent while catching up
+                    continue
+                if decode_token(start) > decode_token(token):
+                    # Changes between our position and this page were not shared with us
+                    caught_up = False
+                    continue
+                # A page overlapping what was already sent repeats some changes; they are idempotent
+                page = _matching(page, entities, wanted_ids)
+            else:
+                if await request.is_disconnected():
+                    return
+                if not subscription.pages and not subscription.overflowed:
+                    subscription.ready.clear()
+                    try:
+                        await asyncio.wait_for(subscription.ready.wait(), EVENTS_POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                continue
+
+            if page["changes"]:
+                yield _encode(page)
+            elif page["next"] != token:
+                # Nothing matched, but the position moved: keep Last-Event-ID current
+                yield f"id: {page['next']}\n\n"
+            token = page["next"]
+    finally:
+        notifier.unsubscribe(subscription)
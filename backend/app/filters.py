@@ -0,0 +1,42 @@
+import ipaddress
+from typing import Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import cast
+from sqlalchemy.dialects.postgresql import INET
+
+
+def filter_in(query, column, values: Optional[Sequence]):
+    """Restrict ``query`` to rows whose ``column`` matches one of ``values``.
+
+    A missing or empty list leaves the query untouched, so every filter
+    parameter on the list endpoints is optional.
+    """
+    if not values:
+        return query
+    if len(values) == 1:
+        return query.filter(column == values[0])
+    return query.filter(column.in_(values))
+
+
+def filter_null(query, column, present: Optional[bool]):
+    """Restrict ``query`` to rows where ``column`` is set (``True``) or NULL (``False``)."""
+    if present is None:
+        return query
+    return query.filter(column.isnot(None) if present else column.is_(None))
+
+
+def filter_network(query, column, operator: str, network: Optional[str]):
+    """Compare an ``inet`` ``column`` to ``network`` with a PostgreSQL network operator.
+
+    ``<<=`` keeps addresses inside ``network``, ``>>=`` keeps rows whose
+    address (with its prefix length) contains ``network``. Both are served by
+    the GiST index on the column.
+    """
+    if network is None:
+        return query
+    try:
+        ipaddress.ip_network(network, strict=False)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid network: {network}")
+    return query.filter(column.op(operator)(cast(network, INET)))
@@ -0,0 +1,366 @@
+"""Bulk import of CSV / NDJSON files through PostgreSQL COPY.
+
+Rows are read in chunks, validated against the entity's create schema and
+streamed with ``COPY ... FROM STDIN`` into a temporary staging table. Once the
+whole file is staged, rows with dangling foreign keys are reported and dropped
+with set-based anti-joins, and the rest is merged into the real table with
+``INSERT ... SELECT ... ON CONFLICT DO UPDATE`` (rows without an id, which can
+only be new, with a plain ``INSERT ... SELECT``). Progress is published in
+``import_progress`` so that every worker can list running imports.
+
+Usage::
+
+    python -m app.importer hosts hosts.csv
+    python -m app.importer ip-addresses ips.ndjson --format ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+from itertools import islice
+from typing import IO, Callable, Dict, Iterator, List, Literal, Optional, Tuple, Type
+
+import psycopg2
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import (
+    BigInteger, Boolean, Column, DateTime, Integer, MetaData, String, Table, column, delete, exists, func, not_, select,
+    table, update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.database import disable_statement_timeout
+
+logger = logging.getLogger(__name__)
+
+ImportFormat = Literal["csv", "ndjson"]
+
+DEFAULT_CHUNK_SIZE = 50_000
+MAX_REPORTED_ERRORS = 1000
+# Rows validated per TypeAdapter call
+VALIDATION_BATCH_SIZE = 100
+
+
+class ImportConflict(Exception):
+    """The staged rows could not be merged as a whole, e.g. an id clashes with another unique key."""
+
+
+class ImportTarget:
+    def __init__(self, model, schema: Type[BaseModel], conflict_key: str = "id"):
+        self.model = model
+        self.schema = schema
+        # Natural key used to match existing rows when the file carries no ids
+        self.conflict_key = conflict_key
+
+    @property
+    def table(self):
+        return self.model.__table__
+
+    @property
+    def columns(self) -> List[str]:
+        return ["id", *self.schema.model_fields]
+
+
+IMPORT_TARGETS: Dict[str, ImportTarget] = {
+    "datacenters": ImportTarget(models.Datacenter, schemas.DatacenterCreate),
+    "servers": ImportTarget(models.Server, schemas.ServerCreate),
+    "hosts": ImportTarget(models.Host, schemas.HostCreate),
+    "ip-addresses": ImportTarget(models.IPAddress, schemas.IPAddressCreate, conflict_key="address"),
+    "operating-systems": ImportTarget(models.OperatingSystem, schemas.OperatingSystemCreate),
+    "persons": ImportTarget(models.Person, schemas.PersonCreate, conflict_key="email"),
+    "assignments": ImportTarget(models.Assignment, schemas.AssignmentCreate),
+}
+
+
+# Kept out of Base.metadata: the table comes from migration 013
+import_progress = Table(
+    "import_progress",
+    MetaData(),
+    Column("id", String, primary_key=True),
+    Column("entity", String),
+    Column("format", String),
+    Column("started_at", DateTime(timezone=True)),
+    Column("received_bytes", BigInteger),
+    Column("staged", BigInteger),
+    Column("merging", Boolean),
+    Column("backend_pid", Integer),
+    Column("backend_start", DateTime(timezone=True)),
+)
+_activity = table("pg_stat_activity", column("pid"), column("backend_start"))
+# The importing session is still connected (a backend that reused its pid started later)
+_alive = exists().where(
+    _activity.c.pid == import_progress.c.backend_pid,
+    _activity.c.backend_start == import_progress.c.backend_start,
+)
+
+
+class ProgressTracker:
+    """Publishes one import's progress in ``import_progress``, where every worker can read it.
+
+    Writes go through their own autocommit connection, since the import's
+    transaction only commits once the merge is done. The row names the
+    importing session's backend, so an import whose worker died drops out of
+    ``running_imports`` with its connection.
+    """
+
+    def __init__(self, db: Session, progress: schemas.ImportProgress):
+        self.db = db
+        self.progress = progress
+        self._backend = {}
+
+    def _write(self, statement):
+        with self.db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(statement)
+
+    def start(self):
+        backend = select(_activity.c.pid, _activity.c.backend_start).where(_activity.c.pid == func.pg_backend_pid())
+        pid, started = self.db.execute(backend).one()
+        self._backend = {"backend_pid": pid, "backend_start": started}
+        values = {**self.progress.model_dump(), **self._backend}
+        self._write(delete(import_progress).where(not_(_alive)))
+        self._write(insert(import_progress).values(values).on_conflict_do_update(index_elements=["id"], set_=values))
+
+    def update(self, **changes):
+        for name, value in changes.items():
+            setattr(self.progress, name, value)
+        self._write(update(import_progress).where(import_progress.c.id == self.progress.id).values(changes))
+
+    def finish(self):
+        self._write(delete(import_progress).where(
+            import_progress.c.id == self.progress.id, import_progress.c.backend_pid == self._backend["backend_pid"],
+        ))
+
+
+def running_imports(db: Session) -> List[schemas.ImportProgress]:
+    """Imports running in any worker, oldest first."""
+    columns = [import_progress.c[name] for name in schemas.ImportProgress.model_fields]
+    rows = db.execute(select(*columns).where(_alive).order_by(import_progress.c.started_at)).all()
+    return [schemas.ImportProgress.model_validate(row._asdict()) for row in rows]
+
+
+def _read_csv(stream: IO[str]) -> Iterator[Tuple[int, dict]]:
+    reader = csv.reader(stream)
+    header = next(reader, [])
+    for row in reader:
+        if not row:
+            continue
+        if "" in row:
+            # Empty cells stand for missing optional values
+            yield reader.line_num, {key: value for key, value in zip(header, row) if value != ""}
+        else:
+            yield reader.line_num, dict(zip(header, row))
+
+
+def _read_ndjson(stream: IO[str]) -> Iterator[Tuple[int, dict]]:
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, exc
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text(columns: List[list]) -> str:
+    """Rows, given column by column, in COPY text format.
+
+    Each column is converted and checked for characters that need escaping
+    as a whole, so the common case never touches values one at a time.
+    """
+    texts = []
+    for values in columns:
+        converted = list(map(str, values))
+        joined = "".join(converted)
+        if "\\" in joined or "\t" in joined or "\n" in joined or "\r" in joined:
+            converted = [text.translate(_COPY_ESCAPES) for text in converted]
+        if None in values:
+            converted = ["\\N" if value is None else text for value, text in zip(values, converted)]
+        texts.append(converted)
+    text = "\n".join(map("\t".join, zip(*texts)))
+    return text + "\n" if text else text
+
+
+def _error_detail(errors: List[dict]) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in errors)
+
+
+def import_rows(
+    db: Session,
+    entity: str,
+    stream: IO[str],
+    format: ImportFormat = "csv",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[int], None]] = None,
+    on_merge: Optional[Callable[[], None]] = None,
+) -> schemas.ImportResult:
+    """Stage and merge every row of ``stream`` into the table behind ``entity``.
+
+    Runs in one transaction: either all valid rows are merged or nothing is.
+    Invalid rows never abort the import; they are reported with their line
+    number instead. ``on_progress`` is called with the number of rows staged
+    after each chunk, ``on_merge`` once the whole stream is staged.
+    """
+    target = IMPORT_TARGETS[entity]
+    table = target.table.name
+    staging = f"import_{table}"
+    columns = target.columns
+    column_list = ", ".join(columns)
+
+    errors: List[schemas.ImportRowError] = []
+    failed = 0
+
+    def reject(line: int, detail: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(schemas.ImportRowError(line=line, detail=detail))
+
+    # A large file can legitimately keep COPY and the merge busy for a while
+    disable_statement_timeout(db)
+    cursor = db.connection().connection.cursor()
+    cursor.execute(
+        f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS, _line bigint) ON COMMIT DROP; "
+        f"ALTER TABLE {staging} ALTER COLUMN id DROP NOT NULL"
+    )
+
+    records = _read_csv(stream) if format == "csv" else _read_ndjson(stream)
+    adapter = TypeAdapter(List[target.schema])
+
+    def validate(lines: List[int], data: List[dict]) -> Tuple[List[int], List[dict], List[dict]]:
+        """The valid part of a batch, validated in one call, and its rows as JSON values."""
+        try:
+            items = adapter.validate_python(data)
+        except ValidationError as exc:
+            invalid: Dict[int, List[dict]] = {}
+            for error in exc.errors():
+                invalid.setdefault(error["loc"][0], []).append({**error, "loc": error["loc"][1:]})
+            for index, row_errors in invalid.items():
+                reject(lines[index], _error_detail(row_errors))
+            lines = [line for index, line in enumerate(lines) if index not in invalid]
+            data = [record for index, record in enumerate(data) if index not in invalid]
+            items = adapter.validate_python(data)
+        return lines, data, adapter.dump_python(items, mode="json")
+
+    processed = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        lines, data = [], []
+        for line, record in chunk:
+            if isinstance(record, json.JSONDecodeError):
+                reject(line, f"Invalid JSON: {record.msg}")
+            else:
+                lines.append(line)
+                data.append(record)
+        kept, ids, rows = [], [], []
+        # Short batches keep few model instances alive at a time, which keeps the GC cheap
+        for start in range(0, len(data), VALIDATION_BATCH_SIZE):
+            end = start + VALIDATION_BATCH_SIZE
+            batch_lines, batch, dumped = validate(lines[start:end], data[start:end])
+            kept += batch_lines
+            ids += [record.get("id") for record in batch]
+            rows += dumped
+        # Missing ids are generated by the merge statement
+        copied = [ids, *([row[name] for row in rows] for name in target.schema.model_fields), kept]
+        cursor.copy_expert(f"COPY {staging} ({column_list}, _line) FROM STDIN", io.StringIO(_copy_text(copied)))
+        processed += len(chunk)
+        logger.info("Staged %d %s rows", processed, entity)
+        if on_progress:
+            on_progress(processed)
+
+    if on_merge:
+        on_merge()
+
+    # Rows pointing at parents that do not exist would abort the merge
+    for fk in target.table.foreign_keys:
+        cursor.execute(
+            f"DELETE FROM {staging} s WHERE s.{fk.parent.name} IS NOT NULL AND NOT EXISTS "
+            f"(SELECT 1 FROM {fk.column.table.name} p WHERE p.{fk.column.name} = s.{fk.parent.name}) "
+            f"RETURNING s._line, s.{fk.parent.name}"
+        )
+        for line, value in cursor.fetchall():
+            reject(line, f"{fk.parent.name}: {value} does not exist")
+
+    # Later lines win when the same key appears more than once
+    key = target.conflict_key
+    staged = ", ".join("COALESCE(id, gen_random_uuid()::text) AS id" if column == "id" else column for column in columns)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column not in ("id", key))
+    if "updated_at" in target.table.c:
+        updates += ", updated_at = now()"
+    try:
+        if key == "id":
+            # Rows without an id can only be new: they skip the sort and the conflict check
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list}) "
+                f"SELECT {staged} FROM {staging} WHERE id IS NULL"
+            )
+            created = cursor.rowcount
+            source = f"{staging} WHERE id IS NOT NULL"
+        else:
+            created = 0
+            source = f"(SELECT {staged}, _line FROM {staging}) s"
+        cursor.execute(
+            f"INSERT INTO {table} ({column_list}) "
+            f"SELECT DISTINCT ON ({key}) {column_list} FROM {source} "
+            f"ORDER BY {key}, _line DESC "
+            f"ON CONFLICT ({key}) DO UPDATE SET {updates} "
+            f"RETURNING (xmax = 0)"
+        )
+    except psycopg2.Error as exc:
+        db.rollback()
+        raise ImportConflict(" ".join(str(exc).split())) from exc
+    results = [inserted for inserted, in cursor.fetchall()]
+    db.commit()
+
+    updated = results.count(False)
+    created += len(results) - updated
+    errors.sort(key=lambda error: error.line)
+    return schemas.ImportResult(
+        entity=entity,
+        processed=processed,
+        created=created,
+        updated=updated,
+        failed=failed,
+        errors=errors,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Import a CSV or NDJSON file through COPY")
+    parser.add_argument("entity", choices=sorted(IMPORT_TARGETS))
+    parser.add_argument("path", help="file to import, '-' for stdin")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    format = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    stream = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+    db = SessionLocal()
+    try:
+        result = import_rows(
+            db,
+            args.entity,
+            stream,
+            format=format,
+            chunk_size=args.chunk_size,
+            on_progress=lambda count: print(f"staged {count} rows", file=sys.stderr),
+        )
+    finally:
+        db.close()
+        stream.close()
+
+    print(result.model_dump_json(indent=2))
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Referential integrity: reference-safe deletes and a batch consistency check.
+
+``Assignment.entity_id`` points at a datacenter, server, host or IP address
+depending on ``entity_type``, which no foreign key can express. ``delete_entity``
+therefore removes an entity's assignments together with the entity, and
+``children`` decides what happens to the rows below it:
+
+- ``restrict`` (default): refuse with 409 while there are any.
+- ``cascade``: delete the whole subtree, and every assignment on it.
+- ``nullify``: detach them; only possible where the foreign key is nullable
+  (a host's IP addresses).
+
+Whatever the size of the subtree, each level costs one set-based statement,
+with the ids of the level above as a subquery.
+
+``check_integrity`` looks for assignments whose entity is gone (left by
+deletes before this module, or by imports) and for rows whose foreign key
+points at a missing row (only possible when constraints were bypassed, e.g.
+by a restore with triggers disabled). Every check is a single ``NOT EXISTS``
+anti-join, which Postgres runs as one hash join over the table rather than a
+lookup per row. ``repair`` deletes the orphaned assignments the same way.
+
+Both run behind ``/api/integrity`` and from the command line::
+
+    python -m app.integrity [--repair]
+"""
+import argparse
+import sys
+from typing import List, Literal, Optional
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import String, delete, exists, func, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.access import ENTITY_MODELS
+from app.database import Base, SessionLocal, disable_statement_timeout
+
+DeleteChildren = Literal["restrict", "cascade", "nullify"]
+
+# Ids of offending rows returned per check
+INTEGRITY_SAMPLE_SIZE = 20
+
+ENTITY_TYPES = {model: entity_type for entity_type, model in ENTITY_MODELS.items()}
+
+_assignments = models.Assignment.__table__
+
+# Parent model -> (child model, foreign key to the parent, label of the children)
+_CHILDREN = {
+    models.Datacenter: (models.Server, models.Server.__table__.c.datacenter_id, "servers"),
+    models.Server: (models.Host, models.Host.__table__.c.server_id, "hosts"),
+    models.Host: (models.IPAddress, models.IPAddress.__table__.c.host_id, "IP addresses"),
+    models.Person: (models.Assignment, _assignments.c.person_id, "assignments"),
+}
+
+# References outside the hierarchy, always detached when their target goes
+_DETACHED = {
+    models.Datacenter: [models.Subnet.__table__.c.datacenter_id],
+}
+
+
+def delete_assignments(db: Session, model, ids) -> int:
+    """Delete the assignments on the ``model`` rows with ``ids`` (a list or a subquery)."""
+    entity_type = ENTITY_TYPES.get(model)
+    if entity_type is None:
+        return 0
+    return db.execute(
+        delete(_assignments).where(_assignments.c.entity_type == entity_type, _assignments.c.entity_id.in_(ids))
+    ).rowcount
+
+
+def delete_entity(db: Session, model, id: str, label: str, children: DeleteChildren = "restrict") -> dict:
+    """Delete one row with its assignments, handling the rows below it per ``children``."""
+    crud.get_or_404(db, model, id, label)
+
+    # (model, ids) per level of the subtree to delete, top-down
+    levels = [(model, [id])]
+    if model in _CHILDREN:
+        child, parent_key, child_label = _CHILDREN[model]
+        if children == "nullify" and not parent_key.nullable:
+            raise HTTPException(status_code=400, detail=f"{child_label.capitalize()} cannot be detached from their {label.lower()}")
+        if children == "restrict":
+            count = db.scalar(select(func.count()).select_from(parent_key.table).where(parent_key == id))
+            if count:
+                options = "children=cascade or children=nullify" if parent_key.nullable else "children=cascade"
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"{label} still has {child_label} ({count}); delete them first or pass {options}",
+                )
+        elif children == "nullify":
+            db.execute(update(parent_key.table).where(parent_key == id).values({parent_key.name: None}))
+        else:
+            parent = model
+            while parent in _CHILDREN:
+                child, parent_key, _ = _CHILDREN[parent]
+                ids = select(child.__table__.c.id).where(parent_key.in_(levels[-1][1]))
+                levels.append((child, ids))
+                parent = child
+    for column in _DETACHED.get(model, []):
+        db.execute(update(column.table).where(column == id).values({column.name: None}))
+
+    deleted = {}
+    # Bottom-up, so each level's subquery still finds its parents
+    for level_model, ids in reversed(levels):
+        assignments = delete_assignments(db, level_model, ids)
+        if assignments:
+            deleted[_assignments.name] = deleted.get(_assignments.name, 0) + assignments
+        table = level_model.__table__
+        deleted[table.name] = deleted.get(table.name, 0) + db.execute(delete(table).where(table.c.id.in_(ids))).rowcount
+    db.commit()
+    return {"message": f"{label} deleted", "deleted": deleted}
+
+
+def _orphaned(model):
+    """Assignments on ``model`` whose entity no longer exists."""
+    return (
+        _assignments.c.entity_type == ENTITY_TYPES[model],
+        ~exists().where(model.__table__.c.id == _assignments.c.entity_id),
+    )
+
+
+def _check(check: str, table, column: str, references: str, where, sample_size: int):
+    return select(
+        literal(check, String).label("check"),
+        literal(table.name, String).label("table"),
+        literal(column, String).label("column"),
+        literal(references, String).label("references"),
+        func.count().label("count"),
+        func.array_agg(table.c.id)[1:sample_size].label("sample"),
+    ).where(*where)
+
+
+def check_integrity(db: Session, sample_size: int = INTEGRITY_SAMPLE_SIZE) -> dict:
+    """Counts and sample ids of orphaned assignments and broken foreign key references."""
+    # Each check reads a whole table: fast, but can outlast a request timeout
+    disable_statement_timeout(db)
+    checks = [
+        _check("orphaned_assignment", _assignments, "entity_id", model.__tablename__, _orphaned(model), sample_size)
+        for model in ENTITY_TYPES
+    ]
+    for table in Base.metadata.sorted_tables:
+        for foreign_key in table.foreign_keys:
+            column, target = foreign_key.parent, foreign_key.column
+            checks.append(_check(
+                "broken_reference", table, column.name, target.table.name,
+                (column.isnot(None), ~exists().where(target == column)), sample_size,
+            ))
+    rows = db.execute(union_all(*checks)).all()
+    results = sorted(
+        ({**row._asdict(), "sample": row.sample or []} for row in rows),
+        key=lambda result: (result["check"], result["table"], result["column"]),
+    )
+    return {"ok": not any(result["count"] for result in results), "checks": results}
+
+
+def repair(db: Session, sample_size: int = INTEGRITY_SAMPLE_SIZE) -> dict:
+    """Delete every orphaned assignment; broken references are left for a person to decide."""
+    disable_statement_timeout(db)
+    deleted = {
+        model.__tablename__: db.execute(delete(_assignments).where(*_orphaned(model))).rowcount
+        for model in ENTITY_TYPES
+    }
+    db.commit()
+    return {"deleted_assignments": deleted, "report": check_integrity(db, sample_size)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the referential integrity of the inventory")
+    parser.add_argument("--repair", action="store_true", help="delete orphaned assignments")
+    parser.add_argument("--sample-size", type=int, default=INTEGRITY_SAMPLE_SIZE, help="offending ids listed per check")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        result = repair(db, args.sample_size) if args.repair else check_integrity(db, args.sample_size)
+        db.commit()
+    finally:
+        db.close()
+
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
+    report = result["report"] if args.repair else result
+    # Non-zero while problems remain, for cron and CI
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Free address search and utilization for subnets.
+
+Addresses in use are not linked to a subnet by a foreign key: an address
+belongs to every subnet whose CIDR contains it (``address <<= cidr``, served by
+the GiST index on ``ip_addresses.address``). Free addresses are found in SQL:
+a window over the taken intervals (used addresses and reserved ranges) sorted
+by start returns the first gaps between them, so only the addresses handed
+out leave the database and the cost never depends on the size of the subnet.
+"""
+import ipaddress
+from typing import List, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import String, and_, cast, column, exists, func, text, values
+from sqlalchemy.dialects.postgresql import INET, insert
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.models import generate_id
+
+# Allocation retries when concurrent writers outside the subnet lock take an address
+MAX_ALLOCATION_ATTEMPTS = 3
+
+Interval = Tuple[int, int]
+
+
+def usable_range(network) -> Interval:
+    """First and last assignable address of ``network`` as integers.
+
+    The network address is never handed out, nor is the broadcast address of
+    IPv4 networks larger than a /31.
+    """
+    first = int(network.network_address)
+    last = int(network.broadcast_address)
+    if network.num_addresses > 2:
+        first += 1
+        if network.version == 4:
+            last -= 1
+    return first, last
+
+
+def _reserved_intervals(subnet: models.Subnet) -> List[Interval]:
+    return [
+        (int(ipaddress.ip_address(reserved.start_address)), int(ipaddress.ip_address(reserved.end_address)))
+        for reserved in subnet.reserved_ranges
+    ]
+
+
+def _merge(intervals: Sequence[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+# Gaps in the usable range between used addresses and reserved ranges, lowest
+# first. "covered" is the highest address taken by the intervals sorted before
+# each one; the CASEs keep "+ 1" and "- 1" from stepping outside the address
+# space at its edges.
+_FREE_RANGES = text("""
+    WITH bounds AS (
+        SELECT CAST(:first AS inet) AS first_address, CAST(:last AS inet) AS last_address
+    ), taken AS (
+        SELECT host(a.address)::inet AS start_address, host(a.address)::inet AS end_address
+        FROM ip_addresses a, bounds b
+        WHERE a.address <<= CAST(:cidr AS cidr)
+          AND host(a.address)::inet BETWEEN b.first_address AND b.last_address
+        UNION ALL
+        SELECT greatest(r.start_address, b.first_address), least(r.end_address, b.last_address)
+        FROM subnet_reserved_ranges r, bounds b
+        WHERE r.subnet_id = :subnet_id
+          AND r.end_address >= b.first_address AND r.start_address <= b.last_address
+    ), edges AS (
+        SELECT start_address, max(end_address) OVER (
+            ORDER BY start_address ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+        ) AS covered
+        FROM taken
+    ), gaps AS (
+        SELECT CASE WHEN e.covered IS NULL THEN b.first_address ELSE e.covered + 1 END AS gap_start,
+               e.start_address - 1 AS gap_end
+        FROM edges e, bounds b
+        WHERE CASE
+            WHEN e.covered IS NULL THEN e.start_address > b.first_address
+            WHEN e.covered < e.start_address THEN e.start_address > e.covered + 1
+            ELSE false
+        END
+        UNION ALL
+        SELECT CASE WHEN max(t.end_address) IS NULL THEN b.first_address ELSE max(t.end_address) + 1 END,
+               b.last_address
+        FROM bounds b LEFT JOIN taken t ON true
+        GROUP BY b.first_address, b.last_address
+        HAVING max(t.end_address) IS NULL OR max(t.end_address) < b.last_address
+    )
+    SELECT host(gap_start), host(gap_end) FROM gaps ORDER BY gap_start LIMIT :count
+""")
+
+
+def find_free(db: Session, subnet: models.Subnet, first: int, last: int, count: int) -> List[int]:
+    """Return up to ``count`` free addresses of ``subnet`` between ``first`` and ``last``, lowest first.
+
+    Every gap holds at least one address, so the first ``count`` gaps are enough.
+    """
+    gaps = db.execute(_FREE_RANGES, {
+        "first": str(ipaddress.ip_address(first)),
+        "last": str(ipaddress.ip_address(last)),
+        "cidr": subnet.cidr,
+        "subnet_id": subnet.id,
+        "count": count,
+    })
+    free: List[int] = []
+    for gap_start, gap_end in gaps:
+        start, end = int(ipaddress.ip_address(gap_start)), int(ipaddress.ip_address(gap_end))
+        free.extend(range(start, min(end, start + count - len(free) - 1) + 1))
+    return free
+
+
+def allocate(db: Session, subnet_id: str, request: schemas.SubnetAllocate) -> List[models.IPAddress]:
+    """Create ``request.count`` IP addresses from the lowest free addresses of a subnet.
+
+    The subnet row is locked with ``SELECT ... FOR UPDATE`` so that concurrent
+    allocations in the same subnet run one after the other. Addresses created
+    through other endpoints meanwhile are caught by the unique constraint:
+    those rows are skipped with ``ON CONFLICT DO NOTHING`` and the search is
+    repeated for the remainder.
+    """
+    subnet = (
+        db.query(models.Subnet)
+        .filter(models.Subnet.id == subnet_id)
+        .with_for_update(of=models.Subnet)
+        .first()
+    )
+    if not subnet:
+        raise HTTPException(status_code=404, detail="Subnet not found")
+
+    network = ipaddress.ip_network(subnet.cidr)
+    first, last = usable_range(network)
+    ip_type = models.IPType.ipv4 if network.version == 4 else models.IPType.ipv6
+    table = models.IPAddress.__table__
+
+    ids: List[str] = []
+    for _ in range(MAX_ALLOCATION_ATTEMPTS):
+        missing = request.count - len(ids)
+        free = find_free(db, subnet, first, last, missing)
+        if len(free) < missing:
+            db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"Subnet {subnet.cidr} has {len(free)} free addresses, {missing} requested",
+            )
+        rows = [
+            {
+                "id": generate_id(),
+                "address": str(ipaddress.ip_address(address)),
+                "host_id": request.host_id,
+                "type": ip_type,
+                "allocation": request.allocation,
+            }
+            for address in free
+        ]
+        stmt = insert(table).on_conflict_do_nothing(index_elements=["address"]).returning(table.c.id)
+        ids.extend(db.execute(stmt, rows).scalars().all())
+        if len(ids) == request.count:
+            break
+    else:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Addresses were taken concurrently, retry the allocation")
+
+    db.commit()
+    return (
+        db.query(models.IPAddress)
+        .filter(models.IPAddress.id.in_(ids))
+        .order_by(models.IPAddress.address)
+        .all()
+    )
+
+
+def utilization(db: Session, subnets: Sequence[models.Subnet]) -> List[schemas.SubnetUtilization]:
+    """Compute size, reserved, used and free address counts for ``subnets``.
+
+    Used addresses are counted for all subnets in one grouped containment join,
+    limited to the usable range and to addresses outside the reserved ranges,
+    so an address that is both recorded and reserved is only counted as reserved.
+    """
+    if not subnets:
+        return []
+    bounds = values(
+        column("subnet_id", String), column("first_address", INET), column("last_address", INET), name="usable",
+    ).data([
+        (subnet.id, *(str(ipaddress.ip_address(end)) for end in usable_range(ipaddress.ip_network(subnet.cidr))))
+        for subnet in subnets
+    ])
+    address = cast(func.host(models.IPAddress.address), INET)
+    reserved_range = models.SubnetReservedRange
+    used = dict(
+        db.query(bounds.c.subnet_id, func.count(models.IPAddress.id))
+        .select_from(bounds)
+        .join(models.Subnet, models.Subnet.id == bounds.c.subnet_id)
+        .outerjoin(models.IPAddress, and_(
+            models.IPAddress.address.op("<<=")(models.Subnet.cidr),
+            address.between(cast(bounds.c.first_address, INET), cast(bounds.c.last_address, INET)),
+            ~exists().where(
+                reserved_range.subnet_id == models.Subnet.id,
+                address.between(reserved_range.start_address, reserved_range.end_address),
+            ),
+        ))
+        .group_by(bounds.c.subnet_id)
+        .all()
+    )
+    report = []
+    for subnet in subnets:
+        first, last = usable_range(ipaddress.ip_network(subnet.cidr))
+        size = last - first + 1
+        reserved = sum(
+            min(end, last) - max(start, first) + 1
+            for start, end in _merge(_reserved_intervals(subnet))
+            if end >= first and start <= last
+        )
+        in_use = used.get(subnet.id, 0)
+        available = size - reserved
+        report.append(schemas.SubnetUtilization(
+            subnet_id=subnet.id,
+            name=subnet.name,
+            cidr=subnet.cidr,
+            size=size,
+            reserved=reserved,
+            used=in_use,
+            free=available - in_use,
+            utilization=round(100 * in_use / available, 2) if available > 0 else 100.0,
+        ))
+    return report
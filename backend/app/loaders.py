@@ -0,0 +1,14 @@
+from typing import List
+from sqlalchemy.orm import Session, joinedload
+from app import models
+
+
+def entity_assignments(db: Session, entity_type: models.EntityType, entity_id: str) -> List[models.Assignment]:
+    """Assignments targeting one entity, with their person loaded in the same query."""
+    return (
+        db.query(models.Assignment)
+        .options(joinedload(models.Assignment.person))
+        .filter(models.Assignment.entity_type == entity_type, models.Assignment.entity_id == entity_id)
+        .order_by(models.Assignment.created_at, models.Assignment.id)
+        .all()
+    )
@@ -1,7 +1,16 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.routers import datacenters, servers, hosts, ip_addresses, operating_systems, persons, assignments
+from app.cache import cache_status
+from app.database import async_engine, engine, replicas, Base
+from app.events import notifier
+from app.metrics import CONTENT_TYPE, METRICS_ENABLED, MetricsMiddleware, install_query_listeners, render_metrics
+from app.pagination import NEXT_CURSOR_HEADER
+from app.pool import pool_status
+from app.reports import CAPACITY_REFRESH_INTERVAL, refresh_periodically
+from app.sync import SYNC_RETENTION_DAYS, prune_periodically
+from app.routers import datacenters, servers, hosts, ip_addresses, operating_systems, persons, assignments, subnets, stats, reports, imports, sync, events, search, access, topology, integrity
 import os
 from dotenv import load_dotenv
 
@@ -10,7 +19,24 @@ load_dotenv()
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Asset Compass API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Read the change log once per change and hand it to the live change feeds
+    tasks = [asyncio.create_task(notifier.listen()), asyncio.create_task(notifier.publish())]
+    # Keep the capacity report view fresh in the background
+    if CAPACITY_REFRESH_INTERVAL > 0:
+        tasks.append(asyncio.create_task(refresh_periodically()))
+    # Drop change log entries past the sync retention window
+    if SYNC_RETENTION_DAYS > 0:
+        tasks.append(asyncio.create_task(prune_periodically()))
+    yield
+    for task in tasks:
+        task.cancel()
+    for db_engine in [async_engine] + [replica.async_engine for replica in replicas.replicas]:
+        if db_engine is not None:
+            await db_engine.dispose()
+
+app = FastAPI(title="Asset Compass API", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 # Support both explicit origins and regex patterns via environment variables
@@ -22,6 +48,7 @@ cors_kwargs = {
     "allow_credentials": True,
     "allow_methods": ["*"],
     "allow_headers": ["*"],
+    "expose_headers": [NEXT_CURSOR_HEADER],
 }
 
 if cors_origins:
@@ -36,6 +63,11 @@ else:
 
 app.add_middleware(CORSMiddleware, **cors_kwargs)
 
+# Outermost, so CORS preflights and errors are measured too
+if METRICS_ENABLED:
+    install_query_listeners()
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(datacenters.router, prefix="/api/datacenters", tags=["datacenters"])
 app.include_router(servers.router, prefix="/api/servers", tags=["servers"])
@@ -44,6 +76,16 @@ app.include_router(ip_addresses.router, prefix="/api/ip-addresses", tags=["ip-ad
 app.include_router(operating_systems.router, prefix="/api/operating-systems", tags=["operating-systems"])
 app.include_router(persons.router, prefix="/api/persons", tags=["persons"])
 app.include_router(assignments.router, prefix="/api/assignments", tags=["assignments"])
+app.include_router(subnets.router, prefix="/api/subnets", tags=["subnets"])
+app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
+app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+app.include_router(imports.router, prefix="/api/import", tags=["import"])
+app.include_router(sync.router, prefix="/api/sync", tags=["sync"])
+app.include_router(events.router, prefix="/api/events", tags=["events"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(access.router, prefix="/api/access", tags=["access"])
+app.include_router(topology.router, prefix="/api/topology", tags=["topology"])
+app.include_router(integrity.router, prefix="/api/integrity", tags=["integrity"])
 
 @app.get("/")
 async def root():
@@ -53,3 +95,27 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/api/health/pool")
+async def health_pool():
+    """Connection pool occupancy and checkout wait times, per engine and read replica."""
+    engines = {"psycopg2": pool_status(engine)}
+    if async_engine is not None:
+        engines["asyncpg"] = pool_status(async_engine.sync_engine)
+    for replica in replicas.replicas:
+        status = {"healthy": replica.healthy, "psycopg2": pool_status(replica.engine)}
+        if replica.async_engine is not None:
+            status["asyncpg"] = pool_status(replica.async_engine.sync_engine)
+        engines.setdefault("replicas", {})[replica.name] = status
+    return engines
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, SQL, connection pool and cache metrics of this worker, in the Prometheus text format."""
+    if not METRICS_ENABLED:
+        return Response(status_code=404)
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+@app.get("/api/health/cache")
+async def health_cache():
+    """Response cache backend and its hit, miss and eviction counters (this worker's)."""
+    return cache_status()
@@ -0,0 +1,300 @@
+"""Prometheus metrics: request latency, response sizes and SQL time per route.
+
+``MetricsMiddleware`` times every HTTP request and labels it with the route
+template (``/api/hosts/{host_id}``, not the concrete path, so the number of
+series stays bounded). SQLAlchemy ``before/after_cursor_execute`` listeners on
+every engine time each statement and add it to the request that issued it,
+found through a context variable. The threadpool (psycopg2) and the greenlets
+of ``AsyncSession.run_sync`` (asyncpg) both inherit the request's context, so
+this works in both database modes.
+
+A request that issues more than ``METRICS_QUERY_THRESHOLD`` statements before
+its response starts is counted in ``http_requests_over_query_threshold_total``
+and logged with its most repeated statement: usually a query in a loop (N+1)
+that should be one joined or batched query. Statements issued while a body is
+streamed (the topology slices, the change feed) are timed but not judged.
+
+``GET /metrics`` renders everything in the Prometheus text format, together
+with the connection pool and response cache counters. Like those, the metrics
+belong to one worker process; with several uvicorn workers, scrape each one
+(or run one worker per container). Long-lived ``/api/events`` streams count as
+in flight, and towards latency, for as long as they stay open.
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter as StatementCounter
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.cache import cache_status
+from app.database import async_engine, engine, replicas
+from app.pool import pool_status
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Statements per request above which it is flagged as a likely N+1; 0 disables the check
+METRICS_QUERY_THRESHOLD = int(os.getenv("METRICS_QUERY_THRESHOLD", "25"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """A metric with a fixed set of label names, safe to update from any thread."""
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._samples(labels, value))
+        return lines
+
+    def _samples(self, labels, value) -> list:
+        return [f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            counts, total = self._values.get(labels, ([0] * len(self.buckets), 0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[labels] = (counts, total + value)
+
+    def _samples(self, labels, value) -> list:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            le = f'le="{_number(bound)}"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests handled", ["method", "route", "status"])
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "Time to handle an HTTP request", ["method", "route"])
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being handled")
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Size of response bodies", ["method", "route"], SIZE_BUCKETS)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements issued per HTTP request", ["method", "route"], QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_DURATION = Histogram("http_request_db_seconds", "Time spent in SQL statements per HTTP request", ["method", "route"])
+QUERY_THRESHOLD_EXCEEDED = Counter(
+    "http_requests_over_query_threshold_total",
+    "HTTP requests that issued more SQL statements than METRICS_QUERY_THRESHOLD",
+    ["method", "route"],
+)
+QUERY_DURATION = Histogram("db_query_duration_seconds", "Time of each SQL statement, in requests or not")
+
+METRICS = [
+    REQUESTS, REQUEST_DURATION, REQUESTS_IN_PROGRESS, RESPONSE_SIZE,
+    REQUEST_QUERIES, REQUEST_DB_DURATION, QUERY_THRESHOLD_EXCEEDED, QUERY_DURATION,
+]
+
+
+class RequestStats:
+    """SQL statements issued while handling one request."""
+
+    __slots__ = ("queries", "seconds", "statements", "streaming")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements = StatementCounter()
+        # Set once the response has started; later statements feed a streamed body
+        self.streaming = False
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    QUERY_DURATION.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+        if not stats.streaming:
+            stats.statements[statement] += 1
+
+
+def install_query_listeners():
+    """Time the statements of every engine, including replicas and the asyncpg ones."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, size and SQL statements of each HTTP request."""
+
+    def __init__(self, app, query_threshold: int = METRICS_QUERY_THRESHOLD):
+        self.app = app
+        self.query_threshold = query_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                stats.streaming = True
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_PROGRESS.dec()
+            _request_stats.reset(token)
+            # Set by the router once a route matched; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            REQUESTS.inc(method, route, str(response["status"]))
+            REQUEST_DURATION.observe(elapsed, method, route)
+            RESPONSE_SIZE.observe(response["size"], method, route)
+            REQUEST_QUERIES.observe(stats.queries, method, route)
+            REQUEST_DB_DURATION.observe(stats.seconds, method, route)
+            # Streamed bodies query once per slice or batch of changes, by design
+            queries = sum(stats.statements.values())
+            if self.query_threshold and queries > self.query_threshold:
+                QUERY_THRESHOLD_EXCEEDED.inc(method, route)
+                statement, repeats = stats.statements.most_common(1)[0]
+                repeated = f"; ran {repeats} times: {' '.join(statement.split())[:300]}" if repeats > 1 else ""
+                logger.warning(
+                    "%s %s issued %d SQL statements (%.1f ms)%s",
+                    method, route, queries, stats.seconds * 1000, repeated,
+                )
+
+
+def _pool_lines() -> list:
+    engines = [("primary", "psycopg2", engine)]
+    if async_engine is not None:
+        engines.append(("primary", "asyncpg", async_engine.sync_engine))
+    for replica in replicas.replicas:
+        engines.append((replica.name, "psycopg2", replica.engine))
+        if replica.async_engine is not None:
+            engines.append((replica.name, "asyncpg", replica.async_engine.sync_engine))
+
+    # pool_status key -> (metric, type, help)
+    metrics = {
+        "checked_out": ("db_pool_checked_out", "gauge", "Connections in use"),
+        "checked_in": ("db_pool_checked_in", "gauge", "Idle connections in the pool"),
+        "overflow": ("db_pool_overflow", "gauge", "Connections open beyond the pool size"),
+        "checkouts": ("db_pool_checkouts_total", "counter", "Connections taken from the pool"),
+        "timeouts": ("db_pool_timeouts_total", "counter", "Checkouts that gave up waiting for a connection"),
+        "wait_seconds_total": ("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection"),
+    }
+    statuses = [(name, driver, pool_status(db_engine)) for name, driver, db_engine in engines]
+    lines = []
+    for key, (name, kind, help) in metrics.items():
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for database, driver, status in statuses:
+            if key in status:
+                lines.append(f"{name}{_labels(('database', 'driver'), (database, driver))} {_number(status[key])}")
+    return lines
+
+
+def _cache_lines() -> list:
+    status = cache_status()
+    lines = []
+    for key in ("hits", "misses", "evictions", "expirations", "invalidations", "errors"):
+        if key in status:
+            name = f"response_cache_{key}_total"
+            lines += [f"# HELP {name} Response cache {key}", f"# TYPE {name} counter", f"{name} {status[key]}"]
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics of this worker in the Prometheus text format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(_pool_lines())
+    lines.extend(_cache_lines())
+    return "\n".join(lines) + "\n"
@@ -1,8 +1,13 @@
-from sqlalchemy import Column, String, ForeignKey, Integer, Enum as SQLEnum, DateTime
+from sqlalchemy import Column, String, ForeignKey, Integer, Enum as SQLEnum, DateTime, Index
+from sqlalchemy.dialects.postgresql import CIDR, INET
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
+import uuid
+
+def generate_id() -> str:
+    return str(uuid.uuid4())
 
 class ServerStatus(str, enum.Enum):
     online = "online"
@@ -42,26 +47,33 @@ class AssignmentRole(str, enum.Enum):
 
 class Datacenter(Base):
     __tablename__ = "datacenters"
+    __table_args__ = (
+        Index("ix_datacenters_created_at_id", "created_at", "id"),
+    )
 
-    id = Column(String, primary_key=True)
+    id = Column(String, primary_key=True, default=generate_id)
     name = Column(String, nullable=False)
     location = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     servers = relationship("Server", back_populates="datacenter")
+    subnets = relationship("Subnet", back_populates="datacenter")
 
 class Server(Base):
     __tablename__ = "servers"
+    __table_args__ = (
+        Index("ix_servers_created_at_id", "created_at", "id"),
+    )
 
-    id = Column(String, primary_key=True)
+    id = Column(String, primary_key=True, default=generate_id)
     hostname = Column(String, nullable=False)
-    datacenter_id = Column(String, ForeignKey("datacenters.id"), nullable=False)
+    datacenter_id = Column(String, ForeignKey("datacenters.id"), nullable=False, index=True)
     model = Column(String, nullable=False)
     serial_number = Column(String, nullable=False)
-    status = Column(SQLEnum(ServerStatus), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    status = Column(SQLEnum(ServerStatus), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     datacenter = relationship("Datacenter", back_populates="servers")
@@ -69,29 +81,35 @@ class Server(Base):
 
 class OperatingSystem(Base):
     __tablename__ = "operating_systems"
+    __table_args__ = (
+        Index("ix_operating_systems_created_at_id", "created_at", "id"),
+    )
 
-    id = Column(String, primary_key=True)
+    id = Column(String, primary_key=True, default=generate_id)
     name = Column(String, nullable=False)
     version = Column(String, nullable=False)
     vendor = Column(String, nullable=False)
     eol_date = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     hosts = relationship("Host", back_populates="operating_system")
 
 class Host(Base):
     __tablename__ = "hosts"
+    __table_args__ = (
+        Index("ix_hosts_created_at_id", "created_at", "id"),
+    )
 
-    id = Column(String, primary_key=True)
+    id = Column(String, primary_key=True, default=generate_id)
     hostname = Column(String, nullable=False)
-    server_id = Column(String, ForeignKey("servers.id"), nullable=False)
-    os_id = Column(String, ForeignKey("operating_systems.id"), nullable=True)
-    type = Column(SQLEnum(HostType), nullable=False)
-    status = Column(SQLEnum(HostStatus), nullable=False)
+    server_id = Column(String, ForeignKey("servers.id"), nullable=False, index=True)
+    os_id = Column(String, ForeignKey("operating_systems.id"), nullable=True, index=True)
+    type = Column(SQLEnum(HostType, values_callable=lambda enum: [member.value for member in enum]), nullable=False)
+    status = Column(SQLEnum(HostStatus), nullable=False, index=True)
     cpu = Column(Integer, nullable=False)
     memory_gb = Column(Integer, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     server = relationship("Server", back_populates="hosts")
@@ -100,40 +118,87 @@ class Host(Base):
 
 class IPAddress(Base):
     __tablename__ = "ip_addresses"
-
-    id = Column(String, primary_key=True)
-    address = Column(String, nullable=False, unique=True)
-    host_id = Column(String, ForeignKey("hosts.id"), nullable=True)
+    __table_args__ = (
+        Index("ix_ip_addresses_created_at_id", "created_at", "id"),
+        Index(
+            "ix_ip_addresses_address_gist", "address",
+            postgresql_using="gist", postgresql_ops={"address": "inet_ops"},
+        ),
+    )
+
+    id = Column(String, primary_key=True, default=generate_id)
+    address = Column(INET, nullable=False, unique=True)
+    host_id = Column(String, ForeignKey("hosts.id"), nullable=True, index=True)
     type = Column(SQLEnum(IPType), nullable=False)
     allocation = Column(SQLEnum(IPAllocation), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     host = relationship("Host", back_populates="ip_addresses")
 
+class Subnet(Base):
+    __tablename__ = "subnets"
+    __table_args__ = (
+        Index("ix_subnets_created_at_id", "created_at", "id"),
+    )
+
+    id = Column(String, primary_key=True, default=generate_id)
+    name = Column(String, nullable=False)
+    cidr = Column(CIDR, nullable=False, unique=True)
+    datacenter_id = Column(String, ForeignKey("datacenters.id"), nullable=True, index=True)
+    description = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    datacenter = relationship("Datacenter", back_populates="subnets")
+    reserved_ranges = relationship(
+        "SubnetReservedRange",
+        back_populates="subnet",
+        cascade="all, delete-orphan",
+        order_by="SubnetReservedRange.start_address",
+    )
+
+class SubnetReservedRange(Base):
+    __tablename__ = "subnet_reserved_ranges"
+
+    id = Column(String, primary_key=True, default=generate_id)
+    subnet_id = Column(String, ForeignKey("subnets.id", ondelete="CASCADE"), nullable=False, index=True)
+    start_address = Column(INET, nullable=False)
+    end_address = Column(INET, nullable=False)
+    description = Column(String, nullable=True)
+
+    subnet = relationship("Subnet", back_populates="reserved_ranges")
+
 class Person(Base):
     __tablename__ = "persons"
+    __table_args__ = (
+        Index("ix_persons_created_at_id", "created_at", "id"),
+    )
 
-    id = Column(String, primary_key=True)
+    id = Column(String, primary_key=True, default=generate_id)
     name = Column(String, nullable=False)
     email = Column(String, nullable=False, unique=True)
     role = Column(String, nullable=False)
     department = Column(String, nullable=False)
     phone = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     assignments = relationship("Assignment", back_populates="person")
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (
+        Index("ix_assignments_entity", "entity_type", "entity_id"),
+        Index("ix_assignments_created_at_id", "created_at", "id"),
+    )
 
-    id = Column(String, primary_key=True)
-    person_id = Column(String, ForeignKey("persons.id"), nullable=False)
+    id = Column(String, primary_key=True, default=generate_id)
+    person_id = Column(String, ForeignKey("persons.id"), nullable=False, index=True)
     entity_type = Column(SQLEnum(EntityType), nullable=False)
     entity_id = Column(String, nullable=False)
     role = Column(SQLEnum(AssignmentRole), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     person = relationship("Person", back_populates="assignments")
 
@@ -0,0 +1,48 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    payload = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query, model, response: Response, skip: int, limit: int, cursor: Optional[str]):
+    """Order ``query`` on ``(created_at, id)`` and return one page of rows.
+
+    Without ``cursor`` the classic ``skip``/``limit`` window is used. Passing
+    ``cursor`` (an empty value starts from the beginning) switches to keyset
+    mode: the page starts right after the cursor position using an index seek
+    instead of OFFSET, and the cursor of the next page is returned in the
+    ``X-Next-Cursor`` header when more rows are available.
+    """
+    query = query.order_by(model.created_at, model.id)
+    if cursor is None:
+        return query.offset(skip).limit(limit).all()
+
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) > tuple_(created_at, id))
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows
@@ -0,0 +1,93 @@
+"""Connection pool classes that record how long checkouts wait for a connection.
+
+The pools behave exactly like their SQLAlchemy counterparts; ``_do_get`` (the
+step that takes a connection from the pool, waiting for one to be returned or
+opening a new one) is timed and the totals are kept on ``pool.metrics``.
+``pool_status`` combines them with the pool's current occupancy.
+"""
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+
+class PoolMetrics:
+    """Checkout counters of one pool, safe to update from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class _TimedPool:
+    _metrics_lock = threading.Lock()
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        # Created lazily: the pool's constructor arguments are introspected by
+        # create_engine, and dispose() replaces the pool with a fresh instance
+        if "_metrics" not in self.__dict__:
+            with self._metrics_lock:
+                self.__dict__.setdefault("_metrics", PoolMetrics())
+        return self.__dict__["_metrics"]
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedPool, NullPool):
+    pass
+
+
+def pool_status(engine) -> dict:
+    """Occupancy and checkout metrics of ``engine``'s pool."""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, _TimedPool):
+        status.update(pool.metrics.as_dict())
+    return status
@@ -0,0 +1,62 @@
+"""Round-robin selection of read replicas with health-aware fallback.
+
+A replica that fails to connect, or drops a connection, is taken out of the
+rotation for ``retry_after`` seconds; once every replica is out, reads go to
+the primary. Health is tracked passively from real traffic, so a replica
+costs no extra queries while it is up.
+"""
+import itertools
+import logging
+import time
+from typing import List, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    def __init__(self, name: str, engine, async_engine=None, retry_after: float = 30):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.retry_after = retry_after
+        self.down_until = 0.0
+        event.listen(engine, "handle_error", self._on_error)
+        if async_engine is not None:
+            event.listen(async_engine.sync_engine, "handle_error", self._on_error)
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+    def _on_error(self, context):
+        # Errors raised while connecting have no connection yet; query errors
+        # on a live connection say nothing about the replica's health
+        if context.is_disconnect or context.connection is None:
+            self.mark_down()
+
+    def mark_down(self):
+        if self.healthy:
+            logger.warning("Read replica %s is unavailable, retrying in %ss", self.name, self.retry_after)
+        self.down_until = time.monotonic() + self.retry_after
+
+
+class ReplicaSet:
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._counter = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        """Next healthy replica in round-robin order, or None if none is available."""
+        if not self.replicas:
+            return None
+        start = next(self._counter)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        return None
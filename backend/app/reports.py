@@ -0,0 +1,175 @@
+"""Capacity rollups of host CPU and memory.
+
+Reports are read from the ``host_capacity`` materialized view (migration 007),
+which holds one pre-aggregated row per server / OS / host type / status
+combination. Rolling those rows up to a report touches a few hundred rows
+instead of every host. The view is refreshed concurrently on a schedule (see
+``refresh_periodically``) or on demand; ``source="live"`` runs the same
+aggregation against the hosts table instead.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Literal, Optional, Sequence
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import BigInteger, Column, DateTime, MetaData, String, Table, func, select, text
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.database import SessionLocal, disable_statement_timeout
+from app.filters import filter_in
+
+logger = logging.getLogger(__name__)
+
+CapacityGroup = Literal["datacenter", "server", "os", "type"]
+CapacitySource = Literal["view", "live"]
+
+# Seconds between scheduled refreshes of the view; 0 disables the schedule
+CAPACITY_REFRESH_INTERVAL = int(os.getenv("CAPACITY_REFRESH_INTERVAL", "300"))
+
+# Keeps several workers from refreshing the view at the same time
+_REFRESH_LOCK_ID = 7_100_001
+
+# Kept out of Base.metadata so that create_all never creates it as a table
+capacity_view = Table(
+    "host_capacity",
+    MetaData(),
+    Column("server_id", String),
+    Column("datacenter_id", String),
+    Column("os_id", String),
+    Column("type", models.Host.__table__.c.type.type),
+    Column("status", models.Host.__table__.c.status.type),
+    Column("hosts", BigInteger),
+    Column("cpu", BigInteger),
+    Column("memory_gb", BigInteger),
+    Column("refreshed_at", DateTime(timezone=True)),
+)
+
+
+def _live_capacity():
+    """The view definition, evaluated against the current hosts."""
+    return (
+        select(
+            models.Host.server_id,
+            models.Server.datacenter_id,
+            models.Host.os_id,
+            models.Host.type,
+            models.Host.status,
+            func.count().label("hosts"),
+            func.sum(models.Host.cpu).label("cpu"),
+            func.sum(models.Host.memory_gb).label("memory_gb"),
+            func.now().label("refreshed_at"),
+        )
+        .join(models.Server, models.Server.id == models.Host.server_id)
+        .group_by(
+            models.Host.server_id,
+            models.Server.datacenter_id,
+            models.Host.os_id,
+            models.Host.type,
+            models.Host.status,
+        )
+        .subquery("host_capacity")
+    )
+
+
+def _group(source, group_by: CapacityGroup):
+    """Key and display name columns plus the joins needed for the name."""
+    if group_by == "datacenter":
+        return source.c.datacenter_id, models.Datacenter.name, [
+            (models.Datacenter, models.Datacenter.id == source.c.datacenter_id),
+        ]
+    if group_by == "server":
+        return source.c.server_id, models.Server.hostname, [
+            (models.Server, models.Server.id == source.c.server_id),
+        ]
+    if group_by == "os":
+        name = func.concat_ws(" ", models.OperatingSystem.name, models.OperatingSystem.version)
+        return source.c.os_id, name, [
+            (models.OperatingSystem, models.OperatingSystem.id == source.c.os_id),
+        ]
+    return source.c.type, source.c.type, []
+
+
+def capacity_report(
+    db: Session,
+    group_by: CapacityGroup = "datacenter",
+    source: CapacitySource = "view",
+    datacenter_id: Optional[Sequence[str]] = None,
+    server_id: Optional[Sequence[str]] = None,
+    os_id: Optional[Sequence[str]] = None,
+    type: Optional[Sequence[models.HostType]] = None,
+    status: Optional[Sequence[models.HostStatus]] = None,
+) -> schemas.CapacityReport:
+    capacity = capacity_view if source == "view" else _live_capacity()
+    key, name, joins = _group(capacity, group_by)
+
+    hosts = func.coalesce(func.sum(capacity.c.hosts), 0)
+    stmt = select(
+        key.label("key"),
+        name.label("name"),
+        hosts.label("hosts"),
+        func.coalesce(
+            func.sum(capacity.c.hosts).filter(capacity.c.status == models.HostStatus.running), 0
+        ).label("running_hosts"),
+        func.coalesce(func.sum(capacity.c.cpu), 0).label("cpu"),
+        func.coalesce(func.sum(capacity.c.memory_gb), 0).label("memory_gb"),
+    ).select_from(capacity)
+    for target, onclause in joins:
+        stmt = stmt.outerjoin(target, onclause)
+    stmt = filter_in(stmt, capacity.c.datacenter_id, datacenter_id)
+    stmt = filter_in(stmt, capacity.c.server_id, server_id)
+    stmt = filter_in(stmt, capacity.c.os_id, os_id)
+    stmt = filter_in(stmt, capacity.c.type, type)
+    stmt = filter_in(stmt, capacity.c.status, status)
+    stmt = stmt.group_by(key, name).order_by(hosts.desc(), key)
+
+    rows = [schemas.CapacityRow(**row) for row in db.execute(stmt).mappings()]
+    if source == "view":
+        refreshed_at = db.scalar(select(func.max(capacity_view.c.refreshed_at)))
+    else:
+        refreshed_at = datetime.now(timezone.utc)
+    return schemas.CapacityReport(
+        group_by=group_by,
+        source=source,
+        refreshed_at=refreshed_at,
+        rows=rows,
+        total=schemas.CapacityRow(
+            key=None,
+            name=None,
+            hosts=sum(row.hosts for row in rows),
+            running_hosts=sum(row.running_hosts for row in rows),
+            cpu=sum(row.cpu for row in rows),
+            memory_gb=sum(row.memory_gb for row in rows),
+        ),
+    )
+
+
+def refresh_capacity(db: Session) -> bool:
+    """Refresh the view without blocking readers; returns False if another refresh is running."""
+    if not db.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": _REFRESH_LOCK_ID}):
+        db.rollback()
+        return False
+    disable_statement_timeout(db)
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY host_capacity"))
+    db.commit()
+    return True
+
+
+def _refresh_in_session():
+    db = SessionLocal()
+    try:
+        return refresh_capacity(db)
+    finally:
+        db.close()
+
+
+async def refresh_periodically(interval: int = CAPACITY_REFRESH_INTERVAL):
+    """Background task refreshing ``host_capacity`` every ``interval`` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_refresh_in_session)
+        except Exception:
+            logger.exception("Refreshing host_capacity failed")
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from app.database import Database, get_read_db
+from app import models, schemas
+from app.access import ACCESS_TABLES, entity_access, person_access
+from app.versions import conditional
+
+router = APIRouter()
+
+@router.get(
+    "/entity/{entity_type}/{entity_id}",
+    response_model=schemas.EntityAccess,
+    dependencies=[Depends(conditional(*ACCESS_TABLES))],
+)
+async def get_entity_access(entity_type: models.EntityType, entity_id: str, db: Database = Depends(get_read_db)):
+    """Everyone who can touch an entity through an assignment on it or on one of its ancestors."""
+    return await db.run(entity_access, entity_type, entity_id)
+
+@router.get(
+    "/person/{person_id}",
+    response_model=List[schemas.AccessibleEntity],
+    dependencies=[Depends(conditional(*ACCESS_TABLES))],
+)
+async def get_person_access(
+    person_id: str,
+    entity_type: Optional[List[models.EntityType]] = Query(None),
+    role: Optional[List[models.AssignmentRole]] = Query(None),
+    skip: int = 0,
+    limit: int = 100,
+    db: Database = Depends(get_read_db),
+):
+    """Every entity a person's assignments reach, including everything below an assigned entity."""
+    return await db.run(person_access, person_id, entity_type, role, skip, limit)
@@ -1,48 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app import models, schemas
+from typing import List, Optional
+from app.database import Database, get_db, get_read_db
+from app import crud, models, schemas
+from app.bulk import ConflictAction, bulk_create, bulk_delete, bulk_update
+from app.export import ExportFormat, export_response
+from app.filters import filter_in
+from app.pagination import paginate
+from app.serialization import field_columns, json_list, json_object, requested_fields
+from app.versions import conditional
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Assignment])
-def get_assignments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    assignments = db.query(models.Assignment).offset(skip).limit(limit).all()
-    return assignments
+def _filter_assignments(query, person_id, entity_type, entity_id, role):
+    query = filter_in(query, models.Assignment.person_id, person_id)
+    query = filter_in(query, models.Assignment.entity_type, entity_type)
+    query = filter_in(query, models.Assignment.entity_id, entity_id)
+    query = filter_in(query, models.Assignment.role, role)
+    return query
 
-@router.get("/{assignment_id}", response_model=schemas.Assignment)
-def get_assignment(assignment_id: str, db: Session = Depends(get_db)):
-    assignment = db.query(models.Assignment).filter(models.Assignment.id == assignment_id).first()
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-    return assignment
+@router.get("/", response_model=List[schemas.Assignment], dependencies=[Depends(conditional("assignments"))])
+async def get_assignments(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    person_id: Optional[List[str]] = Query(None),
+    entity_type: Optional[List[models.EntityType]] = Query(None),
+    entity_id: Optional[List[str]] = Query(None),
+    role: Optional[List[models.AssignmentRole]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    names = requested_fields(schemas.Assignment, fields)
+    def page(session: Session):
+        query = _filter_assignments(session.query(*field_columns(models.Assignment, names)), person_id, entity_type, entity_id, role)
+        return paginate(query, models.Assignment, response, skip, limit, cursor)
+    return json_list(await db.run(page), names, response)
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def create_assignments_bulk(
+    assignments: List[schemas.AssignmentCreate],
+    atomic: bool = True,
+    on_conflict: ConflictAction = "error",
+    db: Database = Depends(get_db),
+):
+    return await db.run(bulk_create, models.Assignment, assignments, atomic=atomic, on_conflict=on_conflict)
+
+@router.put("/bulk", response_model=schemas.BulkResult)
+async def update_assignments_bulk(assignments: List[schemas.AssignmentBulkUpdate], atomic: bool = True, db: Database = Depends(get_db)):
+    return await db.run(bulk_update, models.Assignment, assignments, atomic=atomic)
+
+@router.delete("/bulk", response_model=schemas.BulkResult)
+async def delete_assignments_bulk(ids: List[str] = Body(...), atomic: bool = True, db: Database = Depends(get_db)):
+    return await db.run(bulk_delete, models.Assignment, ids, atomic=atomic)
+
+@router.get("/export")
+async def export_assignments(
+    format: ExportFormat = "ndjson",
+    person_id: Optional[List[str]] = Query(None),
+    entity_type: Optional[List[models.EntityType]] = Query(None),
+    entity_id: Optional[List[str]] = Query(None),
+    role: Optional[List[models.AssignmentRole]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    query = _filter_assignments(select(models.Assignment), person_id, entity_type, entity_id, role)
+    return export_response(query, models.Assignment, schemas.Assignment, format, "assignments", bind=db.sync_bind)
+
+@router.get("/{assignment_id}", response_model=schemas.Assignment, dependencies=[Depends(conditional("assignments"))])
+async def get_assignment(assignment_id: str, response: Response, fields: Optional[str] = None, db: Database = Depends(get_read_db)):
+    names = requested_fields(schemas.Assignment, fields)
+    return json_object(await db.run(crud.get_fields_or_404, models.Assignment, names, assignment_id, "Assignment"), names, response)
 
 @router.post("/", response_model=schemas.Assignment)
-def create_assignment(assignment: schemas.AssignmentCreate, db: Session = Depends(get_db)):
-    db_assignment = models.Assignment(**assignment.model_dump())
-    db.add(db_assignment)
-    db.commit()
-    db.refresh(db_assignment)
-    return db_assignment
+async def create_assignment(assignment: schemas.AssignmentCreate, db: Database = Depends(get_db)):
+    return await db.run(crud.create, models.Assignment, assignment)
 
 @router.put("/{assignment_id}", response_model=schemas.Assignment)
-def update_assignment(assignment_id: str, assignment: schemas.AssignmentCreate, db: Session = Depends(get_db)):
-    db_assignment = db.query(models.Assignment).filter(models.Assignment.id == assignment_id).first()
-    if not db_assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-    for key, value in assignment.model_dump().items():
-        setattr(db_assignment, key, value)
-    db.commit()
-    db.refresh(db_assignment)
-    return db_assignment
+async def update_assignment(assignment_id: str, assignment: schemas.AssignmentCreate, db: Database = Depends(get_db)):
+    return await db.run(crud.update, models.Assignment, assignment_id, assignment, "Assignment")
 
 @router.delete("/{assignment_id}")
-def delete_assignment(assignment_id: str, db: Session = Depends(get_db)):
-    db_assignment = db.query(models.Assignment).filter(models.Assignment.id == assignment_id).first()
-    if not db_assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-    db.delete(db_assignment)
-    db.commit()
-    return {"message": "Assignment deleted"}
+async def delete_assignment(assignment_id: str, db: Database = Depends(get_db)):
+    return await db.run(crud.delete, models.Assignment, assignment_id, "Assignment")
 
@@ -1,48 +1,114 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app import models, schemas
-
-router = APIRouter()
-
-@router.get("/", response_model=List[schemas.Datacenter])
-def get_datacenters(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    datacenters = db.query(models.Datacenter).offset(skip).limit(limit).all()
-    return datacenters
-
-@router.get("/{datacenter_id}", response_model=schemas.Datacenter)
-def get_datacenter(datacenter_id: str, db: Session = Depends(get_db)):
-    datacenter = db.query(models.Datacenter).filter(models.Datacenter.id == datacenter_id).first()
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from app.database import Database, get_db, get_read_db
+from app import crud, models, schemas
+from app.bulk import ConflictAction, bulk_create, bulk_delete, bulk_update
+from app.cache import CachedRoute, cached, invalidate
+from app.export import ExportFormat, export_response
+from app.filters import filter_in
+from app.integrity import DeleteChildren, delete_entity
+from app.loaders import entity_assignments
+from app.pagination import paginate
+from app.serialization import field_columns, json_list, json_object, requested_fields
+from app.versions import conditional
+
+router = APIRouter(route_class=CachedRoute)
+
+def _filter_datacenters(query, location):
+    query = filter_in(query, models.Datacenter.location, location)
+    return query
+
+@router.get("/", response_model=List[schemas.Datacenter], dependencies=[Depends(conditional("datacenters"))])
+@cached("datacenters")
+async def get_datacenters(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    location: Optional[List[str]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    names = requested_fields(schemas.Datacenter, fields)
+    def page(session: Session):
+        query = _filter_datacenters(session.query(*field_columns(models.Datacenter, names)), location)
+        return paginate(query, models.Datacenter, response, skip, limit, cursor)
+    return json_list(await db.run(page), names, response)
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def create_datacenters_bulk(
+    datacenters: List[schemas.DatacenterCreate],
+    atomic: bool = True,
+    on_conflict: ConflictAction = "error",
+    db: Database = Depends(get_db),
+):
+    result = await db.run(bulk_create, models.Datacenter, datacenters, atomic=atomic, on_conflict=on_conflict)
+    await invalidate("datacenters")
+    return result
+
+@router.put("/bulk", response_model=schemas.BulkResult)
+async def update_datacenters_bulk(datacenters: List[schemas.DatacenterBulkUpdate], atomic: bool = True, db: Database = Depends(get_db)):
+    result = await db.run(bulk_update, models.Datacenter, datacenters, atomic=atomic)
+    await invalidate("datacenters")
+    return result
+
+@router.delete("/bulk", response_model=schemas.BulkResult)
+async def delete_datacenters_bulk(ids: List[str] = Body(...), atomic: bool = True, db: Database = Depends(get_db)):
+    result = await db.run(bulk_delete, models.Datacenter, ids, atomic=atomic)
+    await invalidate("datacenters")
+    return result
+
+@router.get("/export")
+async def export_datacenters(
+    format: ExportFormat = "ndjson",
+    location: Optional[List[str]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    query = _filter_datacenters(select(models.Datacenter), location)
+    return export_response(query, models.Datacenter, schemas.Datacenter, format, "datacenters", bind=db.sync_bind)
+
+@router.get("/{datacenter_id}", response_model=schemas.Datacenter, dependencies=[Depends(conditional("datacenters"))])
+@cached("datacenters")
+async def get_datacenter(datacenter_id: str, response: Response, fields: Optional[str] = None, db: Database = Depends(get_read_db)):
+    names = requested_fields(schemas.Datacenter, fields)
+    return json_object(await db.run(crud.get_fields_or_404, models.Datacenter, names, datacenter_id, "Datacenter"), names, response)
+
+def _get_datacenter_full(db: Session, datacenter_id: str):
+    datacenter = (
+        db.query(models.Datacenter)
+        .options(selectinload(models.Datacenter.servers))
+        .filter(models.Datacenter.id == datacenter_id)
+        .first()
+    )
     if not datacenter:
         raise HTTPException(status_code=404, detail="Datacenter not found")
-    return datacenter
+    return {
+        **schemas.Datacenter.model_validate(datacenter).model_dump(),
+        "servers": datacenter.servers,
+        "assignments": entity_assignments(db, models.EntityType.datacenter, datacenter_id),
+    }
+
+@router.get("/{datacenter_id}/full", response_model=schemas.DatacenterFull)
+async def get_datacenter_full(datacenter_id: str, db: Database = Depends(get_read_db)):
+    return await db.run(_get_datacenter_full, datacenter_id)
 
 @router.post("/", response_model=schemas.Datacenter)
-def create_datacenter(datacenter: schemas.DatacenterCreate, db: Session = Depends(get_db)):
-    db_datacenter = models.Datacenter(**datacenter.model_dump())
-    db.add(db_datacenter)
-    db.commit()
-    db.refresh(db_datacenter)
-    return db_datacenter
+async def create_datacenter(datacenter: schemas.DatacenterCreate, db: Database = Depends(get_db)):
+    result = await db.run(crud.create, models.Datacenter, datacenter)
+    await invalidate("datacenters")
+    return result
 
 @router.put("/{datacenter_id}", response_model=schemas.Datacenter)
-def update_datacenter(datacenter_id: str, datacenter: schemas.DatacenterCreate, db: Session = Depends(get_db)):
-    db_datacenter = db.query(models.Datacenter).filter(models.Datacenter.id == datacenter_id).first()
-    if not db_datacenter:
-        raise HTTPException(status_code=404, detail="Datacenter not found")
-    for key, value in datacenter.model_dump().items():
-        setattr(db_datacenter, key, value)
-    db.commit()
-    db.refresh(db_datacenter)
-    return db_datacenter
+async def update_datacenter(datacenter_id: str, datacenter: schemas.DatacenterCreate, db: Database = Depends(get_db)):
+    result = await db.run(crud.update, models.Datacenter, datacenter_id, datacenter, "Datacenter")
+    await invalidate("datacenters")
+    return result
 
 @router.delete("/{datacenter_id}")
-def delete_datacenter(datacenter_id: str, db: Session = Depends(get_db)):
-    db_datacenter = db.query(models.Datacenter).filter(models.Datacenter.id == datacenter_id).first()
-    if not db_datacenter:
-        raise HTTPException(status_code=404, detail="Datacenter not found")
-    db.delete(db_datacenter)
-    db.commit()
-    return {"message": "Datacenter deleted"}
+async def delete_datacenter(datacenter_id: str, children: DeleteChildren = "restrict", db: Database = Depends(get_db)):
+    result = await db.run(delete_entity, models.Datacenter, datacenter_id, "Datacenter", children)
+    await invalidate("datacenters")
+    return result
 
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.events import change_events, start_token
+from app.sync import entity_tables
+
+router = APIRouter()
+
+@router.get("/")
+async def stream_events(
+    request: Request,
+    entity: Optional[List[str]] = Query(None),
+    id: Optional[List[str]] = Query(None),
+    since: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+):
+    """Server-Sent Events stream of changes, optionally limited to entities and ids.
+
+    Starts at ``since``, at the ``Last-Event-ID`` of a reconnecting
+    ``EventSource``, or otherwise at the current state.
+    """
+    tables = entity_tables(entity)
+    token = await start_token(last_event_id or since)
+    return StreamingResponse(
+        change_events(request, token, tables, id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
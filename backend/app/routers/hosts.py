@@ -1,48 +1,119 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app import models, schemas
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
+from app.database import Database, get_db, get_read_db
+from app import crud, models, schemas
+from app.bulk import ConflictAction, bulk_create, bulk_delete, bulk_update
+from app.export import ExportFormat, export_response
+from app.filters import filter_in
+from app.integrity import DeleteChildren, delete_entity
+from app.loaders import entity_assignments
+from app.pagination import paginate
+from app.serialization import field_columns, json_list, json_object, requested_fields
+from app.versions import conditional
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Host])
-def get_hosts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    hosts = db.query(models.Host).offset(skip).limit(limit).all()
-    return hosts
+def _filter_hosts(query, server_id, os_id, datacenter_id, type, status):
+    query = filter_in(query, models.Host.server_id, server_id)
+    query = filter_in(query, models.Host.os_id, os_id)
+    query = filter_in(query, models.Host.type, type)
+    query = filter_in(query, models.Host.status, status)
+    if datacenter_id:
+        servers = filter_in(select(models.Server.id), models.Server.datacenter_id, datacenter_id)
+        query = query.filter(models.Host.server_id.in_(servers))
+    return query
 
-@router.get("/{host_id}", response_model=schemas.Host)
-def get_host(host_id: str, db: Session = Depends(get_db)):
-    host = db.query(models.Host).filter(models.Host.id == host_id).first()
+@router.get("/", response_model=List[schemas.Host], dependencies=[Depends(conditional("hosts", "servers"))])
+async def get_hosts(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    server_id: Optional[List[str]] = Query(None),
+    os_id: Optional[List[str]] = Query(None),
+    datacenter_id: Optional[List[str]] = Query(None),
+    type: Optional[List[models.HostType]] = Query(None),
+    status: Optional[List[models.HostStatus]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    names = requested_fields(schemas.Host, fields)
+    def page(session: Session):
+        query = _filter_hosts(session.query(*field_columns(models.Host, names)), server_id, os_id, datacenter_id, type, status)
+        return paginate(query, models.Host, response, skip, limit, cursor)
+    return json_list(await db.run(page), names, response)
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def create_hosts_bulk(
+    hosts: List[schemas.HostCreate],
+    atomic: bool = True,
+    on_conflict: ConflictAction = "error",
+    db: Database = Depends(get_db),
+):
+    return await db.run(bulk_create, models.Host, hosts, atomic=atomic, on_conflict=on_conflict)
+
+@router.put("/bulk", response_model=schemas.BulkResult)
+async def update_hosts_bulk(hosts: List[schemas.HostBulkUpdate], atomic: bool = True, db: Database = Depends(get_db)):
+    return await db.run(bulk_update, models.Host, hosts, atomic=atomic)
+
+@router.delete("/bulk", response_model=schemas.BulkResult)
+async def delete_hosts_bulk(ids: List[str] = Body(...), atomic: bool = True, db: Database = Depends(get_db)):
+    return await db.run(bulk_delete, models.Host, ids, atomic=atomic)
+
+@router.get("/export")
+async def export_hosts(
+    format: ExportFormat = "ndjson",
+    server_id: Optional[List[str]] = Query(None),
+    os_id: Optional[List[str]] = Query(None),
+    datacenter_id: Optional[List[str]] = Query(None),
+    type: Optional[List[models.HostType]] = Query(None),
+    status: Optional[List[models.HostStatus]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    query = _filter_hosts(select(models.Host), server_id, os_id, datacenter_id, type, status)
+    return export_response(query, models.Host, schemas.Host, format, "hosts", bind=db.sync_bind)
+
+@router.get("/{host_id}", response_model=schemas.Host, dependencies=[Depends(conditional("hosts", "servers"))])
+async def get_host(host_id: str, response: Response, fields: Optional[str] = None, db: Database = Depends(get_read_db)):
+    names = requested_fields(schemas.Host, fields)
+    return json_object(await db.run(crud.get_fields_or_404, models.Host, names, host_id, "Host"), names, response)
+
+def _get_host_full(db: Session, host_id: str):
+    host = (
+        db.query(models.Host)
+        .options(
+            joinedload(models.Host.server),
+            joinedload(models.Host.operating_system),
+            selectinload(models.Host.ip_addresses),
+        )
+        .filter(models.Host.id == host_id)
+        .first()
+    )
     if not host:
         raise HTTPException(status_code=404, detail="Host not found")
-    return host
+    return {
+        **schemas.Host.model_validate(host).model_dump(),
+        "server": host.server,
+        "operating_system": host.operating_system,
+        "ip_addresses": host.ip_addresses,
+        "assignments": entity_assignments(db, models.EntityType.host, host_id),
+    }
+
+@router.get("/{host_id}/full", response_model=schemas.HostFull)
+async def get_host_full(host_id: str, db: Database = Depends(get_read_db)):
+    return await db.run(_get_host_full, host_id)
 
 @router.post("/", response_model=schemas.Host)
-def create_host(host: schemas.HostCreate, db: Session = Depends(get_db)):
-    db_host = models.Host(**host.model_dump())
-    db.add(db_host)
-    db.commit()
-    db.refresh(db_host)
-    return db_host
+async def create_host(host: schemas.HostCreate, db: Database = Depends(get_db)):
+    return await db.run(crud.create, models.Host, host)
 
 @router.put("/{host_id}", response_model=schemas.Host)
-def update_host(host_id: str, host: schemas.HostCreate, db: Session = Depends(get_db)):
-    db_host = db.query(models.Host).filter(models.Host.id == host_id).first()
-    if not db_host:
-        raise HTTPException(status_code=404, detail="Host not found")
-    for key, value in host.model_dump().items():
-        setattr(db_host, key, value)
-    db.commit()
-    db.refresh(db_host)
-    return db_host
+async def update_host(host_id: str, host: schemas.HostCreate, db: Database = Depends(get_db)):
+    return await db.run(crud.update, models.Host, host_id, host, "Host")
 
 @router.delete("/{host_id}")
-def delete_host(host_id: str, db: Session = Depends(get_db)):
-    db_host = db.query(models.Host).filter(models.Host.id == host_id).first()
-    if not db_host:
-        raise HTTPException(status_code=404, detail="Host not found")
-    db.delete(db_host)
-    db.commit()
-    return {"message": "Host deleted"}
+async def delete_host(host_id: str, children: DeleteChildren = "restrict", db: Database = Depends(get_db)):
+    return await db.run(delete_entity, models.Host, host_id, "Host", children)
 
@@ -0,0 +1,105 @@
+import io
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+from anyio import from_thread
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.database import get_session
+from app import schemas
+from app.cache import invalidate
+from app.importer import (
+    DEFAULT_CHUNK_SIZE, IMPORT_TARGETS, ImportConflict, ImportFormat, ProgressTracker, import_rows, running_imports,
+)
+
+router = APIRouter()
+
+# Bytes handed to the CSV / NDJSON reader at a time
+READ_BUFFER_SIZE = 1024 * 1024
+
+class RequestBody(io.RawIOBase):
+    """The request body as a blocking file, read from a worker thread as it arrives.
+
+    Rows are parsed and copied while the client is still uploading, instead of
+    the whole upload being buffered first.
+    """
+
+    def __init__(self, request: Request):
+        self._chunks = request.stream()
+        self._pending = b""
+        self.received = 0
+        self.complete = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self.complete:
+            try:
+                self._pending = from_thread.run(self._chunks.__anext__)
+            except StopAsyncIteration:
+                self.complete = True
+            else:
+                self.received += len(self._pending)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+@router.get("/", response_model=List[schemas.ImportProgress])
+def list_imports(db: Session = Depends(get_session)):
+    """Imports running in any worker: bytes received, rows staged, and whether the merge has started."""
+    return running_imports(db)
+
+
+@router.post("/{entity}", response_model=schemas.ImportResult)
+async def import_entity(
+    entity: str,
+    request: Request,
+    format: ImportFormat = "csv",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    import_id: Optional[str] = None,
+    db: Session = Depends(get_session),
+):
+    """Import a CSV or NDJSON request body into ``entity`` through COPY.
+
+    ``import_id`` names the import in ``GET /api/import/`` while it runs.
+    """
+    if entity not in IMPORT_TARGETS:
+        raise HTTPException(status_code=404, detail="Unknown import target")
+
+    body = RequestBody(request)
+    tracker = ProgressTracker(db, schemas.ImportProgress(
+        id=import_id or str(uuid.uuid4()),
+        entity=entity,
+        format=format,
+        started_at=datetime.now(timezone.utc),
+        received_bytes=0,
+        staged=0,
+        merging=False,
+    ))
+
+    def on_progress(staged: int):
+        tracker.update(received_bytes=body.received, staged=staged)
+
+    def on_merge():
+        tracker.update(received_bytes=body.received, merging=True)
+
+    def run():
+        tracker.start()
+        try:
+            return import_rows(db, entity, stream, format, chunk_size, on_progress, on_merge)
+        finally:
+            tracker.finish()
+
+    stream = io.TextIOWrapper(io.BufferedReader(body, READ_BUFFER_SIZE), encoding="utf-8", newline="")
+    try:
+        result = await run_in_threadpool(run)
+    except ImportConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import files must be UTF-8 encoded")
+    await invalidate(IMPORT_TARGETS[entity].table.name)
+    return result
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+from app.database import Database, get_db, get_read_db
+from app import schemas
+from app.integrity import INTEGRITY_SAMPLE_SIZE, check_integrity, repair
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.IntegrityReport)
+async def get_integrity_report(
+    sample_size: int = Query(INTEGRITY_SAMPLE_SIZE, ge=0, le=1000),
+    db: Database = Depends(get_read_db),
+):
+    """Orphaned assignments and broken foreign key references, with sample ids."""
+    return await db.run(check_integrity, sample_size)
+
+@router.post("/repair", response_model=schemas.IntegrityRepair)
+async def repair_integrity(db: Database = Depends(get_db)):
+    """Delete orphaned assignments, then report what is left."""
+    return await db.run(repair)
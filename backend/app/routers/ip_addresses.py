@@ -1,48 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app import models, schemas
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
+from app.database import Database, get_db, get_read_db
+from app import crud, models, schemas
+from app.bulk import ConflictAction, bulk_create, bulk_delete, bulk_update
+from app.export import ExportFormat, export_response
+from app.filters import filter_in, filter_network, filter_null
+from app.integrity import delete_entity
+from app.loaders import entity_assignments
+from app.pagination import paginate
+from app.serialization import field_columns, json_list, json_object, requested_fields
+from app.versions import conditional
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.IPAddress])
-def get_ip_addresses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    ip_addresses = db.query(models.IPAddress).offset(skip).limit(limit).all()
-    return ip_addresses
+def _filter_ip_addresses(query, host_id, type, allocation, assigned, within, contains):
+    query = filter_in(query, models.IPAddress.host_id, host_id)
+    query = filter_in(query, models.IPAddress.type, type)
+    query = filter_in(query, models.IPAddress.allocation, allocation)
+    query = filter_null(query, models.IPAddress.host_id, assigned)
+    query = filter_network(query, models.IPAddress.address, "<<=", within)
+    query = filter_network(query, models.IPAddress.address, ">>=", contains)
+    return query
 
-@router.get("/{ip_id}", response_model=schemas.IPAddress)
-def get_ip_address(ip_id: str, db: Session = Depends(get_db)):
-    ip_address = db.query(models.IPAddress).filter(models.IPAddress.id == ip_id).first()
+@router.get("/", response_model=List[schemas.IPAddress], dependencies=[Depends(conditional("ip_addresses"))])
+async def get_ip_addresses(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    host_id: Optional[List[str]] = Query(None),
+    type: Optional[List[models.IPType]] = Query(None),
+    allocation: Optional[List[models.IPAllocation]] = Query(None),
+    assigned: Optional[bool] = None,
+    within: Optional[str] = None,
+    contains: Optional[str] = None,
+    db: Database = Depends(get_read_db),
+):
+    names = requested_fields(schemas.IPAddress, fields)
+    def page(session: Session):
+        query = _filter_ip_addresses(session.query(*field_columns(models.IPAddress, names)), host_id, type, allocation, assigned, within, contains)
+        return paginate(query, models.IPAddress, response, skip, limit, cursor)
+    return json_list(await db.run(page), names, response)
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def create_ip_addresses_bulk(
+    ip_addresses: List[schemas.IPAddressCreate],
+    atomic: bool = True,
+    on_conflict: ConflictAction = "error",
+    db: Database = Depends(get_db),
+):
+    return await db.run(bulk_create, models.IPAddress, ip_addresses, atomic=atomic, on_conflict=on_conflict)
+
+@router.put("/bulk", response_model=schemas.BulkResult)
+async def update_ip_addresses_bulk(ip_addresses: List[schemas.IPAddressBulkUpdate], atomic: bool = True, db: Database = Depends(get_db)):
+    return await db.run(bulk_update, models.IPAddress, ip_addresses, atomic=atomic)
+
+@router.delete("/bulk", response_model=schemas.BulkResult)
+async def delete_ip_addresses_bulk(ids: List[str] = Body(...), atomic: bool = True, db: Database = Depends(get_db)):
+    return await db.run(bulk_delete, models.IPAddress, ids, atomic=atomic)
+
+@router.get("/export")
+async def export_ip_addresses(
+    format: ExportFormat = "ndjson",
+    host_id: Optional[List[str]] = Query(None),
+    type: Optional[List[models.IPType]] = Query(None),
+    allocation: Optional[List[models.IPAllocation]] = Query(None),
+    assigned: Optional[bool] = None,
+    within: Optional[str] = None,
+    contains: Optional[str] = None,
+    db: Database = Depends(get_read_db),
+):
+    query = _filter_ip_addresses(select(models.IPAddress), host_id, type, allocation, assigned, within, contains)
+    return export_response(query, models.IPAddress, schemas.IPAddress, format, "ip-addresses", bind=db.sync_bind)
+
+@router.get("/{ip_id}", response_model=schemas.IPAddress, dependencies=[Depends(conditional("ip_addresses"))])
+async def get_ip_address(ip_id: str, response: Response, fields: Optional[str] = None, db: Database = Depends(get_read_db)):
+    names = requested_fields(schemas.IPAddress, fields)
+    return json_object(await db.run(crud.get_fields_or_404, models.IPAddress, names, ip_id, "IP address"), names, response)
+
+def _get_ip_address_full(db: Session, ip_id: str):
+    ip_address = (
+        db.query(models.IPAddress)
+        .options(joinedload(models.IPAddress.host).joinedload(models.Host.server))
+        .filter(models.IPAddress.id == ip_id)
+        .first()
+    )
     if not ip_address:
         raise HTTPException(status_code=404, detail="IP address not found")
-    return ip_address
+    return {
+        **schemas.IPAddress.model_validate(ip_address).model_dump(),
+        "host": ip_address.host,
+        "server": ip_address.host.server if ip_address.host else None,
+        "assignments": entity_assignments(db, models.EntityType.ip, ip_id),
+    }
+
+@router.get("/{ip_id}/full", response_model=schemas.IPAddressFull)
+async def get_ip_address_full(ip_id: str, db: Database = Depends(get_read_db)):
+    return await db.run(_get_ip_address_full, ip_id)
 
 @router.post("/", response_model=schemas.IPAddress)
-def create_ip_address(ip_address: schemas.IPAddressCreate, db: Session = Depends(get_db)):
-    db_ip = models.IPAddress(**ip_address.model_dump())
-    db.add(db_ip)
-    db.commit()
-    db.refresh(db_ip)
-    return db_ip
+async def create_ip_address(ip_address: schemas.IPAddressCreate, db: Database = Depends(get_db)):
+    return await db.run(crud.create, models.IPAddress, ip_address)
 
 @router.put("/{ip_id}", response_model=schemas.IPAddress)
-def update_ip_address(ip_id: str, ip_address: schemas.IPAddressCreate, db: Session = Depends(get_db)):
-    db_ip = db.query(models.IPAddress).filter(models.IPAddress.id == ip_id).first()
-    if not db_ip:
-        raise HTTPException(status_code=404, detail="IP address not found")
-    for key, value in ip_address.model_dump().items():
-        setattr(db_ip, key, value)
-    db.commit()
-    db.refresh(db_ip)
-    return db_ip
+async def update_ip_address(ip_id: str, ip_address: schemas.IPAddressCreate, db: Database = Depends(get_db)):
+    return await db.run(crud.update, models.IPAddress, ip_id, ip_address, "IP address")
 
 @router.delete("/{ip_id}")
-def delete_ip_address(ip_id: str, db: Session = Depends(get_db)):
-    db_ip = db.query(models.IPAddress).filter(models.IPAddress.id == ip_id).first()
-    if not db_ip:
-        raise HTTPException(status_code=404, detail="IP address not found")
-    db.delete(db_ip)
-    db.commit()
-    return {"message": "IP address deleted"}
+async def delete_ip_address(ip_id: str, db: Database = Depends(get_db)):
+    return await db.run(delete_entity, models.IPAddress, ip_id, "IP address")
 
@@ -1,48 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app import models, schemas
-
-router = APIRouter()
-
-@router.get("/", response_model=List[schemas.OperatingSystem])
-def get_operating_systems(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    operating_systems = db.query(models.OperatingSystem).offset(skip).limit(limit).all()
-    return operating_systems
-
-@router.get("/{os_id}", response_model=schemas.OperatingSystem)
-def get_operating_system(os_id: str, db: Session = Depends(get_db)):
-    operating_system = db.query(models.OperatingSystem).filter(models.OperatingSystem.id == os_id).first()
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from app.database import Database, get_db, get_read_db
+from app import crud, models, schemas
+from app.bulk import ConflictAction, bulk_create, bulk_delete, bulk_update
+from app.cache import CachedRoute, cached, invalidate
+from app.export import ExportFormat, export_response
+from app.filters import filter_in
+from app.pagination import paginate
+from app.serialization import field_columns, json_list, json_object, requested_fields
+from app.versions import conditional
+
+router = APIRouter(route_class=CachedRoute)
+
+def _filter_operating_systems(query, name, vendor):
+    query = filter_in(query, models.OperatingSystem.name, name)
+    query = filter_in(query, models.OperatingSystem.vendor, vendor)
+    return query
+
+@router.get("/", response_model=List[schemas.OperatingSystem], dependencies=[Depends(conditional("operating_systems"))])
+@cached("operating_systems")
+async def get_operating_systems(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    name: Optional[List[str]] = Query(None),
+    vendor: Optional[List[str]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    names = requested_fields(schemas.OperatingSystem, fields)
+    def page(session: Session):
+        query = _filter_operating_systems(session.query(*field_columns(models.OperatingSystem, names)), name, vendor)
+        return paginate(query, models.OperatingSystem, response, skip, limit, cursor)
+    return json_list(await db.run(page), names, response)
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def create_operating_systems_bulk(
+    operating_systems: List[schemas.OperatingSystemCreate],
+    atomic: bool = True,
+    on_conflict: ConflictAction = "error",
+    db: Database = Depends(get_db),
+):
+    result = await db.run(bulk_create, models.OperatingSystem, operating_systems, atomic=atomic, on_conflict=on_conflict)
+    await invalidate("operating_systems")
+    return result
+
+@router.put("/bulk", response_model=schemas.BulkResult)
+async def update_operating_systems_bulk(operating_systems: List[schemas.OperatingSystemBulkUpdate], atomic: bool = True, db: Database = Depends(get_db)):
+    result = await db.run(bulk_update, models.OperatingSystem, operating_systems, atomic=atomic)
+    await invalidate("operating_systems")
+    return result
+
+@router.delete("/bulk", response_model=schemas.BulkResult)
+async def delete_operating_systems_bulk(ids: List[str] = Body(...), atomic: bool = True, db: Database = Depends(get_db)):
+    result = await db.run(bulk_delete, models.OperatingSystem, ids, atomic=atomic)
+    await invalidate("operating_systems")
+    return result
+
+@router.get("/export")
+async def export_operating_systems(
+    format: ExportFormat = "ndjson",
+    name: Optional[List[str]] = Query(None),
+    vendor: Optional[List[str]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    query = _filter_operating_systems(select(models.OperatingSystem), name, vendor)
+    return export_response(query, models.OperatingSystem, schemas.OperatingSystem, format, "operating-systems", bind=db.sync_bind)
+
+@router.get("/{os_id}", response_model=schemas.OperatingSystem, dependencies=[Depends(conditional("operating_systems"))])
+@cached("operating_systems")
+async def get_operating_system(os_id: str, response: Response, fields: Optional[str] = None, db: Database = Depends(get_read_db)):
+    names = requested_fields(schemas.OperatingSystem, fields)
+    return json_object(await db.run(crud.get_fields_or_404, models.OperatingSystem, names, os_id, "Operating system"), names, response)
+
+def _get_operating_system_full(db: Session, os_id: str):
+    operating_system = (
+        db.query(models.OperatingSystem)
+        .options(selectinload(models.OperatingSystem.hosts))
+        .filter(models.OperatingSystem.id == os_id)
+        .first()
+    )
     if not operating_system:
         raise HTTPException(status_code=404, detail="Operating system not found")
     return operating_system
 
+@router.get("/{os_id}/full", response_model=schemas.OperatingSystemFull)
+async def get_operating_system_full(os_id: str, db: Database = Depends(get_read_db)):
+    return await db.run(_get_operating_system_full, os_id)
+
 @router.post("/", response_model=schemas.OperatingSystem)
-def create_operating_system(os: schemas.OperatingSystemCreate, db: Session = Depends(get_db)):
-    db_os = models.OperatingSystem(**os.model_dump())
-    db.add(db_os)
-    db.commit()
-    db.refresh(db_os)
-    return db_os
+async def create_operating_system(os: schemas.OperatingSystemCreate, db: Database = Depends(get_db)):
+    result = await db.run(crud.create, models.OperatingSystem, os)
+    await invalidate("operating_systems")
+    return result
 
 @router.put("/{os_id}", response_model=schemas.OperatingSystem)
-def update_operating_system(os_id: str, os: schemas.OperatingSystemCreate, db: Session = Depends(get_db)):
-    db_os = db.query(models.OperatingSystem).filter(models.OperatingSystem.id == os_id).first()
-    if not db_os:
-        raise HTTPException(status_code=404, detail="Operating system not found")
-    for key, value in os.model_dump().items():
-        setattr(db_os, key, value)
-    db.commit()
-    db.refresh(db_os)
-    return db_os
+async def update_operating_system(os_id: str, os: schemas.OperatingSystemCreate, db: Database = Depends(get_db)):
+    result = await db.run(crud.update, models.OperatingSystem, os_id, os, "Operating system")
+    await invalidate("operating_systems")
+    return result
 
 @router.delete("/{os_id}")
-def delete_operating_system(os_id: str, db: Session = Depends(get_db)):
-    db_os = db.query(models.OperatingSystem).filter(models.OperatingSystem.id == os_id).first()
-    if not db_os:
-        raise HTTPException(status_code=404, detail="Operating system not found")
-    db.delete(db_os)
-    db.commit()
-    return {"message": "Operating system deleted"}
+async def delete_operating_system(os_id: str, db: Database = Depends(get_db)):
+    result = await db.run(crud.delete, models.OperatingSystem, os_id, "Operating system")
+    await invalidate("operating_systems")
+    return result
 
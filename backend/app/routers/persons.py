@@ -1,48 +1,132 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app import models, schemas
-
-router = APIRouter()
-
-@router.get("/", response_model=List[schemas.Person])
-def get_persons(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    persons = db.query(models.Person).offset(skip).limit(limit).all()
-    return persons
-
-@router.get("/{person_id}", response_model=schemas.Person)
-def get_person(person_id: str, db: Session = Depends(get_db)):
-    person = db.query(models.Person).filter(models.Person.id == person_id).first()
+from collections import defaultdict
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from app.database import Database, get_db, get_read_db
+from app import crud, models, schemas
+from app.bulk import ConflictAction, bulk_create, bulk_delete, bulk_update
+from app.cache import CachedRoute, cached, invalidate
+from app.export import ExportFormat, export_response
+from app.filters import filter_in
+from app.integrity import DeleteChildren, delete_entity
+from app.pagination import paginate
+from app.serialization import field_columns, json_list, json_object, requested_fields
+from app.versions import conditional
+
+router = APIRouter(route_class=CachedRoute)
+
+def _filter_persons(query, department, role):
+    query = filter_in(query, models.Person.department, department)
+    query = filter_in(query, models.Person.role, role)
+    return query
+
+@router.get("/", response_model=List[schemas.Person], dependencies=[Depends(conditional("persons"))])
+@cached("persons")
+async def get_persons(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    department: Optional[List[str]] = Query(None),
+    role: Optional[List[str]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    names = requested_fields(schemas.Person, fields)
+    def page(session: Session):
+        query = _filter_persons(session.query(*field_columns(models.Person, names)), department, role)
+        return paginate(query, models.Person, response, skip, limit, cursor)
+    return json_list(await db.run(page), names, response)
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def create_persons_bulk(
+    persons: List[schemas.PersonCreate],
+    atomic: bool = True,
+    on_conflict: ConflictAction = "error",
+    db: Database = Depends(get_db),
+):
+    result = await db.run(bulk_create, models.Person, persons, atomic=atomic, on_conflict=on_conflict)
+    await invalidate("persons")
+    return result
+
+@router.put("/bulk", response_model=schemas.BulkResult)
+async def update_persons_bulk(persons: List[schemas.PersonBulkUpdate], atomic: bool = True, db: Database = Depends(get_db)):
+    result = await db.run(bulk_update, models.Person, persons, atomic=atomic)
+    await invalidate("persons")
+    return result
+
+@router.delete("/bulk", response_model=schemas.BulkResult)
+async def delete_persons_bulk(ids: List[str] = Body(...), atomic: bool = True, db: Database = Depends(get_db)):
+    result = await db.run(bulk_delete, models.Person, ids, atomic=atomic)
+    await invalidate("persons")
+    return result
+
+@router.get("/export")
+async def export_persons(
+    format: ExportFormat = "ndjson",
+    department: Optional[List[str]] = Query(None),
+    role: Optional[List[str]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    query = _filter_persons(select(models.Person), department, role)
+    return export_response(query, models.Person, schemas.Person, format, "persons", bind=db.sync_bind)
+
+@router.get("/{person_id}", response_model=schemas.Person, dependencies=[Depends(conditional("persons"))])
+@cached("persons")
+async def get_person(person_id: str, response: Response, fields: Optional[str] = None, db: Database = Depends(get_read_db)):
+    names = requested_fields(schemas.Person, fields)
+    return json_object(await db.run(crud.get_fields_or_404, models.Person, names, person_id, "Person"), names, response)
+
+def _get_person_full(db: Session, person_id: str):
+    person = (
+        db.query(models.Person)
+        .options(selectinload(models.Person.assignments))
+        .filter(models.Person.id == person_id)
+        .first()
+    )
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
-    return person
+
+    # One IN query per assigned entity type
+    entity_ids = defaultdict(set)
+    for assignment in person.assignments:
+        entity_ids[assignment.entity_type].add(assignment.entity_id)
+
+    def assigned(model, entity_type):
+        ids = entity_ids.get(entity_type)
+        if not ids:
+            return []
+        return db.query(model).filter(model.id.in_(ids)).all()
+
+    return {
+        **schemas.Person.model_validate(person).model_dump(),
+        "assignments": person.assignments,
+        "datacenters": assigned(models.Datacenter, models.EntityType.datacenter),
+        "servers": assigned(models.Server, models.EntityType.server),
+        "hosts": assigned(models.Host, models.EntityType.host),
+        "ip_addresses": assigned(models.IPAddress, models.EntityType.ip),
+    }
+
+@router.get("/{person_id}/full", response_model=schemas.PersonFull)
+async def get_person_full(person_id: str, db: Database = Depends(get_read_db)):
+    return await db.run(_get_person_full, person_id)
 
 @router.post("/", response_model=schemas.Person)
-def create_person(person: schemas.PersonCreate, db: Session = Depends(get_db)):
-    db_person = models.Person(**person.model_dump())
-    db.add(db_person)
-    db.commit()
-    db.refresh(db_person)
-    return db_person
+async def create_person(person: schemas.PersonCreate, db: Database = Depends(get_db)):
+    result = await db.run(crud.create, models.Person, person)
+    await invalidate("persons")
+    return result
 
 @router.put("/{person_id}", response_model=schemas.Person)
-def update_person(person_id: str, person: schemas.PersonCreate, db: Session = Depends(get_db)):
-    db_person = db.query(models.Person).filter(models.Person.id == person_id).first()
-    if not db_person:
-        raise HTTPException(status_code=404, detail="Person not found")
-    for key, value in person.model_dump().items():
-        setattr(db_person, key, value)
-    db.commit()
-    db.refresh(db_person)
-    return db_person
+async def update_person(person_id: str, person: schemas.PersonCreate, db: Database = Depends(get_db)):
+    result = await db.run(crud.update, models.Person, person_id, person, "Person")
+    await invalidate("persons")
+    return result
 
 @router.delete("/{person_id}")
-def delete_person(person_id: str, db: Session = Depends(get_db)):
-    db_person = db.query(models.Person).filter(models.Person.id == person_id).first()
-    if not db_person:
-        raise HTTPException(status_code=404, detail="Person not found")
-    db.delete(db_person)
-    db.commit()
-    return {"message": "Person deleted"}
+async def delete_person(person_id: str, children: DeleteChildren = "restrict", db: Database = Depends(get_db)):
+    result = await db.run(delete_entity, models.Person, person_id, "Person", children)
+    await invalidate("persons")
+    return result
 
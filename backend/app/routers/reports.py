@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from app.database import Database, get_db, get_read_db
+from app import models, schemas
+from app.reports import CapacityGroup, CapacitySource, capacity_report, refresh_capacity
+
+router = APIRouter()
+
+@router.get("/capacity", response_model=schemas.CapacityReport)
+async def get_capacity(
+    group_by: CapacityGroup = "datacenter",
+    source: CapacitySource = "view",
+    datacenter_id: Optional[List[str]] = Query(None),
+    server_id: Optional[List[str]] = Query(None),
+    os_id: Optional[List[str]] = Query(None),
+    type: Optional[List[models.HostType]] = Query(None),
+    status: Optional[List[models.HostStatus]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    return await db.run(
+        capacity_report,
+        group_by=group_by,
+        source=source,
+        datacenter_id=datacenter_id,
+        server_id=server_id,
+        os_id=os_id,
+        type=type,
+        status=status,
+    )
+
+@router.post("/capacity/refresh")
+async def refresh_capacity_view(db: Database = Depends(get_db)):
+    return {"refreshed": await db.run(refresh_capacity)}
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from app.database import Database, get_read_db
+from app import schemas
+from app.search import SEARCH_TABLES, search
+from app.versions import conditional
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.SearchResults, dependencies=[Depends(conditional(*SEARCH_TABLES))])
+async def search_entities(
+    q: str = Query(..., min_length=3, max_length=200),
+    type: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Database = Depends(get_read_db),
+):
+    """Hosts, servers, IP addresses, persons and datacenters matching ``q``, best first.
+
+    ``facets`` counts the matches per type, up to 1,000.
+    """
+    return await db.run(search, q, type, limit)
@@ -1,48 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app import models, schemas
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
+from app.database import Database, get_db, get_read_db
+from app import crud, models, schemas
+from app.bulk import ConflictAction, bulk_create, bulk_delete, bulk_update
+from app.export import ExportFormat, export_response
+from app.filters import filter_in
+from app.integrity import DeleteChildren, delete_entity
+from app.loaders import entity_assignments
+from app.pagination import paginate
+from app.serialization import field_columns, json_list, json_object, requested_fields
+from app.versions import conditional
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Server])
-def get_servers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    servers = db.query(models.Server).offset(skip).limit(limit).all()
-    return servers
+def _filter_servers(query, datacenter_id, status, model):
+    query = filter_in(query, models.Server.datacenter_id, datacenter_id)
+    query = filter_in(query, models.Server.status, status)
+    query = filter_in(query, models.Server.model, model)
+    return query
 
-@router.get("/{server_id}", response_model=schemas.Server)
-def get_server(server_id: str, db: Session = Depends(get_db)):
-    server = db.query(models.Server).filter(models.Server.id == server_id).first()
+@router.get("/", response_model=List[schemas.Server], dependencies=[Depends(conditional("servers"))])
+async def get_servers(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    datacenter_id: Optional[List[str]] = Query(None),
+    status: Optional[List[models.ServerStatus]] = Query(None),
+    model: Optional[List[str]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    names = requested_fields(schemas.Server, fields)
+    def page(session: Session):
+        query = _filter_servers(session.query(*field_columns(models.Server, names)), datacenter_id, status, model)
+        return paginate(query, models.Server, response, skip, limit, cursor)
+    return json_list(await db.run(page), names, response)
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def create_servers_bulk(
+    servers: List[schemas.ServerCreate],
+    atomic: bool = True,
+    on_conflict: ConflictAction = "error",
+    db: Database = Depends(get_db),
+):
+    return await db.run(bulk_create, models.Server, servers, atomic=atomic, on_conflict=on_conflict)
+
+@router.put("/bulk", response_model=schemas.BulkResult)
+async def update_servers_bulk(servers: List[schemas.ServerBulkUpdate], atomic: bool = True, db: Database = Depends(get_db)):
+    return await db.run(bulk_update, models.Server, servers, atomic=atomic)
+
+@router.delete("/bulk", response_model=schemas.BulkResult)
+async def delete_servers_bulk(ids: List[str] = Body(...), atomic: bool = True, db: Database = Depends(get_db)):
+    return await db.run(bulk_delete, models.Server, ids, atomic=atomic)
+
+@router.get("/export")
+async def export_servers(
+    format: ExportFormat = "ndjson",
+    datacenter_id: Optional[List[str]] = Query(None),
+    status: Optional[List[models.ServerStatus]] = Query(None),
+    model: Optional[List[str]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    query = _filter_servers(select(models.Server), datacenter_id, status, model)
+    return export_response(query, models.Server, schemas.Server, format, "servers", bind=db.sync_bind)
+
+@router.get("/{server_id}", response_model=schemas.Server, dependencies=[Depends(conditional("servers"))])
+async def get_server(server_id: str, response: Response, fields: Optional[str] = None, db: Database = Depends(get_read_db)):
+    names = requested_fields(schemas.Server, fields)
+    return json_object(await db.run(crud.get_fields_or_404, models.Server, names, server_id, "Server"), names, response)
+
+def _get_server_full(db: Session, server_id: str):
+    server = (
+        db.query(models.Server)
+        .options(joinedload(models.Server.datacenter), selectinload(models.Server.hosts))
+        .filter(models.Server.id == server_id)
+        .first()
+    )
     if not server:
         raise HTTPException(status_code=404, detail="Server not found")
-    return server
+    return {
+        **schemas.Server.model_validate(server).model_dump(),
+        "datacenter": server.datacenter,
+        "hosts": server.hosts,
+        "assignments": entity_assignments(db, models.EntityType.server, server_id),
+    }
+
+@router.get("/{server_id}/full", response_model=schemas.ServerFull)
+async def get_server_full(server_id: str, db: Database = Depends(get_read_db)):
+    return await db.run(_get_server_full, server_id)
 
 @router.post("/", response_model=schemas.Server)
-def create_server(server: schemas.ServerCreate, db: Session = Depends(get_db)):
-    db_server = models.Server(**server.model_dump())
-    db.add(db_server)
-    db.commit()
-    db.refresh(db_server)
-    return db_server
+async def create_server(server: schemas.ServerCreate, db: Database = Depends(get_db)):
+    return await db.run(crud.create, models.Server, server)
 
 @router.put("/{server_id}", response_model=schemas.Server)
-def update_server(server_id: str, server: schemas.ServerCreate, db: Session = Depends(get_db)):
-    db_server = db.query(models.Server).filter(models.Server.id == server_id).first()
-    if not db_server:
-        raise HTTPException(status_code=404, detail="Server not found")
-    for key, value in server.model_dump().items():
-        setattr(db_server, key, value)
-    db.commit()
-    db.refresh(db_server)
-    return db_server
+async def update_server(server_id: str, server: schemas.ServerCreate, db: Database = Depends(get_db)):
+    return await db.run(crud.update, models.Server, server_id, server, "Server")
 
 @router.delete("/{server_id}")
-def delete_server(server_id: str, db: Session = Depends(get_db)):
-    db_server = db.query(models.Server).filter(models.Server.id == server_id).first()
-    if not db_server:
-        raise HTTPException(status_code=404, detail="Server not found")
-    db.delete(db_server)
-    db.commit()
-    return {"message": "Server deleted"}
+async def delete_server(server_id: str, children: DeleteChildren = "restrict", db: Database = Depends(get_db)):
+    return await db.run(delete_entity, models.Server, server_id, "Server", children)
 
@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import JSON, func, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+from app.database import Database, get_read_db
+from app import models, schemas
+from app.versions import ALL_TABLES, conditional
+
+router = APIRouter()
+
+def _counts(model, name: str, *columns):
+    """One-row subquery with the row count of ``model`` plus extra aggregates."""
+    return select(func.count().label(name), *columns).select_from(model).subquery()
+
+def _counts_by(column, enum, prefix: str):
+    """``COUNT(*) FILTER (WHERE column = member)`` for every member of ``enum``."""
+    return [func.count().filter(column == member).label(f"{prefix}_{member.name}") for member in enum]
+
+def _breakdown(row, enum, prefix: str):
+    return {member.value: row[f"{prefix}_{member.name}"] for member in enum}
+
+def _by_datacenter():
+    """Scalar subquery with the per-datacenter breakdown as a JSON array, ordered by name."""
+    servers = (
+        select(
+            models.Server.datacenter_id,
+            func.count().label("servers"),
+            func.count().filter(models.Server.status == models.ServerStatus.online).label("online_servers"),
+        )
+        .group_by(models.Server.datacenter_id)
+        .subquery()
+    )
+    hosts = (
+        select(
+            models.Server.datacenter_id,
+            func.count().label("hosts"),
+            func.count().filter(models.Host.status == models.HostStatus.running).label("running_hosts"),
+        )
+        .join(models.Host, models.Host.server_id == models.Server.id)
+        .group_by(models.Server.datacenter_id)
+        .subquery()
+    )
+    rows = (
+        select(
+            models.Datacenter.id.label("datacenter_id"),
+            models.Datacenter.name,
+            func.coalesce(servers.c.servers, 0).label("servers"),
+            func.coalesce(servers.c.online_servers, 0).label("online_servers"),
+            func.coalesce(hosts.c.hosts, 0).label("hosts"),
+            func.coalesce(hosts.c.running_hosts, 0).label("running_hosts"),
+        )
+        .outerjoin(servers, servers.c.datacenter_id == models.Datacenter.id)
+        .outerjoin(hosts, hosts.c.datacenter_id == models.Datacenter.id)
+        .subquery("by_datacenter")
+    )
+    return (
+        select(func.json_agg(aggregate_order_by(rows.table_valued(), rows.c.name), type_=JSON))
+        .scalar_subquery()
+        .label("by_datacenter")
+    )
+
+def _get_stats(db: Session):
+    # Totals, per-status and per-datacenter breakdowns: one statement, one round trip
+    counts = [
+        _counts(models.Datacenter, "datacenters"),
+        _counts(
+            models.Server, "servers",
+            *_counts_by(models.Server.status, models.ServerStatus, "server_status"),
+        ),
+        _counts(
+            models.Host, "hosts",
+            *_counts_by(models.Host.status, models.HostStatus, "host_status"),
+            *_counts_by(models.Host.type, models.HostType, "host_type"),
+        ),
+        _counts(
+            models.IPAddress, "ip_addresses",
+            func.count(models.IPAddress.host_id).label("assigned_ips"),
+            *_counts_by(models.IPAddress.allocation, models.IPAllocation, "ip_allocation"),
+        ),
+        _counts(models.OperatingSystem, "operating_systems"),
+        _counts(models.Person, "persons"),
+    ]
+    stmt = select(*counts, _by_datacenter()).select_from(counts[0])
+    for subquery in counts[1:]:
+        stmt = stmt.join(subquery, true())
+    row = db.execute(stmt).one()._mapping
+
+    return schemas.DashboardStats(
+        datacenters=row["datacenters"],
+        servers=row["servers"],
+        hosts=row["hosts"],
+        ip_addresses=row["ip_addresses"],
+        operating_systems=row["operating_systems"],
+        persons=row["persons"],
+        online_servers=row["server_status_online"],
+        running_hosts=row["host_status_running"],
+        assigned_ips=row["assigned_ips"],
+        servers_by_status=_breakdown(row, models.ServerStatus, "server_status"),
+        hosts_by_status=_breakdown(row, models.HostStatus, "host_status"),
+        hosts_by_type=_breakdown(row, models.HostType, "host_type"),
+        ip_addresses_by_allocation=_breakdown(row, models.IPAllocation, "ip_allocation"),
+        # json_agg over no rows is NULL
+        by_datacenter=[schemas.DatacenterStats(**dc) for dc in row["by_datacenter"] or []],
+    )
+
+@router.get("/", response_model=schemas.DashboardStats, dependencies=[Depends(conditional(*ALL_TABLES))])
+async def get_stats(db: Database = Depends(get_read_db)):
+    return await db.run(_get_stats)
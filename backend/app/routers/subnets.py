@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from app.database import Database, get_db, get_read_db
+from app import models, schemas
+from app.filters import filter_in, filter_network
+from app.ipam import allocate, utilization
+from app.pagination import paginate
+from app.versions import conditional
+
+router = APIRouter()
+
+def _filter_subnets(query, datacenter_id, contains):
+    query = filter_in(query, models.Subnet.datacenter_id, datacenter_id)
+    query = filter_network(query, models.Subnet.cidr, ">>=", contains)
+    return query
+
+def _get_subnet(db: Session, subnet_id: str) -> models.Subnet:
+    subnet = (
+        db.query(models.Subnet)
+        .options(selectinload(models.Subnet.reserved_ranges))
+        .filter(models.Subnet.id == subnet_id)
+        .populate_existing()
+        .first()
+    )
+    if not subnet:
+        raise HTTPException(status_code=404, detail="Subnet not found")
+    return subnet
+
+def _save_subnet(db: Session, subnet: schemas.SubnetCreate, subnet_id: Optional[str] = None) -> models.Subnet:
+    if subnet_id is None:
+        db_subnet = models.Subnet()
+        db.add(db_subnet)
+    else:
+        db_subnet = _get_subnet(db, subnet_id)
+    for key, value in subnet.model_dump(exclude={"reserved_ranges"}).items():
+        setattr(db_subnet, key, value)
+    db_subnet.reserved_ranges = [models.SubnetReservedRange(**reserved.model_dump()) for reserved in subnet.reserved_ranges]
+    db.commit()
+    return _get_subnet(db, db_subnet.id)
+
+def _delete_subnet(db: Session, subnet_id: str):
+    db.delete(_get_subnet(db, subnet_id))
+    db.commit()
+    return {"message": "Subnet deleted"}
+
+@router.get("/", response_model=List[schemas.Subnet], dependencies=[Depends(conditional("subnets", "subnet_reserved_ranges"))])
+async def get_subnets(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    datacenter_id: Optional[List[str]] = Query(None),
+    contains: Optional[str] = None,
+    db: Database = Depends(get_read_db),
+):
+    def page(session: Session):
+        query = _filter_subnets(session.query(models.Subnet), datacenter_id, contains)
+        query = query.options(selectinload(models.Subnet.reserved_ranges))
+        return paginate(query, models.Subnet, response, skip, limit, cursor)
+    return await db.run(page)
+
+@router.get("/utilization", response_model=List[schemas.SubnetUtilization], dependencies=[Depends(conditional("subnets", "subnet_reserved_ranges", "ip_addresses"))])
+async def get_subnets_utilization(
+    datacenter_id: Optional[List[str]] = Query(None),
+    contains: Optional[str] = None,
+    db: Database = Depends(get_read_db),
+):
+    def report(session: Session):
+        query = _filter_subnets(session.query(models.Subnet), datacenter_id, contains)
+        subnets = query.options(selectinload(models.Subnet.reserved_ranges)).order_by(models.Subnet.cidr).all()
+        return utilization(session, subnets)
+    return await db.run(report)
+
+@router.get("/{subnet_id}", response_model=schemas.Subnet, dependencies=[Depends(conditional("subnets", "subnet_reserved_ranges"))])
+async def get_subnet(subnet_id: str, db: Database = Depends(get_read_db)):
+    return await db.run(_get_subnet, subnet_id)
+
+@router.get("/{subnet_id}/utilization", response_model=schemas.SubnetUtilization, dependencies=[Depends(conditional("subnets", "subnet_reserved_ranges", "ip_addresses"))])
+async def get_subnet_utilization(subnet_id: str, db: Database = Depends(get_read_db)):
+    return await db.run(lambda session: utilization(session, [_get_subnet(session, subnet_id)])[0])
+
+@router.post("/{subnet_id}/allocate", response_model=List[schemas.IPAddress])
+async def allocate_addresses(subnet_id: str, request: schemas.SubnetAllocate, db: Database = Depends(get_db)):
+    return await db.run(allocate, subnet_id, request)
+
+@router.post("/", response_model=schemas.Subnet)
+async def create_subnet(subnet: schemas.SubnetCreate, db: Database = Depends(get_db)):
+    return await db.run(_save_subnet, subnet)
+
+@router.put("/{subnet_id}", response_model=schemas.Subnet)
+async def update_subnet(subnet_id: str, subnet: schemas.SubnetCreate, db: Database = Depends(get_db)):
+    return await db.run(_save_subnet, subnet, subnet_id)
+
+@router.delete("/{subnet_id}")
+async def delete_subnet(subnet_id: str, db: Database = Depends(get_db)):
+    return await db.run(_delete_subnet, subnet_id)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+from typing import List, Optional
+import orjson
+from app.database import Database, get_read_db
+from app import schemas
+from app.serialization import JSON_OPTIONS
+from app.sync import changes_since, current_token, entity_tables
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.SyncPage)
+async def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    entity: Optional[List[str]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    """Changes after the ``since`` token; without it, just the token for "now"."""
+    tables = entity_tables(entity)
+    if since is None:
+        return {"changes": [], "next": await db.run(current_token), "has_more": False}
+    page = await db.run(changes_since, since, limit, tables)
+    return Response(content=orjson.dumps(page, option=JSON_OPTIONS), media_type="application/json")
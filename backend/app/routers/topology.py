@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.database import Database, get_read_db
+from app import models
+from app.topology import TOPOLOGY_TABLES, plan_topology, stream_topology
+from app.versions import conditional
+
+router = APIRouter()
+
+@router.get("/", dependencies=[Depends(conditional(*TOPOLOGY_TABLES))])
+async def get_topology(
+    response: Response,
+    root_type: models.EntityType = models.EntityType.datacenter,
+    root_id: Optional[str] = None,
+    depth: Optional[int] = Query(None, ge=0, le=3),
+    server_status: Optional[List[models.ServerStatus]] = Query(None),
+    host_type: Optional[List[models.HostType]] = Query(None),
+    host_status: Optional[List[models.HostStatus]] = Query(None),
+    db: Database = Depends(get_read_db),
+):
+    """Nested datacenter -> server -> host -> IP address tree, below one root or for the whole estate."""
+    # Unknown roots are reported before the response starts
+    topology = await db.run(plan_topology, root_type, root_id, depth, server_status, host_type, host_status)
+    streamed = StreamingResponse(stream_topology(db, topology), media_type="application/json")
+    streamed.headers.raw.extend(response.headers.raw)
+    return streamed
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+import ipaddress
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 from app.models import ServerStatus, HostType, HostStatus, IPType, IPAllocation, EntityType, AssignmentRole
 
@@ -12,6 +13,9 @@ class DatacenterBase(BaseModel):
 class DatacenterCreate(DatacenterBase):
     pass
 
+class DatacenterBulkUpdate(DatacenterBase):
+    id: str
+
 class Datacenter(DatacenterBase):
     id: str
     created_at: datetime
@@ -31,6 +35,9 @@ class ServerBase(BaseModel):
 class ServerCreate(ServerBase):
     pass
 
+class ServerBulkUpdate(ServerBase):
+    id: str
+
 class Server(ServerBase):
     id: str
     created_at: datetime
@@ -49,6 +56,9 @@ class OperatingSystemBase(BaseModel):
 class OperatingSystemCreate(OperatingSystemBase):
     pass
 
+class OperatingSystemBulkUpdate(OperatingSystemBase):
+    id: str
+
 class OperatingSystem(OperatingSystemBase):
     id: str
     created_at: datetime
@@ -70,6 +80,9 @@ class HostBase(BaseModel):
 class HostCreate(HostBase):
     pass
 
+class HostBulkUpdate(HostBase):
+    id: str
+
 class Host(HostBase):
     id: str
     created_at: datetime
@@ -85,9 +98,19 @@ class IPAddressBase(BaseModel):
     type: IPType
     allocation: IPAllocation
 
+    @field_validator("address")
+    @classmethod
+    def validate_address(cls, value: str) -> str:
+        # Stored as inet: a host address, optionally with its prefix length
+        ipaddress.ip_interface(value)
+        return value
+
 class IPAddressCreate(IPAddressBase):
     pass
 
+class IPAddressBulkUpdate(IPAddressBase):
+    id: str
+
 class IPAddress(IPAddressBase):
     id: str
     created_at: datetime
@@ -96,6 +119,69 @@ class IPAddress(IPAddressBase):
     class Config:
         from_attributes = True
 
+# Subnet schemas
+class ReservedRangeBase(BaseModel):
+    start_address: str
+    end_address: str
+    description: Optional[str] = None
+
+class ReservedRange(ReservedRangeBase):
+    id: str
+
+    class Config:
+        from_attributes = True
+
+class SubnetBase(BaseModel):
+    name: str
+    cidr: str
+    datacenter_id: Optional[str] = None
+    description: Optional[str] = None
+
+    @field_validator("cidr")
+    @classmethod
+    def validate_cidr(cls, value: str) -> str:
+        # Stored as cidr, which rejects host bits right of the prefix
+        return str(ipaddress.ip_network(value))
+
+class SubnetCreate(SubnetBase):
+    reserved_ranges: List[ReservedRangeBase] = []
+
+    @model_validator(mode="after")
+    def validate_reserved_ranges(self):
+        network = ipaddress.ip_network(self.cidr)
+        for reserved in self.reserved_ranges:
+            start = ipaddress.ip_address(reserved.start_address)
+            end = ipaddress.ip_address(reserved.end_address)
+            if start not in network or end not in network:
+                raise ValueError(f"Reserved range {start}-{end} is outside {network}")
+            if start > end:
+                raise ValueError(f"Reserved range {start}-{end} ends before it starts")
+        return self
+
+class Subnet(SubnetBase):
+    id: str
+    reserved_ranges: List[ReservedRange] = []
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class SubnetAllocate(BaseModel):
+    count: int = Field(1, ge=1, le=65536)
+    allocation: IPAllocation = IPAllocation.static
+    host_id: Optional[str] = None
+
+class SubnetUtilization(BaseModel):
+    subnet_id: str
+    name: str
+    cidr: str
+    size: int
+    reserved: int
+    used: int
+    free: int
+    utilization: float
+
 # Person schemas
 class PersonBase(BaseModel):
     name: str
@@ -107,6 +193,9 @@ class PersonBase(BaseModel):
 class PersonCreate(PersonBase):
     pass
 
+class PersonBulkUpdate(PersonBase):
+    id: str
+
 class Person(PersonBase):
     id: str
     created_at: datetime
@@ -125,6 +214,9 @@ class AssignmentBase(BaseModel):
 class AssignmentCreate(AssignmentBase):
     pass
 
+class AssignmentBulkUpdate(AssignmentBase):
+    id: str
+
 class Assignment(AssignmentBase):
     id: str
     created_at: datetime
@@ -132,3 +224,179 @@ class Assignment(AssignmentBase):
     class Config:
         from_attributes = True
 
+
+# Bulk operation schemas
+class BulkError(BaseModel):
+    index: int
+    id: Optional[str] = None
+    detail: str
+
+class BulkResult(BaseModel):
+    ids: List[str]
+    errors: List[BulkError] = []
+
+# Import schemas
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+class ImportResult(BaseModel):
+    entity: str
+    processed: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[ImportRowError] = []
+
+class ImportProgress(BaseModel):
+    id: str
+    entity: str
+    format: str
+    started_at: datetime
+    received_bytes: int
+    staged: int
+    merging: bool
+
+# Composite detail schemas
+class AssignmentWithPerson(Assignment):
+    person: Person
+
+class DatacenterFull(Datacenter):
+    servers: List[Server]
+    assignments: List[AssignmentWithPerson]
+
+class ServerFull(Server):
+    datacenter: Datacenter
+    hosts: List[Host]
+    assignments: List[AssignmentWithPerson]
+
+class OperatingSystemFull(OperatingSystem):
+    hosts: List[Host]
+
+class HostFull(Host):
+    server: Server
+    operating_system: Optional[OperatingSystem] = None
+    ip_addresses: List[IPAddress]
+    assignments: List[AssignmentWithPerson]
+
+class IPAddressFull(IPAddress):
+    host: Optional[Host] = None
+    server: Optional[Server] = None
+    assignments: List[AssignmentWithPerson]
+
+class PersonFull(Person):
+    assignments: List[Assignment]
+    datacenters: List[Datacenter]
+    servers: List[Server]
+    hosts: List[Host]
+    ip_addresses: List[IPAddress]
+
+# Dashboard statistics schemas
+class DatacenterStats(BaseModel):
+    datacenter_id: str
+    name: str
+    servers: int
+    online_servers: int
+    hosts: int
+    running_hosts: int
+
+class DashboardStats(BaseModel):
+    datacenters: int
+    servers: int
+    hosts: int
+    ip_addresses: int
+    operating_systems: int
+    persons: int
+    online_servers: int
+    running_hosts: int
+    assigned_ips: int
+    servers_by_status: Dict[str, int]
+    hosts_by_status: Dict[str, int]
+    hosts_by_type: Dict[str, int]
+    ip_addresses_by_allocation: Dict[str, int]
+    by_datacenter: List[DatacenterStats]
+
+# Capacity report schemas
+class CapacityRow(BaseModel):
+    key: Optional[str] = None
+    name: Optional[str] = None
+    hosts: int
+    running_hosts: int
+    cpu: int
+    memory_gb: int
+
+class CapacityReport(BaseModel):
+    group_by: str
+    source: str
+    refreshed_at: Optional[datetime] = None
+    rows: List[CapacityRow]
+    total: CapacityRow
+
+# Incremental sync schemas
+class SyncChange(BaseModel):
+    entity: str
+    id: str
+    op: Literal["insert", "update", "delete"]
+    data: Optional[Dict[str, Any]] = None
+
+class SyncPage(BaseModel):
+    changes: List[SyncChange]
+    next: str
+    has_more: bool
+
+# Search schemas
+class SearchHit(BaseModel):
+    type: str
+    id: str
+    label: str
+    field: str
+    value: str
+    score: float
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchHit]
+    facets: Dict[str, int]
+
+# Effective access schemas
+class AccessGrant(BaseModel):
+    assignment_id: str
+    role: AssignmentRole
+    entity_type: EntityType
+    entity_id: str
+    inherited: bool
+
+class PersonAccessEntry(BaseModel):
+    person_id: str
+    person_name: str
+    person_email: str
+    role: AssignmentRole
+    grants: List[AccessGrant]
+
+class EntityAccess(BaseModel):
+    entity_type: EntityType
+    entity_id: str
+    persons: List[PersonAccessEntry]
+
+class AccessibleEntity(BaseModel):
+    entity_type: EntityType
+    entity_id: str
+    role: AssignmentRole
+    grants: List[AccessGrant]
+
+# Integrity schemas
+class IntegrityCheck(BaseModel):
+    check: Literal["orphaned_assignment", "broken_reference"]
+    table: str
+    column: str
+    references: str
+    count: int
+    sample: List[str]
+
+class IntegrityReport(BaseModel):
+    ok: bool
+    checks: List[IntegrityCheck]
+
+class IntegrityRepair(BaseModel):
+    deleted_assignments: Dict[str, int]
+    report: IntegrityReport
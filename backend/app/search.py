@@ -0,0 +1,145 @@
+"""Substring and fuzzy search across entities, backed by pg_trgm GiST indexes.
+
+A row matches when one of its searchable fields contains the query
+(``ILIKE '%q%'``) or is similar to it (pg_trgm's ``%`` operator, which
+tolerates typos). Both predicates are answered by the trigram indexes of
+migration 012, so no table is scanned.
+
+Each match is scored ``similarity(field, q)``, plus 1 when the field contains
+the query, so substring hits come first and shorter, closer values rank above
+longer ones. Matches are not all scored: per field, the index is walked in
+trigram distance order (``<->``) twice, once for substring matches and once
+for similar values, each stopping after ``limit`` rows. Any row among the
+best ``limit`` of its type is among those candidates, so only they are scored
+and ranked. All entity types are searched in a single ``UNION ALL`` statement.
+
+``facets`` counts the matches per type up to ``FACET_LIMIT``, so broad queries
+cost no more than a fixed number of index entries; a type with more matches
+reports ``FACET_LIMIT``.
+"""
+from typing import Dict, NamedTuple, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Float, Integer, String, case, cast, func, literal, or_, select, union, union_all
+from sqlalchemy.orm import Session
+
+from app import models
+
+class SearchTarget(NamedTuple):
+    model: type
+    label: object
+    # Field name -> searched expression; each has a trigram index
+    fields: Dict[str, object]
+
+
+SEARCH_TARGETS: Dict[str, SearchTarget] = {
+    "hosts": SearchTarget(models.Host, models.Host.hostname, {"hostname": models.Host.hostname}),
+    "servers": SearchTarget(
+        models.Server, models.Server.hostname,
+        {"hostname": models.Server.hostname, "serial_number": models.Server.serial_number},
+    ),
+    "ip-addresses": SearchTarget(
+        models.IPAddress, func.host(models.IPAddress.address),
+        {"address": func.host(models.IPAddress.address)},
+    ),
+    "persons": SearchTarget(models.Person, models.Person.name, {"name": models.Person.name, "email": models.Person.email}),
+    "datacenters": SearchTarget(models.Datacenter, models.Datacenter.name, {"name": models.Datacenter.name}),
+}
+
+# Matches counted per type for ``facets``; broader queries report this many
+FACET_LIMIT = 1000
+
+# Tables whose changes can alter search results, for conditional GET
+SEARCH_TABLES = ("hosts", "servers", "ip_addresses", "persons", "datacenters")
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _target_query(type_name: str, target: SearchTarget, q: str, limit: int):
+    pattern = f"%{_escape_like(q)}%"
+    fields = list(target.fields.items())
+    # Per field: its substring and its similarity predicate
+    predicates = [
+        (expression, (expression.ilike(pattern, escape="\\"), expression.op("%")(q)))
+        for _, expression in fields
+    ]
+    # For each predicate, the ``limit`` nearest matches, read in distance order
+    # from the GiST index (ties broken as in the final ranking)
+    nearest = union(*[
+        select(target.model.id.label("id"))
+        .where(predicate)
+        .order_by(expression.op("<->", return_type=Float)(q), target.label, target.model.id)
+        .limit(limit)
+        for expression, pair in predicates
+        for predicate in pair
+    ]).subquery()
+    matches = (
+        select(literal(1))
+        .where(or_(*[predicate for _, pair in predicates for predicate in pair]))
+        .limit(FACET_LIMIT)
+        .subquery()
+    )
+
+    scores = [
+        cast(expression.ilike(pattern, escape="\\"), Integer) + func.similarity(expression, q)
+        for _, expression in fields
+    ]
+    best = scores[0] if len(scores) == 1 else func.greatest(*scores)
+    candidates = (
+        select(
+            target.model.id.label("id"),
+            target.label.label("label"),
+            *[expression.label(f"value_{i}") for i, (_, expression) in enumerate(fields)],
+            *[score.label(f"score_{i}") for i, score in enumerate(scores)],
+            best.label("score"),
+            select(func.count()).select_from(matches).scalar_subquery().label("total"),
+        )
+        .join(nearest, nearest.c.id == target.model.id)
+        .order_by(best.desc(), target.label, target.model.id)
+        .limit(limit)
+        .subquery()
+    )
+    score_columns = [candidates.c[f"score_{i}"] for i in range(len(fields))]
+    if len(fields) == 1:
+        field, value = literal(fields[0][0]), candidates.c.value_0
+    else:
+        # The best-scoring field, and its value, explain the match
+        field = case(*[(score == candidates.c.score, literal(name)) for score, (name, _) in zip(score_columns, fields)])
+        value = case(*[(score == candidates.c.score, candidates.c[f"value_{i}"]) for i, score in enumerate(score_columns)])
+    return select(
+        literal(type_name, String).label("type"),
+        candidates.c.id,
+        candidates.c.label,
+        field.label("field"),
+        value.label("value"),
+        candidates.c.score,
+        candidates.c.total,
+    )
+
+
+def search(db: Session, q: str, types: Optional[Sequence[str]], limit: int) -> dict:
+    """The ``limit`` best matches for ``q`` across ``types`` (all by default), with per-type counts."""
+    types = list(types or SEARCH_TARGETS)
+    unknown = set(types) - SEARCH_TARGETS.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(sorted(unknown))}")
+
+    rows = db.execute(union_all(*[
+        _target_query(type_name, SEARCH_TARGETS[type_name], q, limit) for type_name in types
+    ])).all()
+
+    facets: Dict[str, int] = {type_name: 0 for type_name in types}
+    for row in rows:
+        facets[row.type] = row.total
+    ranked = sorted(rows, key=lambda row: (-row.score, row.label))[:limit]
+    return {
+        "query": q,
+        "results": [
+            {"type": row.type, "id": row.id, "label": row.label, "field": row.field,
+             "value": row.value, "score": round(row.score, 4)}
+            for row in ranked
+        ],
+        "facets": facets,
+    }
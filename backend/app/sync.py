@@ -0,0 +1,232 @@
+"""Incremental sync: every insert, update and delete since a token.
+
+Statement-level triggers (migration 009) append one ``change_log`` row per
+written row, whether the write came from the API, a bulk import or plain SQL,
+so hard deletes leave a tombstone behind. ``changes_since`` reads the log
+after the caller's token through the ``(txid, id)`` index and loads the
+current state of the rows it names, so a mirror does work proportional to
+what changed rather than to the size of the inventory.
+
+The log is ordered by writing transaction (``txid``) rather than by commit
+time, which Postgres does not expose. A transaction that started earlier but
+commits later would land behind a token already handed out, so only changes
+of transactions older than the oldest one still running
+(``pg_snapshot_xmin``) are returned: every change shows up exactly once, at
+the cost of a long-running write transaction holding back newer changes
+until it finishes.
+
+Entries are collapsed per row and carry the row's current state, so a client
+simply upserts or deletes. Entries older than ``SYNC_RETENTION_DAYS`` are
+pruned in the background; a token from before the pruned range is answered
+with 410 and the client has to start over from a full copy.
+"""
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import BigInteger, Column, DateTime, MetaData, String, Table, select, text, tuple_
+from sqlalchemy.orm import Session, selectinload
+
+from app import models, schemas
+from app.database import SessionLocal
+from app.serialization import field_columns
+
+logger = logging.getLogger(__name__)
+
+# Days of change history kept for sync clients; 0 keeps everything
+SYNC_RETENTION_DAYS = int(os.getenv("SYNC_RETENTION_DAYS", "30"))
+_PRUNE_INTERVAL = 3600
+
+# Kept out of Base.metadata: the tables and their triggers come from migration 009
+_metadata = MetaData()
+change_log = Table(
+    "change_log",
+    _metadata,
+    Column("id", BigInteger, primary_key=True),
+    Column("txid", BigInteger),
+    Column("entity", String),
+    Column("row_id", String),
+    Column("op", String),
+    Column("changed_at", DateTime(timezone=True)),
+)
+change_log_horizon = Table(
+    "change_log_horizon",
+    _metadata,
+    Column("txid", BigInteger),
+    Column("change_id", BigInteger),
+)
+
+# Table name -> (entity name used by the API, model, schema)
+SYNC_ENTITIES = {
+    "datacenters": ("datacenters", models.Datacenter, schemas.Datacenter),
+    "servers": ("servers", models.Server, schemas.Server),
+    "operating_systems": ("operating-systems", models.OperatingSystem, schemas.OperatingSystem),
+    "hosts": ("hosts", models.Host, schemas.Host),
+    "ip_addresses": ("ip-addresses", models.IPAddress, schemas.IPAddress),
+    "subnets": ("subnets", models.Subnet, schemas.Subnet),
+    "persons": ("persons", models.Person, schemas.Person),
+    "assignments": ("assignments", models.Assignment, schemas.Assignment),
+}
+
+Position = Tuple[int, int]
+
+
+def encode_token(position: Position) -> str:
+    payload = json.dumps(list(position), separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Position:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        txid, change_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(txid), int(change_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def entity_tables(entities: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """Table names behind API entity names (``ip-addresses`` -> ``ip_addresses``)."""
+    if not entities:
+        return None
+    tables = {entity: table for table, (entity, _, _) in SYNC_ENTITIES.items()}
+    unknown = set(entities) - tables.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown entities: {', '.join(sorted(unknown))}")
+    return [tables[entity] for entity in entities]
+
+
+def _oldest_running_txid(db: Session) -> int:
+    return db.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
+
+
+def current_token(db: Session) -> str:
+    """Token for "now": changes committed from here on are returned after it.
+
+    Take it before copying the full inventory; syncing from it afterwards
+    replays whatever changed during the copy.
+    """
+    return encode_token((_oldest_running_txid(db), 0))
+
+
+def check_token(db: Session, token: str) -> Position:
+    """Decode ``token``; 410 if the changes after it have been pruned."""
+    position = decode_token(token)
+    horizon = db.execute(select(change_log_horizon.c.txid, change_log_horizon.c.change_id)).one()
+    if position < tuple(horizon):
+        raise HTTPException(status_code=410, detail="Sync token has expired; start again from a full copy")
+    return position
+
+
+def _load_rows(db: Session, table: str, ids: Sequence[str]) -> Dict[str, dict]:
+    _, model, schema = SYNC_ENTITIES[table]
+    if model is models.Subnet:
+        subnets = db.query(models.Subnet).options(selectinload(models.Subnet.reserved_ranges)).filter(models.Subnet.id.in_(ids))
+        return {subnet.id: schema.model_validate(subnet).model_dump() for subnet in subnets}
+    names = list(schema.model_fields)
+    rows = db.execute(select(*field_columns(model, names)).where(model.__table__.c.id.in_(ids)))
+    return {row.id: dict(zip(names, row)) for row in rows}
+
+
+def changes_since(
+    db: Session,
+    token: str,
+    limit: int,
+    tables: Optional[Sequence[str]] = None,
+    ids: Optional[Sequence[str]] = None,
+) -> dict:
+    """Up to ``limit`` log entries after ``token``, collapsed per row, with the next token.
+
+    ``tables`` and ``ids`` restrict the entries to those tables and row ids.
+    """
+    position = check_token(db, token)
+    oldest_running = _oldest_running_txid(db)
+    query = (
+        select(change_log.c.txid, change_log.c.id, change_log.c.entity, change_log.c.row_id, change_log.c.op)
+        .where(tuple_(change_log.c.txid, change_log.c.id) > tuple_(*position), change_log.c.txid < oldest_running)
+        .order_by(change_log.c.txid, change_log.c.id)
+        .limit(limit + 1)
+    )
+    if tables:
+        query = query.where(change_log.c.entity.in_(tables))
+    if ids:
+        query = query.where(change_log.c.row_id.in_(ids))
+    entries = db.execute(query).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Last operation per row, ordered by its last change; a row inserted and
+    # then updated within the page is still reported as an insert
+    changes: Dict[Tuple[str, str], str] = {}
+    for entry in entries:
+        key = (entry.entity, entry.row_id)
+        first_op = changes.pop(key, entry.op)
+        changes[key] = "delete" if entry.op == "delete" else ("insert" if first_op == "insert" else entry.op)
+
+    rows: Dict[str, Dict[str, dict]] = {}
+    for table in SYNC_ENTITIES:
+        ids = [row_id for (entity, row_id), op in changes.items() if entity == table and op != "delete"]
+        if ids:
+            rows[table] = _load_rows(db, table, ids)
+
+    result: List[dict] = []
+    for (table, row_id), op in changes.items():
+        data = rows.get(table, {}).get(row_id)
+        if data is None:
+            # Deleted by a change after this page; its tombstone follows later
+            op = "delete"
+        result.append({"entity": SYNC_ENTITIES[table][0], "id": row_id, "op": op, "data": data})
+
+    next_position = (entries[-1].txid, entries[-1].id) if entries else position
+    if not has_more:
+        # Nothing unseen below the oldest running transaction is left
+        next_position = max(next_position, (oldest_running, 0))
+    return {"changes": result, "next": encode_token(next_position), "has_more": has_more}
+
+
+def prune_change_log(db: Session, retention_days: int = SYNC_RETENTION_DAYS) -> int:
+    """Delete entries older than ``retention_days`` and move the token horizon past them."""
+    deleted = db.scalar(
+        text("""
+            WITH pruned AS (
+                DELETE FROM change_log
+                WHERE changed_at < now() - make_interval(days => :days)
+                RETURNING txid, id
+            ), newest AS (
+                SELECT txid, id FROM pruned ORDER BY txid DESC, id DESC LIMIT 1
+            ), horizon AS (
+                UPDATE change_log_horizon
+                SET txid = newest.txid, change_id = newest.id
+                FROM newest
+                WHERE (newest.txid, newest.id) > (change_log_horizon.txid, change_log_horizon.change_id)
+            )
+            SELECT count(*) FROM pruned
+        """),
+        {"days": retention_days},
+    )
+    db.commit()
+    return deleted
+
+
+def _prune_in_session():
+    db = SessionLocal()
+    try:
+        return prune_change_log(db)
+    finally:
+        db.close()
+
+
+async def prune_periodically(interval: int = _PRUNE_INTERVAL):
+    """Background task pruning ``change_log`` every ``interval`` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_prune_in_session)
+        except Exception:
+            logger.exception("Pruning change_log failed")
@@ -0,0 +1,171 @@
+"""Datacenter -> Server -> Host -> IP address tree, one query per level and slice.
+
+``plan_topology`` reads the top level of the requested tree; the subtrees
+below it are then loaded, encoded and sent one slice of roots at a time
+(``stream_topology``), so the first datacenter reaches the client while the
+rest are still being read, and memory holds one slice, not the whole estate.
+
+A slice is read top-down, one statement of plain columns per level (no ORM
+objects, no lazy loads), each selecting the rows whose parent is among the ids
+the level above returned, passed as a single array literal through the
+foreign-key index. Filters apply in the statement of their level, so rows under
+a filtered-out node are never read, and enum columns are read as their plain
+labels (which equal the API values). Rows come straight off the driver's
+cursor into node dicts listed by parent id, and are never kept as rows, so the
+garbage collector has fewer live objects to walk; the lists are then attached
+to their parents bottom-up.
+
+Every slice runs in its own short transaction, so no connection is held while
+the client reads; a tree streamed during concurrent writes may mix states from
+slightly different moments.
+"""
+from collections import defaultdict
+from typing import AsyncIterator, List, NamedTuple, Optional, Sequence
+
+import orjson
+from sqlalchemy import Enum, String, any_, bindparam, cast, select, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.access import ENTITY_LABELS, ENTITY_MODELS
+from app.serialization import JSON_OPTIONS
+
+EntityType = models.EntityType
+
+LEVELS = [EntityType.datacenter, EntityType.server, EntityType.host, EntityType.ip]
+
+# Per level: columns of a node, the key its children are listed under, and
+# the column siblings are sorted by
+_NODES = {
+    EntityType.datacenter: (["id", "name", "location"], "servers", models.Datacenter.name),
+    EntityType.server: (["id", "hostname", "model", "serial_number", "status"], "hosts", models.Server.hostname),
+    EntityType.host: (["id", "hostname", "type", "status", "cpu", "memory_gb"], "ip_addresses", models.Host.hostname),
+    EntityType.ip: (["id", "address", "type", "allocation"], None, models.IPAddress.address),
+}
+
+# Per level below datacenters: the column pointing at the parent node
+_PARENT_KEYS = {
+    EntityType.server: models.Server.datacenter_id,
+    EntityType.host: models.Host.server_id,
+    EntityType.ip: models.IPAddress.host_id,
+}
+
+# Top-level nodes loaded and sent together: about one datacenter's worth of rows
+_SLICE_ROOTS = {
+    EntityType.datacenter: 1,
+    EntityType.server: 250,
+    EntityType.host: 5000,
+    EntityType.ip: 5000,
+}
+
+# Tables whose changes can alter the tree, for conditional GET
+TOPOLOGY_TABLES = ("datacenters", "servers", "hosts", "ip_addresses")
+
+
+def _level_statement(level: EntityType, filters: dict, *where, with_parent: bool = False):
+    model = ENTITY_MODELS[level]
+    columns, _, sort_key = _NODES[level]
+    selected = [model.__table__.c[name] for name in columns]
+    if with_parent:
+        selected.append(_PARENT_KEYS[level])
+    return (
+        select(*[type_coerce(column, String) if isinstance(column.type, Enum) else column for column in selected])
+        .where(*filters.get(level, []), *where)
+        .order_by(sort_key, model.id)
+    )
+
+
+def _array_literal(values: List[str]) -> str:
+    """``values`` as one Postgres array literal, parsed as a single value rather than one per element."""
+    # Text cannot contain NUL, so it can stand in for the separators while quoting
+    joined = "\0".join(values).replace("\\", "\\\\").replace('"', '\\"')
+    return '{"' + joined.replace("\0", '","') + '"}'
+
+
+class Topology(NamedTuple):
+    levels: List[EntityType]
+    filters: dict
+    # Top-level nodes, without their children yet
+    roots: List[dict]
+
+
+def plan_topology(
+    db: Session,
+    root_type: EntityType = EntityType.datacenter,
+    root_id: Optional[str] = None,
+    depth: Optional[int] = None,
+    server_status: Optional[Sequence[models.ServerStatus]] = None,
+    host_type: Optional[Sequence[models.HostType]] = None,
+    host_status: Optional[Sequence[models.HostStatus]] = None,
+) -> Topology:
+    """Levels, filters and top-level nodes of the tree under ``root_type`` (one ``root_id``, or all of them).
+
+    ``depth`` limits how many levels below the root are loaded. The filters
+    apply to the levels that are loaded: a node is left out when it does not
+    match them, and so is a node whose children were all filtered out.
+    """
+    first = LEVELS.index(root_type)
+    last = len(LEVELS) - 1 if depth is None else min(first + depth, len(LEVELS) - 1)
+    levels = LEVELS[first:last + 1]
+    if root_id is not None:
+        crud.get_or_404(db, ENTITY_MODELS[root_type], root_id, ENTITY_LABELS[root_type])
+
+    filters = {
+        EntityType.server: [models.Server.status.in_(server_status)] if server_status else [],
+        EntityType.host: (
+            ([models.Host.type.in_(host_type)] if host_type else [])
+            + ([models.Host.status.in_(host_status)] if host_status else [])
+        ),
+    }
+    columns = _NODES[levels[0]][0]
+    where = [] if root_id is None else [ENTITY_MODELS[root_type].id == root_id]
+    statement = _level_statement(levels[0], filters, *where)
+    return Topology(levels, filters, [dict(zip(columns, row)) for row in db.execute(statement)])
+
+
+def load_subtrees(db: Session, topology: Topology, roots: List[dict]) -> List[dict]:
+    """``roots`` with their subtrees attached, without those a filter below them emptied."""
+    levels, filters = topology.levels, topology.filters
+    roots = [dict(root) for root in roots]
+    # Nodes per level below the roots, top-down, listed by parent id
+    nodes = {}
+    parent_ids = [root["id"] for root in roots]
+    for level in levels[1:]:
+        columns = _NODES[level][0]
+        children = nodes[level] = defaultdict(list)
+        if parent_ids:
+            parents = any_(cast(bindparam(f"{level.value}_parents", _array_literal(parent_ids)), ARRAY(String)))
+            statement = _level_statement(level, filters, _PARENT_KEYS[level] == parents, with_parent=True)
+            result = db.connection().execute(statement)
+            # Straight off the driver's cursor, so no row outlives its node
+            for row in result.cursor:
+                children[row[-1]].append(dict(zip(columns, row)))
+            result.close()
+        parent_ids = [node["id"] for siblings in children.values() for node in siblings]
+
+    for index in reversed(range(len(levels) - 1)):
+        child_key = _NODES[levels[index]][1]
+        children = nodes[levels[index + 1]]
+        # Empty nodes are pruned when a level below them is filtered
+        pruned = any(filters.get(level) for level in levels[index + 1:])
+        groups = [roots] if index == 0 else nodes[levels[index]].values()
+        for siblings in groups:
+            for node in siblings:
+                node[child_key] = children.get(node["id"], [])
+            if pruned:
+                siblings[:] = [node for node in siblings if node[child_key]]
+    return roots
+
+
+async def stream_topology(db, topology: Topology) -> AsyncIterator[bytes]:
+    """Encode the tree as a JSON array, loading and sending one slice of top-level nodes at a time."""
+    size = _SLICE_ROOTS[topology.levels[0]]
+    yield b"["
+    first = True
+    for start in range(0, len(topology.roots), size):
+        nodes = await db.run(load_subtrees, topology, topology.roots[start:start + size])
+        if nodes:
+            yield (b"" if first else b",") + b",".join(orjson.dumps(node, option=JSON_OPTIONS) for node in nodes)
+            first = False
+    yield b"]"
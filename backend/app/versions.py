@@ -0,0 +1,120 @@
+"""Conditional GET (ETag / Last-Modified) driven by per-table change versions.
+
+Statement-level triggers (migration 008) bump a counter in ``table_versions``
+whenever a tracked table is written, whether through the API, a bulk import or
+plain SQL. A read endpoint declares the tables its response depends on with
+``Depends(conditional(...))``; the dependency reads their versions with one
+primary-key lookup and derives the ``ETag`` from them, and ``Last-Modified`` from
+when they last changed. When the client already holds that ETag (or, without
+``If-None-Match``, a copy no older than the last change) it answers 304 before
+the handler runs, so no rows are loaded.
+
+Versions are read before the rows, in a separate transaction: a write landing
+in between makes the body newer than its ETag, which at worst costs the client
+one more full response on its next poll, never a stale one.
+
+HTTP dates only have whole seconds, so ``Last-Modified`` is the last change
+rounded up to the second, and it is only sent once the database clock has
+passed that second: every later write is then strictly newer than the date the
+client holds, and ``If-Modified-Since`` cannot hide it.
+"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import BigInteger, Column, DateTime, MetaData, String, Table, func, select
+from sqlalchemy.orm import Session
+
+from app.database import Database, get_read_db
+
+# Kept out of Base.metadata: the table, its rows and triggers come from migration 008
+table_versions = Table(
+    "table_versions",
+    MetaData(),
+    Column("table_name", String, primary_key=True),
+    Column("version", BigInteger),
+    Column("changed_at", DateTime(timezone=True)),
+)
+
+ALL_TABLES = (
+    "datacenters",
+    "servers",
+    "operating_systems",
+    "hosts",
+    "ip_addresses",
+    "subnets",
+    "subnet_reserved_ranges",
+    "persons",
+    "assignments",
+)
+
+
+def get_versions(db: Session, tables: Sequence[str]) -> Tuple[Dict[str, tuple], Optional[datetime]]:
+    """``(version, changed_at)`` of each of ``tables``, and the database's current time."""
+    rows = db.execute(
+        select(
+            table_versions.c.table_name,
+            table_versions.c.version,
+            table_versions.c.changed_at,
+            func.statement_timestamp(),
+        )
+        .where(table_versions.c.table_name.in_(tables))
+    ).all()
+    now = rows[0][3] if rows else None
+    return {name: (version, changed_at) for name, version, changed_at, _ in rows}, now
+
+
+def _last_modified(changed_at: datetime, now: datetime) -> Optional[str]:
+    """``changed_at`` rounded up to an HTTP date, or ``None`` while that second is not over."""
+    if changed_at.microsecond:
+        changed_at = changed_at.replace(microsecond=0) + timedelta(seconds=1)
+    if changed_at > now:
+        return None
+    return format_datetime(changed_at.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+def not_modified(request: Request, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """Whether the client's copy is current, by ``If-None-Match`` or else ``If-Modified-Since``."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-Modified-Since only counts without If-None-Match (RFC 9110, 13.1.3)
+        return etag is not None and etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        # Invalid dates are ignored
+        return False
+
+
+def conditional(*tables: str):
+    """Dependency adding ``ETag`` / ``Last-Modified`` for ``tables`` and answering 304 on a match."""
+
+    async def check(request: Request, response: Response, db: Database = Depends(get_read_db)):
+        versions, now = await db.run(get_versions, tables)
+        if len(versions) < len(tables):
+            # Migration 008 has not run: serve the request without validators
+            return
+        etag = '"' + ".".join(str(versions[table][0]) for table in tables) + '"'
+        last_modified = _last_modified(max(changed_at for _, changed_at in versions.values()), now)
+        headers = {
+            "ETag": etag,
+            # Revalidate on every use instead of heuristic caching from Last-Modified
+            "Cache-Control": "no-cache",
+        }
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+        if not_modified(request, etag, last_modified):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return check
@@ -0,0 +1,336 @@
+"""Measure latency and throughput of the list, get, create, update and delete endpoints of every router.
+
+Starts the API with uvicorn against the database in ``DATABASE_URL``. That
+should be a throwaway database filled by ``generate_inventory.py``, so the
+numbers reflect a realistic estate. For each resource the script sends
+``--requests`` requests per operation from ``--concurrency`` keep-alive
+connections, then prints p50/p99 latency and requests per second:
+
+- list: ``GET /api/<resource>/?limit=50``
+- get: ``GET /api/<resource>/<id>``, ids sampled from the table
+- create: ``POST``, parents (datacenter, server, host, person) sampled from the tables
+- update: ``PUT`` of every created row
+- delete: ``DELETE`` of every created row, so the run leaves the data as it found it
+
+Created IP addresses and subnets come from 198.18.0.0/15, the block RFC 2544
+reserves for benchmarks, and never clash with generated or real ones.
+
+    cd backend
+    python benchmarks/generate_inventory.py --reset --datacenters 20 --servers-per-datacenter 250
+    python benchmarks/api_latency.py --output before.json
+    # ... change something ...
+    python benchmarks/api_latency.py --compare before.json --output after.json
+
+``--output`` writes the results with the run's settings, commit and table
+sizes as JSON. ``--compare`` prints the change against such a file, and exits
+with 1 when any p99 got more than ``--max-regression`` percent slower.
+"""
+import argparse
+import asyncio
+import ipaddress
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import SessionLocal  # noqa: E402
+from async_concurrency import BACKEND_DIR, percentile, start_server, wait_ready  # noqa: E402
+
+# RFC 2544 benchmarking block: addresses from the first half, /28 subnets from the second
+_BENCH_ADDRESSES = ipaddress.ip_network("198.18.0.0/16")
+_BENCH_SUBNETS = list(itertools.islice(ipaddress.ip_network("198.19.0.0/16").subnets(new_prefix=28), 4096))
+
+# Tables parents and sampled ids are read from
+_SAMPLED = ["datacenters", "servers", "hosts", "ip_addresses", "operating_systems", "persons", "assignments", "subnets"]
+
+
+class Payloads:
+    """Create and update bodies per resource, unique within a run and across runs."""
+
+    def __init__(self, samples: dict):
+        self.samples = samples
+        self.tag = uuid.uuid4().hex[:8]
+        # Random start in the benchmark blocks, so an aborted run does not block the next one
+        self.offset = uuid.uuid4().int
+
+    def _sample(self, table: str, number: int):
+        ids = self.samples[table]
+        return ids[number % len(ids)] if ids else None
+
+    def datacenters(self, number: int) -> dict:
+        return {"name": f"bench-{self.tag}-{number}", "location": "Benchmark"}
+
+    def servers(self, number: int) -> dict:
+        return {
+            "hostname": f"bench-srv-{self.tag}-{number}", "datacenter_id": self._sample("datacenters", number),
+            "model": "Benchmark", "serial_number": f"BENCH-{self.tag}-{number}", "status": "online",
+        }
+
+    def hosts(self, number: int) -> dict:
+        return {
+            "hostname": f"bench-host-{self.tag}-{number}", "server_id": self._sample("servers", number),
+            "os_id": self._sample("operating_systems", number), "type": "vm", "status": "running", "cpu": 2, "memory_gb": 4,
+        }
+
+    def ip_addresses(self, number: int) -> dict:
+        address = _BENCH_ADDRESSES[(self.offset + number) % _BENCH_ADDRESSES.num_addresses]
+        return {"address": str(address), "host_id": self._sample("hosts", number), "type": "ipv4", "allocation": "static"}
+
+    def operating_systems(self, number: int) -> dict:
+        return {"name": "Benchmark OS", "version": f"{self.tag}.{number}", "vendor": "Benchmark"}
+
+    def persons(self, number: int) -> dict:
+        return {
+            "name": f"Bench {number}", "email": f"bench-{self.tag}-{number}@example.com",
+            "role": "Engineer", "department": "Benchmark",
+        }
+
+    def assignments(self, number: int) -> dict:
+        return {
+            "person_id": self._sample("persons", number), "entity_type": "host",
+            "entity_id": self._sample("hosts", number), "role": "viewer",
+        }
+
+    def subnets(self, number: int) -> dict:
+        cidr = _BENCH_SUBNETS[(self.offset + number) % len(_BENCH_SUBNETS)]
+        return {"name": f"bench-net-{self.tag}-{number}", "cidr": str(cidr), "datacenter_id": self._sample("datacenters", number)}
+
+
+# (resource path, table, changes applied to the created body for the update)
+RESOURCES = [
+    ("datacenters", "datacenters", {"description": "updated"}),
+    ("servers", "servers", {"status": "maintenance"}),
+    ("hosts", "hosts", {"status": "stopped"}),
+    ("ip-addresses", "ip_addresses", {"allocation": "reserved"}),
+    ("operating-systems", "operating_systems", {"eol_date": "2030-01-01"}),
+    ("persons", "persons", {"phone": "+1-555-0100"}),
+    ("assignments", "assignments", {"role": "operator"}),
+    ("subnets", "subnets", {"description": "updated"}),
+]
+
+
+def sample_ids(count: int):
+    """Up to ``count`` random ids per table, and the row count of each table."""
+    db = SessionLocal()
+    try:
+        samples = {
+            table: db.scalars(text(f"SELECT id FROM {table} ORDER BY random() LIMIT :count"), {"count": count}).all()
+            for table in _SAMPLED
+        }
+        rows = {table: db.scalar(text(f"SELECT count(*) FROM {table}")) for table in _SAMPLED}
+    finally:
+        db.close()
+    return samples, rows
+
+
+async def _call(reader, writer, method: str, path: str, body=None):
+    """Send one keep-alive request and read the response; returns the status and body."""
+    content = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(content)}\r\n\r\n".encode() + content
+    )
+    status = int((await reader.readline()).split()[1])
+    length, chunked = 0, False
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.partition(b":")
+        name = name.lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"transfer-encoding" and b"chunked" in value.lower():
+            chunked = True
+    if not chunked:
+        return status, await reader.readexactly(length)
+    data = b""
+    while size := int((await reader.readline()).split(b";")[0], 16):
+        data += await reader.readexactly(size)
+        await reader.readline()
+    await reader.readline()
+    return status, data
+
+
+async def run(port: int, requests, concurrency: int):
+    """Send ``requests``, (method, path, body) tuples, from ``concurrency`` connections.
+
+    Returns the latencies, the number of non-2xx responses, the elapsed time
+    and the parsed body of every successful response, in request order.
+    """
+    pending = iter(enumerate(requests))
+    results = [None] * len(requests)
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            for index, (method, path, body) in pending:
+                started = time.perf_counter()
+                status, data = await _call(reader, writer, method, path, body)
+                latencies.append(time.perf_counter() - started)
+                if 200 <= status < 300:
+                    results[index] = json.loads(data)
+                else:
+                    errors += 1
+        finally:
+            writer.close()
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(requests)) or 1)))
+    return latencies, errors, time.monotonic() - started, results
+
+
+def _summary(resource: str, operation: str, latencies, errors: int, elapsed: float) -> dict:
+    return {
+        "resource": resource,
+        "operation": operation,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+    }
+
+
+def _print(result: dict, baseline=None):
+    line = (
+        f"{result['resource']:<18} {result['operation']:<7} {result['requests_per_second'] or 0:>9.1f} "
+        f"{result['p50_ms'] or 0:>8.2f} {result['p99_ms'] or 0:>8.2f} {result['errors']:>7}"
+    )
+    if baseline and baseline.get("p50_ms") and baseline.get("p99_ms") and result["p50_ms"]:
+        line += (
+            f" {(result['p50_ms'] / baseline['p50_ms'] - 1) * 100:>+8.1f}%"
+            f" {(result['p99_ms'] / baseline['p99_ms'] - 1) * 100:>+8.1f}%"
+        )
+    print(line)
+
+
+async def bench_resource(port: int, args, path: str, table: str, changes: dict, payloads: Payloads, baseline: dict):
+    prefix = f"/api/{path}"
+    build = getattr(payloads, table)
+    ids = payloads.samples[table]
+    created = {}
+    phases = [
+        ("list", lambda: [("GET", f"{prefix}/?limit=50", None)] * args.requests),
+        ("get", lambda: [("GET", f"{prefix}/{ids[number % len(ids)]}", None) for number in range(args.requests)] if ids else []),
+        ("create", lambda: [("POST", f"{prefix}/", build(number)) for number in range(args.requests)]),
+        ("update", lambda: [("PUT", f"{prefix}/{id}", {**body, **changes}) for id, body in created.items()]),
+        ("delete", lambda: [("DELETE", f"{prefix}/{id}", None) for id in created]),
+    ]
+    results = []
+    try:
+        for operation, requests in phases:
+            requests = requests()
+            latencies, errors, elapsed, bodies = await run(port, requests, args.concurrency)
+            if operation == "create":
+                created = {body["id"]: request[2] for request, body in zip(requests, bodies) if body}
+            elif operation == "delete":
+                created = {id: body for (id, body), response in zip(created.items(), bodies) if response is None}
+            result = _summary(path, operation, latencies, errors, elapsed)
+            _print(result, baseline.get((path, operation)))
+            results.append(result)
+    finally:
+        # Whatever a failed or interrupted run left behind
+        if created:
+            await run(port, [("DELETE", f"{prefix}/{id}", None) for id in created], args.concurrency)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def bench(args, baseline: dict) -> dict:
+    started_at = datetime.now(timezone.utc).isoformat()
+    samples, rows = sample_ids(args.requests)
+    for parent in ("datacenters", "servers", "hosts", "persons"):
+        if not samples[parent]:
+            raise SystemExit(f"{parent} is empty: load an inventory with generate_inventory.py first")
+    payloads = Payloads(samples)
+
+    server = start_server(args.async_mode, args.port, os.environ["DATABASE_URL"])
+    try:
+        await wait_ready(args.port)
+        # Warm up connection pools and caches
+        await run(args.port, [("GET", f"/api/{path}/?limit=50", None) for path, _, _ in RESOURCES] * 5, args.concurrency)
+
+        header = f"{'resource':<18} {'op':<7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        print(header + (f" {'p50 chg':>9} {'p99 chg':>9}" if baseline else ""))
+        results = []
+        for path, table, changes in RESOURCES:
+            if args.resource and path not in args.resource:
+                continue
+            results.extend(await bench_resource(args.port, args, path, table, changes, payloads, baseline))
+    finally:
+        server.terminate()
+        server.wait()
+
+    metadata = {
+        "started_at": started_at,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "mode": "async" if args.async_mode else "sync",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "table_rows": rows,
+    }
+    return {"metadata": metadata, "results": results}
+
+
+def regressions(results: list, baseline: dict, max_regression: float) -> list:
+    """(resource, operation, change %) of every p99 slower than the baseline by more than ``max_regression`` %."""
+    slower = []
+    for result in results:
+        before = baseline.get((result["resource"], result["operation"]))
+        if before and before.get("p99_ms") and result["p99_ms"]:
+            change = (result["p99_ms"] / before["p99_ms"] - 1) * 100
+            if change > max_regression:
+                slower.append((result["resource"], result["operation"], change))
+    return slower
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per resource and operation")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--resource", nargs="+", choices=[path for path, _, _ in RESOURCES], help="only these resources")
+    parser.add_argument("--async", dest="async_mode", action="store_true", help="run the API with DATABASE_ASYNC=true")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run to compare with")
+    parser.add_argument("--max-regression", type=float, default=20, help="p99 slowdown in percent that fails --compare")
+    parser.add_argument("--port", type=int, default=8760)
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        earlier = json.loads(args.compare.read_text())
+        baseline = {(result["resource"], result["operation"]): result for result in earlier["results"]}
+
+    report = asyncio.run(bench(args, baseline))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    slower = regressions(report["results"], baseline, args.max_regression)
+    for resource, operation, change in slower:
+        print(f"{resource} {operation}: p99 {change:+.1f}% over the baseline", file=sys.stderr)
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
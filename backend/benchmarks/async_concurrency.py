@@ -0,0 +1,203 @@
+"""Compare request throughput of the psycopg2 (threadpool) and asyncpg engine modes.
+
+Starts the API once per mode with uvicorn (``DATABASE_ASYNC=false`` / ``true``)
+against the database in ``DATABASE_URL``, drives it with many concurrent
+clients and prints requests per second and latency percentiles.
+
+    cd backend
+    python benchmarks/async_concurrency.py --concurrency 10 50 200 --db-latency-ms 2
+
+Sync handlers are capped by Starlette's threadpool (40 threads by default):
+past that many in-flight requests, the rest queue for a thread even though the
+database is idle. In async mode an in-flight request only costs a coroutine
+while it waits on Postgres. Both modes still share the engine's connection
+pool, so once every pooled connection is busy, extra concurrency only adds
+queueing in either mode; compare them at a concurrency close to the pool size
+as well as far above it. The time each request spends waiting on the database
+matters too, so ``--db-latency-ms`` routes the API's database traffic through
+a local TCP proxy that delays every packet to simulate a database across the
+network.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy.engine import make_url
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+async def _pipe(reader, writer, delay: float):
+    """Forward ``reader`` to ``writer``, delivering each chunk ``delay`` seconds late."""
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def receive():
+        while data := await reader.read(65536):
+            queue.put_nowait((time.monotonic() + delay, data))
+        queue.put_nowait((0, b""))
+
+    async def send():
+        while True:
+            due, data = await queue.get()
+            if not data:
+                writer.close()
+                return
+            await asyncio.sleep(due - time.monotonic())
+            writer.write(data)
+            await writer.drain()
+
+    await asyncio.gather(receive(), send())
+
+
+def _run_proxy(port: int, upstream: dict, delay: float):
+    async def handle(client_reader, client_writer):
+        if "path" in upstream:
+            reader, writer = await asyncio.open_unix_connection(upstream["path"])
+        else:
+            reader, writer = await asyncio.open_connection(upstream["host"], upstream["port"])
+        await asyncio.gather(_pipe(client_reader, writer, delay), _pipe(reader, client_writer, delay), return_exceptions=True)
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def start_latency_proxy(database_url: str, port: int, latency_ms: float):
+    """Start the delaying proxy and return it with the database URL pointing at it."""
+    url = make_url(database_url)
+    socket_dir = url.query.get("host")
+    db_port = url.port or 5432
+    if socket_dir:
+        upstream = {"path": f"{socket_dir}/.s.PGSQL.{db_port}"}
+    else:
+        upstream = {"host": url.host or "localhost", "port": db_port}
+    # Half of the round trip in each direction
+    proxy = multiprocessing.Process(target=_run_proxy, args=(port, upstream, latency_ms / 2000), daemon=True)
+    proxy.start()
+    proxied = url.difference_update_query(["host"]).set(host="127.0.0.1", port=port)
+    return proxy, proxied.render_as_string(hide_password=False)
+
+
+def start_server(async_mode: bool, port: int, database_url: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        DATABASE_ASYNC="true" if async_mode else "false",
+        CAPACITY_REFRESH_INTERVAL="0",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def wait_ready(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def _request(reader, writer, request: bytes) -> int:
+    """Send one keep-alive GET and read the response; returns the status code."""
+    writer.write(request)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def load(port: int, path: str, concurrency: int, duration: float):
+    """Hammer ``path`` from ``concurrency`` keep-alive connections for ``duration`` seconds.
+
+    A minimal HTTP client keeps the load generator cheap enough not to be
+    the bottleneck itself.
+    """
+    request = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode()
+    latencies = []
+    errors = 0
+    stop = time.monotonic() + duration
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while time.monotonic() < stop:
+                started = time.perf_counter()
+                if await _request(reader, writer, request) != 200:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+        finally:
+            writer.close()
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.monotonic() - started
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def bench(args):
+    database_url = os.environ["DATABASE_URL"]
+    proxy = None
+    if args.db_latency_ms:
+        proxy, database_url = start_latency_proxy(database_url, args.port + 10, args.db_latency_ms)
+
+    print(f"{'mode':<6} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    try:
+        for mode in ("sync", "async"):
+            port = args.port + (mode == "async")
+            server = start_server(mode == "async", port, database_url)
+            try:
+                await wait_ready(port)
+                await load(port, args.path, 10, 1)  # warm up connection pools
+                for concurrency in args.concurrency:
+                    latencies, errors, elapsed = await load(port, args.path, concurrency, args.duration)
+                    print(
+                        f"{mode:<6} {concurrency:>5} {len(latencies) / elapsed:>9.1f} "
+                        f"{statistics.median(latencies) * 1000:>8.1f} "
+                        f"{percentile(latencies, 0.95) * 1000:>8.1f} "
+                        f"{percentile(latencies, 0.99) * 1000:>8.1f} {errors:>7}"
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        if proxy is not None:
+            proxy.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/api/hosts/?limit=50", help="endpoint to request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--duration", type=float, default=10, help="seconds per concurrency level")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="simulated round trip to the database")
+    parser.add_argument("--port", type=int, default=8750)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
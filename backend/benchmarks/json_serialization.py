@@ -0,0 +1,123 @@
+"""Compare the default FastAPI list serialization with the orjson fast path.
+
+Inserts ``--rows`` hosts (with a few awkward hostnames: non-ASCII, quotes,
+control characters) in a transaction that is rolled back at the end, then
+builds the ``GET /api/hosts/`` response body both ways:
+
+- ``orm+pydantic``: ORM objects validated against ``List[schemas.Host]`` by
+  FastAPI's ``serialize_response`` and encoded by ``JSONResponse``, which is
+  what a handler returning ORM objects gets;
+- ``columns+orjson``: column tuples encoded by ``app.serialization.json_list``.
+
+The two bodies must be byte-identical; the script fails otherwise.
+
+    cd backend
+    python benchmarks/json_serialization.py --rows 10000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+from app import models, schemas  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import generate_id  # noqa: E402
+from app.serialization import field_columns, json_list  # noqa: E402
+
+AWKWARD_HOSTNAMES = ["naïve-ü-主机", 'quote"and\\backslash', "ctl\x01\x1f\t\n", "rocket-🚀", "sep  ", "del\x7f"]
+
+
+def seed(db, rows: int) -> str:
+    datacenter = models.Datacenter(name="bench-json", location="bench")
+    db.add(datacenter)
+    db.flush()
+    server = models.Server(
+        hostname="bench-json", datacenter_id=datacenter.id, model="bench",
+        serial_number=generate_id(), status=models.ServerStatus.online,
+    )
+    db.add(server)
+    db.flush()
+    db.bulk_insert_mappings(models.Host, [
+        {
+            "id": generate_id(),
+            "hostname": AWKWARD_HOSTNAMES[i] if i < len(AWKWARD_HOSTNAMES) else f"bench-host-{i:06d}",
+            "server_id": server.id,
+            "os_id": None,
+            "type": list(models.HostType)[i % len(models.HostType)],
+            "status": list(models.HostStatus)[i % len(models.HostStatus)],
+            "cpu": 1 + i % 64,
+            "memory_gb": 1 + i % 512,
+            # Whole seconds exercise the timestamp format without microseconds
+            **({"created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)} if i % 100 == 0 else {}),
+        }
+        for i in range(rows)
+    ])
+    db.flush()
+    return server.id
+
+
+def orm_pydantic(db, server_id: str, field) -> bytes:
+    db.expunge_all()
+    rows = (
+        db.query(models.Host).filter(models.Host.server_id == server_id)
+        .order_by(models.Host.created_at, models.Host.id).all()
+    )
+    content = asyncio.run(serialize_response(field=field, response_content=rows))
+    return JSONResponse(content).body
+
+
+def columns_orjson(db, server_id: str) -> bytes:
+    names = list(schemas.Host.model_fields)
+    rows = (
+        db.query(*field_columns(models.Host, names)).filter(models.Host.server_id == server_id)
+        .order_by(models.Host.created_at, models.Host.id).all()
+    )
+    return json_list(rows, names, Response()).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    route = next(route for route in app.routes if getattr(route, "path", None) == "/api/hosts/" and "GET" in route.methods)
+    db = SessionLocal()
+    try:
+        server_id = seed(db, args.rows)
+        paths = {
+            "orm+pydantic": lambda: orm_pydantic(db, server_id, route.response_field),
+            "columns+orjson": lambda: columns_orjson(db, server_id),
+        }
+        bodies = {name: run() for name, run in paths.items()}  # warm up
+        if len(set(bodies.values())) != 1:
+            sys.exit("Response bodies differ")
+
+        print(f"{args.rows} hosts, {len(bodies['orm+pydantic'])} bytes, bodies identical")
+        timings = {}
+        for name, run in paths.items():
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                run()
+                samples.append(time.perf_counter() - started)
+            timings[name] = statistics.median(samples)
+            print(f"{name:<16} {timings[name] * 1000:9.1f} ms")
+        print(f"speedup          {timings['orm+pydantic'] / timings['columns+orjson']:9.1f}x")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
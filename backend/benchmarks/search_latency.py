@@ -0,0 +1,81 @@
+"""Measure ``GET /api/search`` latency on a generated inventory.
+
+Runs ``app.search.search`` against the database in ``DATABASE_URL``, which
+should be a throwaway database filled by ``generate_inventory.py`` and
+migrated to head (the trigram indexes come from migrations 011 and 012, and
+need the ``pg_trgm`` extension). Each query runs ``--repeat`` times across all
+entity types; the script prints its median and p99 latency, the facet
+counts, and whether every branch read its candidates in distance order from a
+trigram index rather than scoring all matches. It exits with 1 when a
+median is above ``--max-ms``.
+
+    cd backend
+    python benchmarks/generate_inventory.py --reset --datacenters 20 --servers-per-datacenter 250 --hosts-per-server 200
+    python benchmarks/search_latency.py
+
+The default queries cover a single host, a typo, an IP prefix, and two very
+broad ones (every generated host name contains ``host-00``).
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import text, union_all
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import SessionLocal  # noqa: E402
+from app.search import SEARCH_TARGETS, _target_query, search  # noqa: E402
+from async_concurrency import percentile  # noqa: E402
+
+DEFAULT_QUERIES = ["host-00012345", "hsot-00012345", "10.0.1.", "srv-001", "host-00"]
+
+
+def ordered_by_index(db, q: str, limit: int) -> bool:
+    """Whether every nearest-match branch of the plan is a trigram index scan ordered by distance."""
+    statement = union_all(*[_target_query(name, target, q, limit) for name, target in SEARCH_TARGETS.items()])
+    compiled = statement.compile(db.get_bind())
+    plan = "\n".join(row[0] for row in db.connection().exec_driver_sql(f"EXPLAIN {compiled}", compiled.params))
+    branches = sum(2 * len(target.fields) for target in SEARCH_TARGETS.values())
+    return plan.count("Order By: (") >= branches and "_trgm" in plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("queries", nargs="*", default=DEFAULT_QUERIES)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--max-ms", type=float, default=50.0, help="fail when a median is slower")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        hosts = db.execute(text("SELECT count(*) FROM hosts")).scalar()
+        print(f"{hosts} hosts, limit {args.limit}, {args.repeat} runs per query")
+        slow = []
+        for q in args.queries:
+            search(db, q, None, args.limit)  # warm up
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                result = search(db, q, None, args.limit)
+                samples.append((time.perf_counter() - started) * 1000)
+            median = statistics.median(samples)
+            if median > args.max_ms:
+                slow.append(q)
+            facets = " ".join(f"{name}={count}" for name, count in result["facets"].items() if count)
+            print(
+                f"{q!r:<18} p50 {median:7.1f} ms  p99 {percentile(samples, 0.99):7.1f} ms  "
+                f"index order {'yes' if ordered_by_index(db, q, args.limit) else 'NO'}  {facets}"
+            )
+    finally:
+        db.rollback()
+        db.close()
+    if slow:
+        sys.exit(f"Slower than {args.max_ms} ms: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+from sqlalchemy import func, select
+
+from app import models
+
+
+def _host(server_id, hostname):
+    return {
+        "hostname": hostname,
+        "server_id": server_id,
+        "type": "vm",
+        "status": "running",
+        "cpu": 2,
+        "memory_gb": 4,
+    }
+
+
+def _person(email):
+    return {"name": "Test Person", "email": email, "role": "SRE", "department": "Infrastructure"}
+
+
+def _hostnames(db):
+    return sorted(db.scalars(select(models.Host.hostname)))
+
+
+def test_atomic_create_rolls_back_the_whole_batch(client, db, inventory):
+    hosts = [_host(inventory["server"], "bulk-a"), _host("missing", "bulk-b"), _host(inventory["server"], "bulk-c")]
+
+    response = client.post("/api/hosts/bulk", json=hosts)
+
+    assert response.status_code == 409
+    assert "foreign key" in response.json()["detail"]
+    assert _hostnames(db) == ["host-test-01"]
+
+
+def test_per_row_create_applies_the_valid_rows(client, db, inventory):
+    hosts = [_host(inventory["server"], "bulk-a"), _host("missing", "bulk-b"), _host(inventory["server"], "bulk-c")]
+
+    response = client.post("/api/hosts/bulk", params={"atomic": "false"}, json=hosts)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert len(result["ids"]) == 2
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert _hostnames(db) == ["bulk-a", "bulk-c", "host-test-01"]
+
+
+def test_create_can_skip_conflicting_rows(client, inventory):
+    persons = [_person("new@example.com"), _person("ada@example.com")]
+
+    response = client.post("/api/persons/bulk", params={"on_conflict": "skip"}, json=persons)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert len(result["ids"]) == 1
+    assert result["errors"][0]["index"] == 1
+    assert result["errors"][0]["detail"].startswith("Skipped")
+
+
+def test_atomic_update_reports_every_missing_id(client, db, inventory):
+    hosts = [
+        {"id": "missing-1", **_host(inventory["server"], "renamed-a")},
+        {"id": inventory["host"], **_host(inventory["server"], "renamed-b")},
+        {"id": "missing-2", **_host(inventory["server"], "renamed-c")},
+    ]
+
+    response = client.put("/api/hosts/bulk", json=hosts)
+
+    assert response.status_code == 409
+    assert [(error["index"], error["id"]) for error in response.json()["detail"]] == [(0, "missing-1"), (2, "missing-2")]
+    assert _hostnames(db) == ["host-test-01"]
+
+
+def test_per_row_update_applies_the_rows_found(client, db, inventory):
+    hosts = [
+        {"id": "missing-1", **_host(inventory["server"], "renamed-a")},
+        {"id": inventory["host"], **_host(inventory["server"], "renamed-b")},
+    ]
+
+    response = client.put("/api/hosts/bulk", params={"atomic": "false"}, json=hosts)
+
+    assert response.json()["ids"] == [inventory["host"]]
+    assert [error["detail"] for error in response.json()["errors"]] == ["Not found"]
+    assert _hostnames(db) == ["renamed-b"]
+
+
+def test_atomic_delete_fails_while_a_row_is_referenced(client, db, inventory):
+    # The host still has an IP address, whose foreign key refuses the delete
+    response = client.request("DELETE", "/api/hosts/bulk", json=[inventory["host"]])
+
+    assert response.status_code == 409
+    assert _hostnames(db) == ["host-test-01"]
+
+
+def test_delete_removes_the_assignments(client, db, inventory):
+    client.request("DELETE", "/api/ip-addresses/bulk", json=[inventory["ip"]])
+
+    response = client.request("DELETE", "/api/hosts/bulk", json=[inventory["host"]])
+
+    assert response.json()["ids"] == [inventory["host"]]
+    assert db.scalar(select(func.count()).select_from(models.Assignment)) == 0
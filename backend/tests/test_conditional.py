@@ -0,0 +1,94 @@
+from sqlalchemy import text
+
+
+def _age_versions(db):
+    """Move every table's last change an hour back, so ``Last-Modified`` is sent."""
+    db.execute(text("UPDATE table_versions SET changed_at = now() - interval '1 hour'"))
+    db.commit()
+
+
+def test_list_carries_validators(client, inventory):
+    response = client.get("/api/hosts/")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"')
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_matching_etag_is_answered_with_304(client, inventory):
+    etag = client.get("/api/hosts/").headers["ETag"]
+
+    response = client.get("/api/hosts/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_weak_and_wildcard_etags_match(client, inventory):
+    etag = client.get("/api/hosts/").headers["ETag"]
+
+    assert client.get("/api/hosts/", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/api/hosts/", headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_any_write_changes_the_etag(client, db, inventory):
+    etag = client.get("/api/hosts/").headers["ETag"]
+
+    # Written outside the API, so only the triggers can notice
+    db.execute(text("UPDATE hosts SET cpu = cpu + 1"))
+    db.commit()
+    response = client.get("/api/hosts/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()[0]["cpu"] == 5
+
+
+def test_etag_covers_every_table_of_the_response(client, db, inventory):
+    etag = client.get(f"/api/hosts/{inventory['host']}").headers["ETag"]
+
+    # Host lists can be filtered by datacenter, so server writes count too
+    db.execute(text("UPDATE servers SET model = 'PowerEdge R760'"))
+    db.commit()
+
+    assert client.get(f"/api/hosts/{inventory['host']}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_modified_since_is_honoured(client, db, inventory):
+    _age_versions(db)
+    last_modified = client.get("/api/hosts/").headers["Last-Modified"]
+
+    assert client.get("/api/hosts/", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    db.execute(text("UPDATE hosts SET cpu = cpu + 1"))
+    db.commit()
+    assert client.get("/api/hosts/", headers={"If-Modified-Since": last_modified}).status_code == 200
+
+
+def test_last_modified_waits_for_the_second_to_end(client, db, inventory):
+    # A change within the current second, placed ahead so the test cannot straddle a second boundary:
+    # a date sent now could hide another write in the same second
+    db.execute(text("UPDATE table_versions SET changed_at = now() + interval '2 seconds'"))
+    db.commit()
+
+    response = client.get("/api/hosts/")
+
+    assert "Last-Modified" not in response.headers
+
+
+def test_if_none_match_takes_precedence(client, db, inventory):
+    _age_versions(db)
+    last_modified = client.get("/api/hosts/").headers["Last-Modified"]
+
+    response = client.get("/api/hosts/", headers={"If-None-Match": '"stale"', "If-Modified-Since": last_modified})
+
+    assert response.status_code == 200
+
+
+def test_invalid_dates_are_ignored(client, db, inventory):
+    _age_versions(db)
+
+    response = client.get("/api/hosts/", headers={"If-Modified-Since": "yesterday"})
+
+    assert response.status_code == 200
@@ -0,0 +1,125 @@
+import io
+
+from sqlalchemy import select
+
+from app import models
+from app.importer import import_rows
+
+HEADER = "hostname,server_id,os_id,type,status,cpu,memory_gb\n"
+
+
+def _import(db, entity, text, format="csv", **options):
+    return import_rows(db, entity, io.StringIO(text), format, **options)
+
+
+def _hosts(db):
+    return dict(db.execute(select(models.Host.hostname, models.Host.cpu)).all())
+
+
+def test_valid_rows_are_created(db, inventory):
+    server = inventory["server"]
+    text = HEADER + f"import-a,{server},,vm,running,2,4\nimport-b,{server},,container,stopped,1,2\n"
+
+    result = _import(db, "hosts", text)
+
+    assert (result.processed, result.created, result.updated, result.failed) == (2, 2, 0, 0)
+    assert _hosts(db) == {"host-test-01": 4, "import-a": 2, "import-b": 1}
+
+
+def test_invalid_rows_are_reported_by_line(db, inventory):
+    server = inventory["server"]
+    text = HEADER + (
+        f"import-a,{server},,vm,running,2,4\n"
+        f"import-b,{server},,bogus,running,two,4\n"
+        "\n"
+        f"import-c,missing,,vm,running,2,4\n"
+        f"import-d,{server},,vm,running,8,4\n"
+    )
+
+    result = _import(db, "hosts", text)
+
+    assert (result.processed, result.created, result.failed) == (4, 2, 2)
+    assert [error.line for error in result.errors] == [3, 5]
+    assert result.errors[0].detail.startswith("type: ")
+    assert "cpu: " in result.errors[0].detail
+    assert result.errors[1].detail == "server_id: missing does not exist"
+    assert set(_hosts(db)) == {"host-test-01", "import-a", "import-d"}
+
+
+def test_rejected_rows_do_not_stop_the_following_chunks(db, inventory):
+    server = inventory["server"]
+    text = HEADER + (
+        f"import-a,{server},,vm,running,x,4\n"
+        f"import-b,{server},,vm,running,x,4\n"
+        f"import-c,{server},,vm,running,3,4\n"
+    )
+
+    result = _import(db, "hosts", text, chunk_size=2)
+
+    assert (result.processed, result.created, result.failed) == (3, 1, 2)
+    assert [error.line for error in result.errors] == [2, 3]
+
+
+def test_invalid_json_lines_are_reported(db, inventory):
+    server = inventory["server"]
+    text = (
+        f'{{"hostname": "import-a", "server_id": "{server}", "type": "vm", "status": "running", "cpu": 2, "memory_gb": 4}}\n'
+        "{not json\n"
+        '{"hostname": "import-b"}\n'
+    )
+
+    result = _import(db, "hosts", text, format="ndjson")
+
+    assert (result.processed, result.created, result.failed) == (3, 1, 2)
+    assert result.errors[0].line == 2
+    assert result.errors[0].detail.startswith("Invalid JSON")
+    assert result.errors[1].line == 3
+    assert "server_id: Field required" in result.errors[1].detail
+
+
+def test_rows_with_an_id_update_and_the_last_line_wins(db, inventory):
+    host, server = inventory["host"], inventory["server"]
+    text = "id," + HEADER + f"{host},host-test-01,{server},,vm,running,8,16\n{host},host-test-01,{server},,vm,running,12,16\n"
+
+    result = _import(db, "hosts", text)
+
+    assert (result.created, result.updated) == (0, 1)
+    assert _hosts(db) == {"host-test-01": 12}
+
+
+def test_natural_key_matches_existing_rows(db, inventory):
+    text = "address,type,allocation\n10.0.0.10,ipv4,dhcp\n10.0.0.11,ipv4,static\n"
+
+    result = _import(db, "ip-addresses", text)
+
+    assert (result.created, result.updated) == (1, 1)
+    allocations = dict(db.execute(select(models.IPAddress.address, models.IPAddress.allocation)).all())
+    assert allocations == {"10.0.0.10": models.IPAllocation.dhcp, "10.0.0.11": models.IPAllocation.static}
+
+
+def test_values_needing_copy_escapes_round_trip(db, inventory):
+    hostname = "odd\\name\twith\ttabs"
+    line = f'{{"hostname": "{hostname.encode("unicode_escape").decode()}", "server_id": "{inventory["server"]}", "type": "vm", "status": "running", "cpu": 1, "memory_gb": 1}}\n'
+
+    result = _import(db, "hosts", line, format="ndjson")
+
+    assert result.created == 1
+    assert hostname in _hosts(db)
+
+
+def test_import_endpoint_reports_the_result(client, head, inventory):
+    text = HEADER + f"import-a,{inventory['server']},,vm,running,2,4\nimport-b,missing,,vm,running,2,4\n"
+
+    response = client.post("/api/import/hosts", params={"import_id": "test"}, content=text)
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+    assert response.json()["errors"] == [{"line": 3, "detail": "server_id: missing does not exist"}]
+    # Finished imports leave the list of running ones
+    assert client.get("/api/import/").json() == []
+
+
+def test_import_endpoint_rejects_other_encodings(client, head):
+    response = client.post("/api/import/hosts", content="hostname\ncaf\xe9\n".encode("latin-1"))
+
+    assert response.status_code == 400
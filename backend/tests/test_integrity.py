@@ -0,0 +1,87 @@
+from sqlalchemy import func, select, text
+
+from app import models
+
+
+def _count(db, model):
+    return db.scalar(select(func.count()).select_from(model))
+
+
+def test_restrict_refuses_while_children_exist(client, db, inventory):
+    response = client.delete(f"/api/servers/{inventory['server']}")
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == (
+        "Server still has hosts (1); delete them first or pass children=cascade"
+    )
+    assert _count(db, models.Server) == 1
+
+
+def test_nullify_needs_a_nullable_foreign_key(client, db, inventory):
+    response = client.delete(f"/api/servers/{inventory['server']}", params={"children": "nullify"})
+
+    assert response.status_code == 400
+    assert _count(db, models.Host) == 1
+
+
+def test_nullify_detaches_the_children(client, db, inventory):
+    response = client.delete(f"/api/hosts/{inventory['host']}", params={"children": "nullify"})
+
+    assert response.status_code == 200
+    assert response.json()["deleted"] == {"assignments": 1, "hosts": 1}
+    assert db.scalar(select(models.IPAddress.host_id).where(models.IPAddress.id == inventory["ip"])) is None
+
+
+def test_cascade_deletes_the_subtree_and_its_assignments(client, db, inventory):
+    subnet = client.post(
+        "/api/subnets/", json={"name": "net", "cidr": "10.0.0.0/24", "datacenter_id": inventory["datacenter"]},
+    ).json()
+
+    response = client.delete(f"/api/datacenters/{inventory['datacenter']}", params={"children": "cascade"})
+
+    assert response.status_code == 200
+    assert response.json()["deleted"] == {
+        "ip_addresses": 1, "assignments": 1, "hosts": 1, "servers": 1, "datacenters": 1,
+    }
+    assert [_count(db, model) for model in (models.Server, models.Host, models.IPAddress, models.Assignment)] == [0, 0, 0, 0]
+    # Subnets are not part of the hierarchy: they stay, without their datacenter
+    assert db.scalar(select(models.Subnet.datacenter_id).where(models.Subnet.id == subnet["id"])) is None
+    assert _count(db, models.Person) == 1
+
+
+def test_deleting_a_leaf_removes_its_assignments(client, db, inventory):
+    db.add(models.Assignment(
+        person_id=inventory["person"],
+        entity_type=models.EntityType.ip,
+        entity_id=inventory["ip"],
+        role=models.AssignmentRole.viewer,
+    ))
+    db.commit()
+
+    response = client.delete(f"/api/ip-addresses/{inventory['ip']}")
+
+    assert response.json()["deleted"] == {"assignments": 1, "ip_addresses": 1}
+    assert _count(db, models.Assignment) == 1
+
+
+def test_missing_rows_are_not_found(client, db):
+    assert client.delete("/api/hosts/missing", params={"children": "cascade"}).status_code == 404
+
+
+def test_check_reports_and_repair_removes_orphaned_assignments(client, db, inventory):
+    assert client.get("/api/integrity/").json()["ok"] is True
+
+    # Left behind by a delete that bypassed the API
+    db.execute(text("DELETE FROM ip_addresses; DELETE FROM hosts"))
+    db.commit()
+    report = client.get("/api/integrity/").json()
+
+    assert report["ok"] is False
+    orphaned = [check for check in report["checks"] if check["count"]]
+    assert [(check["check"], check["references"], check["sample"]) for check in orphaned] == [
+        ("orphaned_assignment", "hosts", [inventory["assignment"]]),
+    ]
+
+    repaired = client.post("/api/integrity/repair").json()
+    assert repaired["deleted_assignments"]["hosts"] == 1
+    assert repaired["report"]["ok"] is True
@@ -0,0 +1,105 @@
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor
+
+from app import ipam, models, schemas
+from app.database import SessionLocal, engine
+
+
+def _subnet(client, cidr, reserved=()):
+    body = {
+        "name": f"net {cidr}",
+        "cidr": cidr,
+        "reserved_ranges": [{"start_address": start, "end_address": end} for start, end in reserved],
+    }
+    response = client.post("/api/subnets/", json=body)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def _allocate(client, subnet_id, count):
+    return client.post(f"/api/subnets/{subnet_id}/allocate", json={"count": count})
+
+
+def _addresses(response):
+    # inet renders without the prefix length of a single address
+    return [address["address"].split("/")[0] for address in response.json()]
+
+
+def test_allocation_starts_after_the_network_address(client, db):
+    subnet_id = _subnet(client, "192.168.1.0/29")
+
+    response = _allocate(client, subnet_id, 2)
+
+    assert _addresses(response) == ["192.168.1.1", "192.168.1.2"]
+
+
+def test_allocation_skips_used_and_reserved_addresses(client, db, inventory):
+    subnet_id = _subnet(client, "10.0.0.0/28", reserved=[("10.0.0.1", "10.0.0.9")])
+
+    # 10.0.0.10 is the inventory's host address
+    response = _allocate(client, subnet_id, 3)
+
+    assert _addresses(response) == ["10.0.0.11", "10.0.0.12", "10.0.0.13"]
+
+
+def test_exhausted_subnet_is_a_conflict(client, db):
+    subnet_id = _subnet(client, "192.168.1.0/30")
+    assert len(_allocate(client, subnet_id, 2).json()) == 2
+
+    response = _allocate(client, subnet_id, 1)
+
+    assert response.status_code == 409
+    assert "0 free addresses" in response.json()["detail"]
+
+
+def test_utilization_counts_only_usable_unreserved_addresses(client, db, inventory):
+    subnet_id = _subnet(client, "10.0.0.0/28", reserved=[("10.0.0.8", "10.0.0.10")])
+    _allocate(client, subnet_id, 2)
+
+    report = client.get(f"/api/subnets/{subnet_id}/utilization").json()
+
+    # 14 usable addresses, 3 reserved; the inventory's 10.0.0.10 is counted as reserved only
+    assert (report["size"], report["reserved"], report["used"], report["free"]) == (14, 3, 2, 9)
+
+
+def test_concurrent_allocations_never_hand_out_an_address_twice(client, db):
+    subnet_id = _subnet(client, "172.16.0.0/27")
+
+    def allocate():
+        session = SessionLocal()
+        try:
+            return [ip.address for ip in ipam.allocate(session, subnet_id, schemas.SubnetAllocate(count=5))]
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        batches = list(pool.map(lambda _: allocate(), range(6)))
+
+    addresses = sum(batches, [])
+    assert len(addresses) == 30
+    assert len(set(addresses)) == 30
+
+
+def test_addresses_taken_outside_the_lock_are_skipped(db, monkeypatch):
+    subnet = models.Subnet(name="net", cidr="172.16.1.0/29")
+    db.add(subnet)
+    db.commit()
+    find_free = ipam.find_free
+    taken = []
+
+    def racing_find_free(session, subnet, first, last, count):
+        free = find_free(session, subnet, first, last, count)
+        if not taken:
+            # Another writer creates the first address while the allocation is underway
+            taken.append(str(ipaddress.ip_address(free[0])))
+            with engine.begin() as connection:
+                connection.execute(models.IPAddress.__table__.insert().values(
+                    id="racer", address=taken[0], type=models.IPType.ipv4, allocation=models.IPAllocation.static,
+                ))
+        return free
+
+    monkeypatch.setattr(ipam, "find_free", racing_find_free)
+    allocated = ipam.allocate(db, subnet.id, schemas.SubnetAllocate(count=2))
+
+    assert taken == ["172.16.1.1"]
+    assert [ip.address for ip in allocated] == ["172.16.1.2", "172.16.1.3"]
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from app import models
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor
+
+
+def _create_datacenters(client, count):
+    return [
+        client.post("/api/datacenters/", json={"name": f"DC-{index:02d}", "location": "Testville"}).json()["id"]
+        for index in range(count)
+    ]
+
+
+def _walk(client, limit):
+    """All pages of ``/api/datacenters/`` in keyset mode."""
+    pages, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/api/datacenters/", params={"cursor": cursor, "limit": limit})
+        assert response.status_code == 200
+        pages.append([datacenter["id"] for datacenter in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    return pages
+
+
+def test_keyset_pages_cover_every_row_once(client):
+    ids = _create_datacenters(client, 7)
+
+    pages = _walk(client, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sorted(sum(pages, [])) == sorted(ids)
+
+
+def test_keyset_order_matches_offset_order(client):
+    _create_datacenters(client, 5)
+
+    offset_order = [datacenter["id"] for datacenter in client.get("/api/datacenters/", params={"limit": 10}).json()]
+
+    assert sum(_walk(client, limit=2), []) == offset_order
+
+
+def test_last_page_has_no_next_cursor(client):
+    _create_datacenters(client, 2)
+
+    response = client.get("/api/datacenters/", params={"cursor": "", "limit": 2})
+
+    assert len(response.json()) == 2
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_rows_inserted_before_the_cursor_do_not_shift_later_pages(client, db):
+    _create_datacenters(client, 4)
+    first = client.get("/api/datacenters/", params={"cursor": "", "limit": 2})
+    seen = [datacenter["id"] for datacenter in first.json()]
+
+    # Sorts before every existing row; OFFSET paging would repeat a row on the next page
+    early = models.Datacenter(id="0", name="DC-early", location="Testville", created_at=first.json()[0]["created_at"])
+    db.add(early)
+    db.commit()
+    second = client.get("/api/datacenters/", params={"cursor": first.headers[NEXT_CURSOR_HEADER], "limit": 2})
+
+    assert not set(seen) & {datacenter["id"] for datacenter in second.json()}
+    assert len(second.json()) == 2
+
+
+def test_cursor_seeks_past_its_position(client):
+    _create_datacenters(client, 3)
+    rows = client.get("/api/datacenters/", params={"limit": 10}).json()
+    cursor = encode_cursor(datetime.fromisoformat(rows[0]["created_at"]), rows[0]["id"])
+
+    response = client.get("/api/datacenters/", params={"cursor": cursor, "limit": 10})
+
+    assert [datacenter["id"] for datacenter in response.json()] == [row["id"] for row in rows[1:]]
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/api/datacenters/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
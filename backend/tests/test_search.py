@@ -0,0 +1,81 @@
+import pytest
+
+from app import models, search
+
+
+@pytest.fixture
+def hosts(db, head, inventory):
+    """Hosts named after ``web-01`` on the inventory's server."""
+    for hostname in ["web-01", "web-01-backup", "web-02", "db-01"]:
+        db.add(models.Host(
+            hostname=hostname,
+            server_id=inventory["server"],
+            type=models.HostType.vm,
+            status=models.HostStatus.running,
+            cpu=1,
+            memory_gb=1,
+        ))
+    db.commit()
+
+
+def _search(client, q, **params):
+    response = client.get("/api/search/", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_substring_matches_rank_first_and_shorter_values_higher(client, hosts):
+    results = _search(client, "web-01", type="hosts")["results"]
+
+    labels = [result["label"] for result in results]
+    assert labels[:2] == ["web-01", "web-01-backup"]
+    assert results[0]["score"] == 2.0
+    assert results[0]["score"] > results[1]["score"] > 1
+
+
+def test_typos_still_match(client, hosts):
+    results = _search(client, "wbe-01", type="hosts")["results"]
+
+    assert results[0]["label"] == "web-01"
+    assert results[0]["score"] < 1
+
+
+def test_every_type_is_searched_and_the_matched_field_is_reported(client, hosts):
+    results = _search(client, "ada@example")["results"]
+
+    assert results[0]["type"] == "persons"
+    assert (results[0]["label"], results[0]["field"], results[0]["value"]) == ("Ada Test", "email", "ada@example.com")
+
+
+def test_ip_addresses_match_without_their_prefix(client, hosts):
+    results = _search(client, "10.0.0.1", type="ip-addresses")["results"]
+
+    assert [result["value"] for result in results] == ["10.0.0.10"]
+
+
+def test_like_wildcards_in_the_query_are_literal(client, hosts):
+    results = _search(client, "web_01", type="hosts")["results"]
+
+    # Same trigrams as web-01, but not a substring of it once "_" is escaped
+    assert (results[0]["label"], results[0]["score"]) == ("web-01", 1.0)
+
+
+def test_limit_applies_across_types(client, hosts):
+    response = _search(client, "web", limit=2)
+
+    assert len(response["results"]) == 2
+    assert response["facets"]["hosts"] == 3
+
+
+def test_facets_stop_at_the_limit(client, hosts, monkeypatch):
+    monkeypatch.setattr(search, "FACET_LIMIT", 2)
+
+    facets = _search(client, "web")["facets"]
+
+    assert facets["hosts"] == 2
+    assert facets["datacenters"] == 0
+
+
+def test_unknown_types_and_short_queries_are_rejected(client):
+    assert client.get("/api/search/", params={"q": "web", "type": "widgets"}).status_code == 400
+    assert client.get("/api/search/", params={"q": "we"}).status_code == 422
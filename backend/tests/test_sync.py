@@ -0,0 +1,108 @@
+from sqlalchemy import text
+
+from app import models
+from app.database import engine
+
+
+def _token(client):
+    return client.get("/api/sync/").json()["next"]
+
+
+def _changes(client, token, **params):
+    response = client.get("/api/sync/", params={"since": token, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _datacenter(connection, id):
+    connection.execute(models.Datacenter.__table__.insert().values(id=id, name=id, location="Testville"))
+
+
+def test_changes_after_a_token_carry_the_current_rows(client, db):
+    token = _token(client)
+    created = client.post("/api/datacenters/", json={"name": "DC-Sync", "location": "Testville"}).json()
+
+    page = _changes(client, token)
+
+    assert [(change["entity"], change["id"], change["op"]) for change in page["changes"]] == [
+        ("datacenters", created["id"], "insert"),
+    ]
+    assert page["changes"][0]["data"]["name"] == "DC-Sync"
+    assert _changes(client, page["next"])["changes"] == []
+
+
+def test_changes_are_collapsed_per_row(client, db):
+    token = _token(client)
+    created = client.post("/api/datacenters/", json={"name": "DC-Sync", "location": "Testville"}).json()
+    client.put(f"/api/datacenters/{created['id']}", json={"name": "DC-Renamed", "location": "Testville"})
+    kept = client.post("/api/datacenters/", json={"name": "DC-Kept", "location": "Testville"}).json()
+    client.put(f"/api/datacenters/{kept['id']}", json={"name": "DC-Kept-2", "location": "Testville"})
+    client.delete(f"/api/datacenters/{created['id']}")
+
+    changes = {change["id"]: change for change in _changes(client, token)["changes"]}
+
+    assert changes[created["id"]]["op"] == "delete"
+    assert changes[created["id"]]["data"] is None
+    assert changes[kept["id"]]["op"] == "insert"
+    assert changes[kept["id"]]["data"]["name"] == "DC-Kept-2"
+
+
+def test_changes_of_later_transactions_wait_for_older_running_ones(client, db):
+    token = _token(client)
+
+    with engine.connect() as older:
+        # Gets the lower txid, but commits last. The writes go to different
+        # tables: writers of one table queue on its table_versions row
+        _datacenter(older, "dc-older")
+        with engine.begin() as newer:
+            newer.execute(models.OperatingSystem.__table__.insert().values(
+                id="os-newer", name="Debian", version="12", vendor="Debian",
+            ))
+
+        page = _changes(client, token)
+        assert page["changes"] == []
+        older.commit()
+
+    page = _changes(client, page["next"])
+    assert sorted(change["id"] for change in page["changes"]) == ["dc-older", "os-newer"]
+    assert _changes(client, page["next"])["changes"] == []
+
+
+def test_pages_follow_each_other_without_gaps(client, db):
+    token = _token(client)
+    with engine.begin() as connection:
+        for index in range(5):
+            _datacenter(connection, f"dc-{index}")
+
+    seen, has_more = [], True
+    while has_more:
+        page = _changes(client, token, limit=2)
+        seen += [change["id"] for change in page["changes"]]
+        token, has_more = page["next"], page["has_more"]
+
+    assert sorted(seen) == [f"dc-{index}" for index in range(5)]
+
+
+def test_entity_filter(client, db, inventory):
+    token = _token(client)
+    db.execute(text("UPDATE hosts SET cpu = cpu + 1; UPDATE servers SET model = 'PowerEdge R760'"))
+    db.commit()
+
+    page = _changes(client, token, entity="hosts")
+
+    assert [change["entity"] for change in page["changes"]] == ["hosts"]
+
+
+def test_pruned_token_has_expired(client, db):
+    token = _token(client)
+    db.execute(text("UPDATE change_log_horizon SET txid = txid_current() + 1000"))
+    db.commit()
+
+    response = client.get("/api/sync/", params={"since": token})
+
+    assert response.status_code == 410
+
+
+def test_invalid_token_and_entity_are_rejected(client, db):
+    assert client.get("/api/sync/", params={"since": "not-a-token"}).status_code == 400
+    assert client.get("/api/sync/", params={"since": _token(client), "entity": "widgets"}).status_code == 400
@@ -1,4 +1,6 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback, Dispatch, SetStateAction } from 'react';
+import { changeApi } from '@/services/api';
+import type { ChangeEvent } from '@/types/cmdb';
 
 export function useApiQuery<T>(
   fetchFn: () => Promise<T>,
@@ -53,3 +55,42 @@ export function useApiMutation<T, P = any>() {
   return { mutate, loading, error };
 }
 
+
+// Applies a change feed event to a list of rows
+export function applyChange<T extends { id: string }>(items: T[], change: ChangeEvent<T>): T[] {
+  if (change.op === 'delete' || !change.data) {
+    return items.filter(item => item.id !== change.id);
+  }
+  const data = change.data;
+  return items.some(item => item.id === change.id)
+    ? items.map(item => (item.id === change.id ? data : item))
+    : [...items, data];
+}
+
+// Keeps a list held in state in sync with other users' changes to an entity
+// ('hosts', 'ip-addresses', ...) without reloading the collection. Load the list
+// through the returned function: it takes a change feed token before loading
+// and subscribes from that token once the list is in state, so changes made
+// while it loads are replayed on top of it instead of being overwritten by it
+export function useLiveList<T extends { id: string }>(
+  entity: string,
+  setItems: Dispatch<SetStateAction<T[]>>
+) {
+  const [since, setSince] = useState<string | null>(null);
+
+  useEffect(() => {
+    if (since === null) return;
+    return changeApi.subscribe<T>({ entity, since }, change => setItems(items => applyChange(items, change)));
+  }, [entity, since, setItems]);
+
+  return useCallback(
+    async (load: () => Promise<T[]>) => {
+      const token = await changeApi.getToken();
+      const items = await load();
+      setItems(items);
+      setSince(token);
+      return items;
+    },
+    [setItems]
+  );
+}
@@ -29,6 +29,22 @@ function toSnakeCase(obj: any): any {
   return obj;
 }
 
+export type QueryParams = Record<string, string | number | boolean | Array<string | number> | undefined>;
+
+// Helper function to build a query string; camelCase keys become snake_case
+// and array values are sent as repeated parameters
+function buildQuery(params?: QueryParams): string {
+  if (!params) return '';
+  const search = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value === undefined) return;
+    const snakeKey = key.replace(/[A-Z]/g, letter => `_${letter.toLowerCase()}`);
+    (Array.isArray(value) ? value : [value]).forEach(v => search.append(snakeKey, String(v)));
+  });
+  const query = search.toString();
+  return query ? `?${query}` : '';
+}
+
 export class ApiError extends Error {
   constructor(public status: number, message: string) {
     super(message);
@@ -43,6 +59,8 @@ async function request<T>(
   const url = `${API_BASE_URL}${endpoint}`;
   
   const config: RequestInit = {
+    // Carries the cookie that keeps reads on the primary right after a write
+    credentials: 'include',
     ...options,
     headers: {
       'Content-Type': 'application/json',
@@ -71,8 +89,20 @@ async function request<T>(
   }
 }
 
+// Opens a Server-Sent Events stream and hands each `change` event to onChange;
+// returns a function closing the stream. EventSource reconnects on its own and
+// resumes after the last event it received.
+function subscribe<T>(endpoint: string, params: QueryParams | undefined, onChange: (change: T) => void) {
+  const source = new EventSource(`${API_BASE_URL}${endpoint}${buildQuery(params)}`, { withCredentials: true });
+  source.addEventListener('change', (event) => {
+    onChange(toCamelCase(JSON.parse((event as MessageEvent).data)) as T);
+  });
+  return () => source.close();
+}
+
 export const api = {
-  get: <T>(endpoint: string) => request<T>(endpoint, { method: 'GET' }),
+  get: <T>(endpoint: string, params?: QueryParams) =>
+    request<T>(`${endpoint}${buildQuery(params)}`, { method: 'GET' }),
   
   post: <T>(endpoint: string, data: any) =>
     request<T>(endpoint, {
@@ -86,7 +116,9 @@ export const api = {
       body: JSON.stringify(toSnakeCase(data)),
     }),
   
-  delete: (endpoint: string) =>
-    request(endpoint, { method: 'DELETE' }),
+  delete: (endpoint: string, params?: QueryParams) =>
+    request(`${endpoint}${buildQuery(params)}`, { method: 'DELETE' }),
+
+  subscribe,
 };
 
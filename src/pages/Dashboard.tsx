@@ -4,38 +4,20 @@ import { PageHeader } from '@/components/ui/PageHeader';
 import { StatsCard } from '@/components/ui/StatsCard';
 import { EntityLink } from '@/components/ui/EntityLink';
 import { StatusBadge } from '@/components/ui/StatusBadge';
-import { datacenterApi, serverApi, hostApi, ipAddressApi, osApi, personApi } from '@/services/api';
-import type { Datacenter, Server as ServerType, Host, IPAddress, OperatingSystem, Person } from '@/types/cmdb';
+import { statsApi } from '@/services/api';
+import type { DashboardStats } from '@/types/cmdb';
 import { useTranslation } from 'react-i18next';
 
 export default function Dashboard() {
   const { t } = useTranslation();
-  const [datacenters, setDatacenters] = useState<Datacenter[]>([]);
-  const [servers, setServers] = useState<ServerType[]>([]);
-  const [hosts, setHosts] = useState<Host[]>([]);
-  const [ipAddresses, setIpAddresses] = useState<IPAddress[]>([]);
-  const [operatingSystems, setOperatingSystems] = useState<OperatingSystem[]>([]);
-  const [persons, setPersons] = useState<Person[]>([]);
+  const [stats, setStats] = useState<DashboardStats | null>(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [dcData, srvData, hostData, ipData, osData, personData] = await Promise.all([
-          datacenterApi.getAll(),
-          serverApi.getAll(),
-          hostApi.getAll(),
-          ipAddressApi.getAll(),
-          osApi.getAll(),
-          personApi.getAll(),
-        ]);
-        setDatacenters(dcData);
-        setServers(srvData);
-        setHosts(hostData);
-        setIpAddresses(ipData);
-        setOperatingSystems(osData);
-        setPersons(personData);
+        setStats(await statsApi.get());
       } catch (err) {
         console.error('Error fetching dashboard data:', err);
       } finally {
@@ -46,9 +28,9 @@ export default function Dashboard() {
     fetchData();
   }, []);
 
-  const onlineServers = servers.filter(s => s.status === 'online').length;
-  const runningHosts = hosts.filter(h => h.status === 'running').length;
-  const assignedIps = ipAddresses.filter(ip => ip.hostId).length;
+  const onlineServers = stats?.onlineServers ?? 0;
+  const runningHosts = stats?.runningHosts ?? 0;
+  const assignedIps = stats?.assignedIps ?? 0;
 
   const recentActivity = [
     { action: 'Server updated', target: 'srv-chi-dev-01', time: '2 hours ago', type: 'maintenance' },
@@ -84,32 +66,32 @@ export default function Dashboard() {
       <div className="grid grid-cols-1 gap-4 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-6 mb-8">
         <StatsCard 
           title={t('dashboard.totalDatacenters')} 
-          value={datacenters.length} 
+          value={stats?.datacenters ?? 0} 
           icon={<Building2 className="h-5 w-5" />}
         />
         <StatsCard 
           title={t('dashboard.onlineServers')} 
-          value={`${onlineServers}/${servers.length}`} 
+          value={`${onlineServers}/${stats?.servers ?? 0}`} 
           icon={<Server className="h-5 w-5" />}
         />
         <StatsCard 
           title={t('dashboard.runningHosts')} 
-          value={`${runningHosts}/${hosts.length}`} 
+          value={`${runningHosts}/${stats?.hosts ?? 0}`} 
           icon={<Monitor className="h-5 w-5" />}
         />
         <StatsCard 
           title={t('dashboard.assignedIPs')} 
-          value={`${assignedIps}/${ipAddresses.length}`} 
+          value={`${assignedIps}/${stats?.ipAddresses ?? 0}`} 
           icon={<Network className="h-5 w-5" />}
         />
         <StatsCard 
           title={t('dashboard.totalOperatingSystems')} 
-          value={operatingSystems.length} 
+          value={stats?.operatingSystems ?? 0} 
           icon={<HardDrive className="h-5 w-5" />}
         />
         <StatsCard 
           title={t('dashboard.totalPersons')} 
-          value={persons.length} 
+          value={stats?.persons ?? 0} 
           icon={<Users className="h-5 w-5" />}
         />
       </div>
@@ -8,7 +8,7 @@ import { StatusBadge } from '@/components/ui/StatusBadge';
 import { EntityLink } from '@/components/ui/EntityLink';
 import { Button } from '@/components/ui/button';
 import { DatacenterEditDialog } from '@/components/dialogs/DatacenterEditDialog';
-import { datacenterApi, serverApi, assignmentApi, personApi } from '@/services/api';
+import { datacenterApi } from '@/services/api';
 import { Datacenter, Server as ServerType, Assignment, Person } from '@/types/cmdb';
 import { useTranslation } from 'react-i18next';
 
@@ -30,17 +30,12 @@ export default function DatacenterDetail() {
     
     try {
       setLoading(true);
-      const [dcData, serversData, assignmentsData, personsData] = await Promise.all([
-        datacenterApi.getById(id),
-        serverApi.getAll(),
-        assignmentApi.getAll(),
-        personApi.getAll(),
-      ]);
+      const dcData = await datacenterApi.getFull(id);
       
       setDatacenter(dcData);
-      setDcServers(serversData.filter(s => s.datacenterId === id));
-      setDcAssignments(assignmentsData.filter(a => a.entityType === 'datacenter' && a.entityId === id));
-      setPersons(personsData);
+      setDcServers(dcData.servers);
+      setDcAssignments(dcData.assignments);
+      setPersons(dcData.assignments.map(a => a.person));
       setError(null);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to fetch data');
@@ -7,6 +7,7 @@ import { Button } from '@/components/ui/button';
 import { datacenterApi, serverApi } from '@/services/api';
 import { Datacenter, Server } from '@/types/cmdb';
 import { useTranslation } from 'react-i18next';
+import { useLiveList } from '@/hooks/useApi';
 
 export default function DatacenterList() {
   const { t } = useTranslation();
@@ -15,16 +16,16 @@ export default function DatacenterList() {
   const [servers, setServers] = useState<Server[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const loadDatacenters = useLiveList('datacenters', setDatacenters);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [datacentersData, serversData] = await Promise.all([
-          datacenterApi.getAll(),
+        const [, serversData] = await Promise.all([
+          loadDatacenters(() => datacenterApi.getAll()),
           serverApi.getAll(),
         ]);
-        setDatacenters(datacentersData);
         setServers(serversData);
         setError(null);
       } catch (err) {
@@ -36,7 +37,7 @@ export default function DatacenterList() {
     };
 
     fetchData();
-  }, []);
+  }, [loadDatacenters]);
 
   const columns: Column<Datacenter>[] = [
     { 
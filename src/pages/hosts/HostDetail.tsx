@@ -9,7 +9,7 @@ import { EntityLink } from '@/components/ui/EntityLink';
 import { Button } from '@/components/ui/button';
 import { ConfirmDialog } from '@/components/ui/ConfirmDialog';
 import { HostEditDialog } from '@/components/dialogs/HostEditDialog';
-import { hostApi, serverApi, ipAddressApi, osApi, assignmentApi, personApi, operatingSystemApi } from '@/services/api';
+import { hostApi, serverApi, operatingSystemApi } from '@/services/api';
 import { Host, Server as ServerType, IPAddress, OperatingSystem, Assignment, Person } from '@/types/cmdb';
 import { useToast } from '@/hooks/use-toast';
 
@@ -37,31 +37,21 @@ export default function HostDetail() {
     
     try {
       setLoading(true);
-      const [hostData, ipsData, assignmentsData, personsData, serversData, osData] = await Promise.all([
-        hostApi.getById(id),
-        ipAddressApi.getAll(),
-        assignmentApi.getAll(),
-        personApi.getAll(),
+      // Server and OS lists are only needed by the edit dialog
+      const [hostData, serversData, osData] = await Promise.all([
+        hostApi.getFull(id),
         serverApi.getAll(),
         operatingSystemApi.getAll(),
       ]);
       
       setHost(hostData);
-      setHostIps(ipsData.filter(ip => ip.hostId === id));
-      setHostAssignments(assignmentsData.filter(a => a.entityType === 'host' && a.entityId === id));
-      setPersons(personsData);
+      setHostIps(hostData.ipAddresses);
+      setHostAssignments(hostData.assignments);
+      setPersons(hostData.assignments.map(a => a.person));
       setServers(serversData);
       setOperatingSystems(osData);
-      
-      if (hostData.serverId) {
-        const serverData = serversData.find(s => s.id === hostData.serverId);
-        setServer(serverData || null);
-      }
-      
-      if (hostData.osId) {
-        const osDataItem = osData.find(o => o.id === hostData.osId);
-        setOs(osDataItem || null);
-      }
+      setServer(hostData.server);
+      setOs(hostData.operatingSystem || null);
       
       setError(null);
     } catch (err) {
@@ -81,7 +71,8 @@ export default function HostDetail() {
     
     try {
       setDeleting(true);
-      await hostApi.delete(id);
+      // Its IP addresses stay in the inventory, unassigned
+      await hostApi.delete(id, 'nullify');
       toast({
         title: "Host deleted",
         description: "The host has been successfully deleted.",
@@ -9,6 +9,7 @@ import { Button } from '@/components/ui/button';
 import { hostApi, serverApi, osApi, ipAddressApi } from '@/services/api';
 import { Host, Server, OperatingSystem, IPAddress } from '@/types/cmdb';
 import { useTranslation } from 'react-i18next';
+import { useLiveList } from '@/hooks/useApi';
 
 export default function HostList() {
   const { t } = useTranslation();
@@ -19,18 +20,18 @@ export default function HostList() {
   const [ipAddresses, setIpAddresses] = useState<IPAddress[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const loadHosts = useLiveList('hosts', setHosts);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [hostsData, serversData, osData, ipData] = await Promise.all([
-          hostApi.getAll(),
+        const [, serversData, osData, ipData] = await Promise.all([
+          loadHosts(() => hostApi.getAll()),
           serverApi.getAll(),
           osApi.getAll(),
           ipAddressApi.getAll(),
         ]);
-        setHosts(hostsData);
         setServers(serversData);
         setOperatingSystems(osData);
         setIpAddresses(ipData);
@@ -44,7 +45,7 @@ export default function HostList() {
     };
 
     fetchData();
-  }, []);
+  }, [loadHosts]);
 
   const columns: Column<Host>[] = [
     { 
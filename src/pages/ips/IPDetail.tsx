@@ -8,7 +8,7 @@ import { EntityLink } from '@/components/ui/EntityLink';
 import { Button } from '@/components/ui/button';
 import { ConfirmDialog } from '@/components/ui/ConfirmDialog';
 import { IPEditDialog } from '@/components/dialogs/IPEditDialog';
-import { ipAddressApi, hostApi, serverApi } from '@/services/api';
+import { ipAddressApi, hostApi } from '@/services/api';
 import { IPAddress, Host, Server as ServerType } from '@/types/cmdb';
 import { useToast } from '@/hooks/use-toast';
 
@@ -32,23 +32,16 @@ export default function IPDetail() {
     
     try {
       setLoading(true);
+      // The host list is only needed by the edit dialog
       const [ipData, hostsData] = await Promise.all([
-        ipAddressApi.getById(id),
+        ipAddressApi.getFull(id),
         hostApi.getAll(),
       ]);
       
       setIp(ipData);
       setHosts(hostsData);
-      
-      if (ipData.hostId) {
-        const hostData = hostsData.find(h => h.id === ipData.hostId);
-        setHost(hostData || null);
-        
-        if (hostData?.serverId) {
-          const serverData = await serverApi.getById(hostData.serverId);
-          setServer(serverData);
-        }
-      }
+      setHost(ipData.host || null);
+      setServer(ipData.server || null);
       
       setError(null);
     } catch (err) {
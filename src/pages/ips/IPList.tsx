@@ -9,6 +9,7 @@ import { Button } from '@/components/ui/button';
 import { ipAddressApi, hostApi } from '@/services/api';
 import { IPAddress, Host } from '@/types/cmdb';
 import { useTranslation } from 'react-i18next';
+import { useLiveList } from '@/hooks/useApi';
 
 export default function IPList() {
   const { t } = useTranslation();
@@ -17,16 +18,16 @@ export default function IPList() {
   const [hosts, setHosts] = useState<Host[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const loadIpAddresses = useLiveList('ip-addresses', setIpAddresses);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [ipData, hostsData] = await Promise.all([
-          ipAddressApi.getAll(),
+        const [, hostsData] = await Promise.all([
+          loadIpAddresses(() => ipAddressApi.getAll()),
           hostApi.getAll(),
         ]);
-        setIpAddresses(ipData);
         setHosts(hostsData);
         setError(null);
       } catch (err) {
@@ -38,7 +39,7 @@ export default function IPList() {
     };
 
     fetchData();
-  }, []);
+  }, [loadIpAddresses]);
 
   const columns: Column<IPAddress>[] = [
     { 
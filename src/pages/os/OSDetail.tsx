@@ -9,7 +9,7 @@ import { EntityLink } from '@/components/ui/EntityLink';
 import { Button } from '@/components/ui/button';
 import { ConfirmDialog } from '@/components/ui/ConfirmDialog';
 import { OSEditDialog } from '@/components/dialogs/OSEditDialog';
-import { operatingSystemApi, hostApi } from '@/services/api';
+import { operatingSystemApi } from '@/services/api';
 import { OperatingSystem, Host } from '@/types/cmdb';
 import { useToast } from '@/hooks/use-toast';
 
@@ -31,13 +31,10 @@ export default function OSDetail() {
     
     try {
       setLoading(true);
-      const [osData, hostsData] = await Promise.all([
-        operatingSystemApi.getById(id),
-        hostApi.getAll(),
-      ]);
+      const osData = await operatingSystemApi.getFull(id);
       
       setOs(osData);
-      setOsHosts(hostsData.filter(h => h.osId === id));
+      setOsHosts(osData.hosts);
       setError(null);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to fetch data');
@@ -7,6 +7,7 @@ import { Button } from '@/components/ui/button';
 import { osApi, hostApi } from '@/services/api';
 import { OperatingSystem, Host } from '@/types/cmdb';
 import { useTranslation } from 'react-i18next';
+import { useLiveList } from '@/hooks/useApi';
 
 export default function OSList() {
   const { t } = useTranslation();
@@ -15,16 +16,16 @@ export default function OSList() {
   const [hosts, setHosts] = useState<Host[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const loadOperatingSystems = useLiveList('operating-systems', setOperatingSystems);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [osData, hostsData] = await Promise.all([
-          osApi.getAll(),
+        const [, hostsData] = await Promise.all([
+          loadOperatingSystems(() => osApi.getAll()),
           hostApi.getAll(),
         ]);
-        setOperatingSystems(osData);
         setHosts(hostsData);
         setError(null);
       } catch (err) {
@@ -36,7 +37,7 @@ export default function OSList() {
     };
 
     fetchData();
-  }, []);
+  }, [loadOperatingSystems]);
 
   const columns: Column<OperatingSystem>[] = [
     { 
@@ -9,7 +9,7 @@ import { EntityLink } from '@/components/ui/EntityLink';
 import { Button } from '@/components/ui/button';
 import { ConfirmDialog } from '@/components/ui/ConfirmDialog';
 import { PersonEditDialog } from '@/components/dialogs/PersonEditDialog';
-import { personApi, assignmentApi, datacenterApi, serverApi, hostApi } from '@/services/api';
+import { personApi } from '@/services/api';
 import { Person, Assignment, Datacenter, Server as ServerType, Host } from '@/types/cmdb';
 import { useToast } from '@/hooks/use-toast';
 
@@ -34,19 +34,13 @@ export default function PersonDetail() {
     
     try {
       setLoading(true);
-      const [personData, assignmentsData, datacentersData, serversData, hostsData] = await Promise.all([
-        personApi.getById(id),
-        assignmentApi.getAll(),
-        datacenterApi.getAll(),
-        serverApi.getAll(),
-        hostApi.getAll(),
-      ]);
+      const personData = await personApi.getFull(id);
       
       setPerson(personData);
-      setPersonAssignments(assignmentsData.filter(a => a.personId === id));
-      setDatacenters(datacentersData);
-      setServers(serversData);
-      setHosts(hostsData);
+      setPersonAssignments(personData.assignments);
+      setDatacenters(personData.datacenters);
+      setServers(personData.servers);
+      setHosts(personData.hosts);
       setError(null);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to fetch data');
@@ -65,7 +59,7 @@ export default function PersonDetail() {
     
     try {
       setDeleting(true);
-      await personApi.delete(id);
+      await personApi.delete(id, 'cascade');
       toast({
         title: "Person deleted",
         description: "The person has been successfully deleted.",
@@ -203,7 +197,7 @@ export default function PersonDetail() {
         onOpenChange={setDeleteDialogOpen}
         onConfirm={handleDelete}
         title="Delete Person"
-        description={`Are you sure you want to delete ${person.name}? This action cannot be undone.`}
+        description={`Are you sure you want to delete ${person.name}? Their assignments are deleted too. This action cannot be undone.`}
         confirmText="Delete"
         variant="destructive"
       />
@@ -7,6 +7,7 @@ import { Button } from '@/components/ui/button';
 import { personApi, assignmentApi } from '@/services/api';
 import { Person, Assignment } from '@/types/cmdb';
 import { useTranslation } from 'react-i18next';
+import { useLiveList } from '@/hooks/useApi';
 
 export default function PersonList() {
   const { t } = useTranslation();
@@ -15,16 +16,16 @@ export default function PersonList() {
   const [assignments, setAssignments] = useState<Assignment[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const loadPersons = useLiveList('persons', setPersons);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [personsData, assignmentsData] = await Promise.all([
-          personApi.getAll(),
+        const [, assignmentsData] = await Promise.all([
+          loadPersons(() => personApi.getAll()),
           assignmentApi.getAll(),
         ]);
-        setPersons(personsData);
         setAssignments(assignmentsData);
         setError(null);
       } catch (err) {
@@ -36,7 +37,7 @@ export default function PersonList() {
     };
 
     fetchData();
-  }, []);
+  }, [loadPersons]);
 
   const columns: Column<Person>[] = [
     { 
@@ -9,7 +9,7 @@ import { EntityLink } from '@/components/ui/EntityLink';
 import { Button } from '@/components/ui/button';
 import { ConfirmDialog } from '@/components/ui/ConfirmDialog';
 import { ServerEditDialog } from '@/components/dialogs/ServerEditDialog';
-import { serverApi, hostApi, assignmentApi, personApi, datacenterApi } from '@/services/api';
+import { serverApi, datacenterApi } from '@/services/api';
 import { Server as ServerType, Host, Assignment, Person, Datacenter } from '@/types/cmdb';
 import { useToast } from '@/hooks/use-toast';
 
@@ -35,24 +35,18 @@ export default function ServerDetail() {
     
     try {
       setLoading(true);
-      const [serverData, hostsData, assignmentsData, personsData, datacentersData] = await Promise.all([
-        serverApi.getById(id),
-        hostApi.getAll(),
-        assignmentApi.getAll(),
-        personApi.getAll(),
+      // The datacenter list is only needed by the edit dialog
+      const [serverData, datacentersData] = await Promise.all([
+        serverApi.getFull(id),
         datacenterApi.getAll(),
       ]);
       
       setServer(serverData);
-      setServerHosts(hostsData.filter(h => h.serverId === id));
-      setServerAssignments(assignmentsData.filter(a => a.entityType === 'server' && a.entityId === id));
-      setPersons(personsData);
+      setServerHosts(serverData.hosts);
+      setServerAssignments(serverData.assignments);
+      setPersons(serverData.assignments.map(a => a.person));
       setDatacenters(datacentersData);
-      
-      if (serverData.datacenterId) {
-        const dcData = datacentersData.find(dc => dc.id === serverData.datacenterId);
-        setDatacenter(dcData || null);
-      }
+      setDatacenter(serverData.datacenter);
       
       setError(null);
     } catch (err) {
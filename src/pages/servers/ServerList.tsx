@@ -9,6 +9,7 @@ import { Button } from '@/components/ui/button';
 import { serverApi, hostApi, datacenterApi } from '@/services/api';
 import { Server as ServerType, Host, Datacenter } from '@/types/cmdb';
 import { useTranslation } from 'react-i18next';
+import { useLiveList } from '@/hooks/useApi';
 
 export default function ServerList() {
   const { t } = useTranslation();
@@ -18,17 +19,17 @@ export default function ServerList() {
   const [datacenters, setDatacenters] = useState<Datacenter[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const loadServers = useLiveList('servers', setServers);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [serversData, hostsData, datacentersData] = await Promise.all([
-          serverApi.getAll(),
+        const [, hostsData, datacentersData] = await Promise.all([
+          loadServers(() => serverApi.getAll()),
           hostApi.getAll(),
           datacenterApi.getAll(),
         ]);
-        setServers(serversData);
         setHosts(hostsData);
         setDatacenters(datacentersData);
         setError(null);
@@ -41,7 +42,7 @@ export default function ServerList() {
     };
 
     fetchData();
-  }, []);
+  }, [loadServers]);
 
   const columns: Column<ServerType>[] = [
     { 
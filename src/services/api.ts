@@ -7,45 +7,124 @@ import type {
   OperatingSystem,
   Person,
   Assignment,
+  Subnet,
+  SubnetUtilization,
+  DashboardStats,
+  ChangeEvent,
+  SearchHit,
+  EntityAccess,
+  AccessibleEntity,
+  SearchResults,
+  TopologyDatacenter,
+  TopologyFilters,
+  DeleteChildren,
+  IntegrityReport,
+  IntegrityRepair,
+  DatacenterFull,
+  ServerFull,
+  HostFull,
+  IPAddressFull,
+  OperatingSystemFull,
+  PersonFull,
 } from '@/types/cmdb';
 
+// List filters, sent as query parameters
+export type DatacenterFilters = {
+  location?: string[];
+};
+
+export type ServerFilters = {
+  datacenterId?: string | string[];
+  status?: Server['status'][];
+  model?: string[];
+};
+
+export type HostFilters = {
+  serverId?: string | string[];
+  osId?: string | string[];
+  datacenterId?: string | string[];
+  type?: Host['type'][];
+  status?: Host['status'][];
+};
+
+export type IPAddressFilters = {
+  hostId?: string | string[];
+  type?: IPAddress['type'][];
+  allocation?: IPAddress['allocation'][];
+  assigned?: boolean;
+  within?: string;
+  contains?: string;
+};
+
+export type SubnetFilters = {
+  datacenterId?: string | string[];
+  contains?: string;
+};
+
+export type OperatingSystemFilters = {
+  name?: string[];
+  vendor?: string[];
+};
+
+export type PersonFilters = {
+  department?: string[];
+  role?: string[];
+};
+
+export type ChangeFilters = {
+  entity?: string | string[];
+  id?: string | string[];
+  since?: string;
+};
+
+export type AssignmentFilters = {
+  personId?: string | string[];
+  entityType?: Assignment['entityType'] | Assignment['entityType'][];
+  entityId?: string | string[];
+  role?: Assignment['role'][];
+};
+
 // Datacenter API
 export const datacenterApi = {
-  getAll: () => api.get<Datacenter[]>('/api/datacenters'),
+  getAll: (filters?: DatacenterFilters) => api.get<Datacenter[]>('/api/datacenters', filters),
   getById: (id: string) => api.get<Datacenter>(`/api/datacenters/${id}`),
+  getFull: (id: string) => api.get<DatacenterFull>(`/api/datacenters/${id}/full`),
   create: (data: Omit<Datacenter, 'id' | 'createdAt' | 'updatedAt'>) =>
     api.post<Datacenter>('/api/datacenters', data),
   update: (id: string, data: Omit<Datacenter, 'id' | 'createdAt' | 'updatedAt'>) =>
     api.put<Datacenter>(`/api/datacenters/${id}`, data),
-  delete: (id: string) => api.delete(`/api/datacenters/${id}`),
+  delete: (id: string, children?: DeleteChildren) => api.delete(`/api/datacenters/${id}`, { children }),
 };
 
 // Server API
 export const serverApi = {
-  getAll: () => api.get<Server[]>('/api/servers'),
+  getAll: (filters?: ServerFilters) => api.get<Server[]>('/api/servers', filters),
   getById: (id: string) => api.get<Server>(`/api/servers/${id}`),
+  getFull: (id: string) => api.get<ServerFull>(`/api/servers/${id}/full`),
   create: (data: Omit<Server, 'id' | 'createdAt' | 'updatedAt' | 'datacenterName'>) =>
     api.post<Server>('/api/servers', data),
   update: (id: string, data: Omit<Server, 'id' | 'createdAt' | 'updatedAt' | 'datacenterName'>) =>
     api.put<Server>(`/api/servers/${id}`, data),
-  delete: (id: string) => api.delete(`/api/servers/${id}`),
+  delete: (id: string, children?: DeleteChildren) => api.delete(`/api/servers/${id}`, { children }),
 };
 
 // Host API
 export const hostApi = {
-  getAll: () => api.get<Host[]>('/api/hosts'),
+  getAll: (filters?: HostFilters) => api.get<Host[]>('/api/hosts', filters),
   getById: (id: string) => api.get<Host>(`/api/hosts/${id}`),
+  getFull: (id: string) => api.get<HostFull>(`/api/hosts/${id}/full`),
   create: (data: Omit<Host, 'id' | 'createdAt' | 'updatedAt' | 'serverHostname' | 'osName'>) =>
     api.post<Host>('/api/hosts', data),
   update: (id: string, data: Omit<Host, 'id' | 'createdAt' | 'updatedAt' | 'serverHostname' | 'osName'>) =>
     api.put<Host>(`/api/hosts/${id}`, data),
-  delete: (id: string) => api.delete(`/api/hosts/${id}`),
+  delete: (id: string, children?: DeleteChildren) => api.delete(`/api/hosts/${id}`, { children }),
 };
 
 // IP Address API
 export const ipAddressApi = {
-  getAll: () => api.get<IPAddress[]>('/api/ip-addresses'),
+  getAll: (filters?: IPAddressFilters) => api.get<IPAddress[]>('/api/ip-addresses', filters),
   getById: (id: string) => api.get<IPAddress>(`/api/ip-addresses/${id}`),
+  getFull: (id: string) => api.get<IPAddressFull>(`/api/ip-addresses/${id}/full`),
   create: (data: Omit<IPAddress, 'id' | 'createdAt' | 'updatedAt' | 'hostHostname'>) =>
     api.post<IPAddress>('/api/ip-addresses', data),
   update: (id: string, data: Omit<IPAddress, 'id' | 'createdAt' | 'updatedAt' | 'hostHostname'>) =>
@@ -53,10 +132,27 @@ export const ipAddressApi = {
   delete: (id: string) => api.delete(`/api/ip-addresses/${id}`),
 };
 
+// Subnet API
+export const subnetApi = {
+  getAll: (filters?: SubnetFilters) => api.get<Subnet[]>('/api/subnets', filters),
+  getById: (id: string) => api.get<Subnet>(`/api/subnets/${id}`),
+  create: (data: Omit<Subnet, 'id' | 'createdAt' | 'updatedAt'>) =>
+    api.post<Subnet>('/api/subnets', data),
+  update: (id: string, data: Omit<Subnet, 'id' | 'createdAt' | 'updatedAt'>) =>
+    api.put<Subnet>(`/api/subnets/${id}`, data),
+  delete: (id: string) => api.delete(`/api/subnets/${id}`),
+  allocate: (id: string, data: { count: number; allocation?: IPAddress['allocation']; hostId?: string }) =>
+    api.post<IPAddress[]>(`/api/subnets/${id}/allocate`, data),
+  getUtilization: (filters?: SubnetFilters) =>
+    api.get<SubnetUtilization[]>('/api/subnets/utilization', filters),
+  getSubnetUtilization: (id: string) => api.get<SubnetUtilization>(`/api/subnets/${id}/utilization`),
+};
+
 // Operating System API
 export const osApi = {
-  getAll: () => api.get<OperatingSystem[]>('/api/operating-systems'),
+  getAll: (filters?: OperatingSystemFilters) => api.get<OperatingSystem[]>('/api/operating-systems', filters),
   getById: (id: string) => api.get<OperatingSystem>(`/api/operating-systems/${id}`),
+  getFull: (id: string) => api.get<OperatingSystemFull>(`/api/operating-systems/${id}/full`),
   create: (data: Omit<OperatingSystem, 'id' | 'createdAt' | 'updatedAt'>) =>
     api.post<OperatingSystem>('/api/operating-systems', data),
   update: (id: string, data: Omit<OperatingSystem, 'id' | 'createdAt' | 'updatedAt'>) =>
@@ -69,18 +165,19 @@ export const operatingSystemApi = osApi;
 
 // Person API
 export const personApi = {
-  getAll: () => api.get<Person[]>('/api/persons'),
+  getAll: (filters?: PersonFilters) => api.get<Person[]>('/api/persons', filters),
   getById: (id: string) => api.get<Person>(`/api/persons/${id}`),
+  getFull: (id: string) => api.get<PersonFull>(`/api/persons/${id}/full`),
   create: (data: Omit<Person, 'id' | 'createdAt' | 'updatedAt'>) =>
     api.post<Person>('/api/persons', data),
   update: (id: string, data: Omit<Person, 'id' | 'createdAt' | 'updatedAt'>) =>
     api.put<Person>(`/api/persons/${id}`, data),
-  delete: (id: string) => api.delete(`/api/persons/${id}`),
+  delete: (id: string, children?: DeleteChildren) => api.delete(`/api/persons/${id}`, { children }),
 };
 
 // Assignment API
 export const assignmentApi = {
-  getAll: () => api.get<Assignment[]>('/api/assignments'),
+  getAll: (filters?: AssignmentFilters) => api.get<Assignment[]>('/api/assignments', filters),
   getById: (id: string) => api.get<Assignment>(`/api/assignments/${id}`),
   create: (data: Omit<Assignment, 'id' | 'createdAt' | 'personName'>) =>
     api.post<Assignment>('/api/assignments', data),
@@ -89,3 +186,44 @@ export const assignmentApi = {
   delete: (id: string) => api.delete(`/api/assignments/${id}`),
 };
 
+// Dashboard statistics API
+export const statsApi = {
+  get: () => api.get<DashboardStats>('/api/stats'),
+};
+
+// Effective access API
+export const accessApi = {
+  getForEntity: (entityType: Assignment['entityType'], id: string) =>
+    api.get<EntityAccess>(`/api/access/entity/${entityType}/${id}`),
+  getForPerson: (
+    id: string,
+    filters?: { entityType?: Assignment['entityType'][]; role?: Assignment['role'][]; skip?: number; limit?: number }
+  ) => api.get<AccessibleEntity[]>(`/api/access/person/${id}`, filters),
+};
+
+// Search API
+export const searchApi = {
+  search: (q: string, filters?: { type?: SearchHit['type'][]; limit?: number }) =>
+    api.get<SearchResults>('/api/search', { q, ...filters }),
+};
+
+// Topology API
+export const topologyApi = {
+  getAll: (filters?: TopologyFilters) => api.get<TopologyDatacenter[]>('/api/topology', filters),
+  getSubtree: <T>(rootType: Assignment['entityType'], rootId: string, filters?: TopologyFilters) =>
+    api.get<T[]>('/api/topology', { rootType, rootId, ...filters }),
+};
+
+// Integrity API
+export const integrityApi = {
+  getReport: (sampleSize?: number) => api.get<IntegrityReport>('/api/integrity', { sampleSize }),
+  repair: () => api.post<IntegrityRepair>('/api/integrity/repair', {}),
+};
+
+// Live change feed API
+export const changeApi = {
+  // Token for "now", to follow changes from before a load starts
+  getToken: () => api.get<{ next: string }>('/api/sync').then(page => page.next),
+  subscribe: <T>(filters: ChangeFilters, onChange: (change: ChangeEvent<T>) => void) =>
+    api.subscribe<ChangeEvent<T>>('/api/events', filters, onChange),
+};
@@ -45,6 +45,35 @@ export interface IPAddress {
   updatedAt: string;
 }
 
+export interface ReservedRange {
+  id?: string;
+  startAddress: string;
+  endAddress: string;
+  description?: string;
+}
+
+export interface Subnet {
+  id: string;
+  name: string;
+  cidr: string;
+  datacenterId?: string;
+  description?: string;
+  reservedRanges: ReservedRange[];
+  createdAt: string;
+  updatedAt: string;
+}
+
+export interface SubnetUtilization {
+  subnetId: string;
+  name: string;
+  cidr: string;
+  size: number;
+  reserved: number;
+  used: number;
+  free: number;
+  utilization: number;
+}
+
 export interface OperatingSystem {
   id: string;
   name: string;
@@ -86,3 +115,163 @@ export interface EntityCounts {
   operatingSystems: number;
   persons: number;
 }
+
+export interface DatacenterStats {
+  datacenterId: string;
+  name: string;
+  servers: number;
+  onlineServers: number;
+  hosts: number;
+  runningHosts: number;
+}
+
+export interface DashboardStats {
+  datacenters: number;
+  servers: number;
+  hosts: number;
+  ipAddresses: number;
+  operatingSystems: number;
+  persons: number;
+  onlineServers: number;
+  runningHosts: number;
+  assignedIps: number;
+  serversByStatus: Record<Server['status'], number>;
+  hostsByStatus: Record<Host['status'], number>;
+  hostsByType: Record<Host['type'], number>;
+  ipAddressesByAllocation: Record<IPAddress['allocation'], number>;
+  byDatacenter: DatacenterStats[];
+}
+
+// Composite detail responses
+export interface AssignmentWithPerson extends Assignment {
+  person: Person;
+}
+
+export interface DatacenterFull extends Datacenter {
+  servers: Server[];
+  assignments: AssignmentWithPerson[];
+}
+
+export interface ServerFull extends Server {
+  datacenter: Datacenter;
+  hosts: Host[];
+  assignments: AssignmentWithPerson[];
+}
+
+export interface OperatingSystemFull extends OperatingSystem {
+  hosts: Host[];
+}
+
+export interface HostFull extends Host {
+  server: Server;
+  operatingSystem?: OperatingSystem;
+  ipAddresses: IPAddress[];
+  assignments: AssignmentWithPerson[];
+}
+
+export interface IPAddressFull extends IPAddress {
+  host?: Host;
+  server?: Server;
+  assignments: AssignmentWithPerson[];
+}
+
+export interface PersonFull extends Person {
+  assignments: Assignment[];
+  datacenters: Datacenter[];
+  servers: Server[];
+  hosts: Host[];
+  ipAddresses: IPAddress[];
+}
+
+// Live change feed event; data is the row's current state, null for deletes
+export interface ChangeEvent<T = unknown> {
+  entity: string;
+  id: string;
+  op: 'insert' | 'update' | 'delete';
+  data: T | null;
+}
+
+export interface SearchHit {
+  type: 'hosts' | 'servers' | 'ip-addresses' | 'persons' | 'datacenters';
+  id: string;
+  label: string;
+  field: string;
+  value: string;
+  score: number;
+}
+
+export interface SearchResults {
+  query: string;
+  results: SearchHit[];
+  facets: Record<SearchHit['type'], number>;
+}
+
+export interface AccessGrant {
+  assignmentId: string;
+  role: Assignment['role'];
+  entityType: Assignment['entityType'];
+  entityId: string;
+  inherited: boolean;
+}
+
+export interface EntityAccess {
+  entityType: Assignment['entityType'];
+  entityId: string;
+  persons: {
+    personId: string;
+    personName: string;
+    personEmail: string;
+    role: Assignment['role'];
+    grants: AccessGrant[];
+  }[];
+}
+
+export interface AccessibleEntity {
+  entityType: Assignment['entityType'];
+  entityId: string;
+  role: Assignment['role'];
+  grants: AccessGrant[];
+}
+
+export type TopologyIPAddress = Pick<IPAddress, 'id' | 'address' | 'type' | 'allocation'>;
+
+export interface TopologyHost extends Pick<Host, 'id' | 'hostname' | 'type' | 'status' | 'cpu' | 'memoryGb'> {
+  ipAddresses?: TopologyIPAddress[];
+}
+
+export interface TopologyServer extends Pick<Server, 'id' | 'hostname' | 'model' | 'serialNumber' | 'status'> {
+  hosts?: TopologyHost[];
+}
+
+export interface TopologyDatacenter extends Pick<Datacenter, 'id' | 'name' | 'location'> {
+  servers?: TopologyServer[];
+}
+
+export interface TopologyFilters {
+  depth?: number;
+  serverStatus?: Server['status'][];
+  hostType?: Host['type'][];
+  hostStatus?: Host['status'][];
+}
+
+// What deleting an entity does to the rows below it
+export type DeleteChildren = 'restrict' | 'cascade' | 'nullify';
+
+export interface IntegrityCheck {
+  check: 'orphaned_assignment' | 'broken_reference';
+  table: string;
+  column: string;
+  references: string;
+  count: number;
+  sample: string[];
+}
+
+export interface IntegrityReport {
+  ok: boolean;
+  checks: IntegrityCheck[];
+}
+
+export interface IntegrityRepair {
+  deletedAssignments: Record<string, number>;
+  report: IntegrityReport;
+}